@@ -0,0 +1,65 @@
+"""
+Micro-benchmark of command validation and execution.
+
+Compares the original path (a list of invalid characters, a deepcopy of
+the probe and one `_turn`/`_move` call per command) with the fused
+validate-and-compile path, uncached and cached.
+
+    python -m benchmarks.bench_commands
+"""
+import timeit
+from copy import deepcopy
+
+from benchmarks.workloads import survey
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.probe_service import ProbeService
+
+
+def legacy_execute(probe: Probe, commands: str) -> Probe:
+    if not commands.strip():
+        raise ValueError("empty")
+    invalid = [c for c in commands if c not in ProbeService.VALID_COMMANDS]
+    if invalid:
+        raise ValueError("invalid")
+
+    temp_probe = deepcopy(probe)
+    for command in commands:
+        if command == "L":
+            temp_probe.direction = ProbeService._turn(temp_probe.direction, left=True)
+        elif command == "R":
+            temp_probe.direction = ProbeService._turn(temp_probe.direction, left=False)
+        else:
+            ProbeService._move(temp_probe)
+
+    probe.x, probe.y, probe.direction = temp_probe.x, temp_probe.y, temp_probe.direction
+    return probe
+
+
+def fused_execute(probe: Probe, commands: str) -> Probe:
+    ProbeService.compile.cache_clear()
+    return ProbeService.execute_commands(probe, commands)
+
+
+def cached_execute(probe: Probe, commands: str) -> Probe:
+    return ProbeService.execute_commands(probe, commands)
+
+
+def new_probe() -> Probe:
+    return Probe(x=50_000, y=50_000, direction="NORTH", size_x=100_000, size_y=100_000)
+
+
+def main() -> None:
+    print(f"{'commands':>10} {'legacy':>12} {'fused':>12} {'cached':>12}")
+    for length in (10, 1_000, 100_000):
+        commands = survey(length)
+        number = max(1, 100_000 // length)
+        timings = []
+        for execute in (legacy_execute, fused_execute, cached_execute):
+            seconds = min(timeit.repeat(lambda: execute(new_probe(), commands), number=number, repeat=3))
+            timings.append(seconds / number * 1e6)
+
+        print(f"{len(commands):>10} " + " ".join(f"{t:>10.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of serializing a page of probes for GET /probes.
+
+Compares the original path (`ProbeResponse.model_validate` per row, then
+FastAPI validating and encoding the `response_model` again, rendered by
+`JSONResponse`) with the orjson path used by the router, which builds
+plain dicts from the `(id, x, y, direction)` rows and renders them with
+`ORJSONResponse`. Reports the cost per row.
+
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import NamedTuple
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+# The router module reads the settings on import; no database is used.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+from mars_probe_api.routers.probes import _probe_fields  # noqa: E402
+from mars_probe_api.schemas.probe import ProbeListResponse, ProbeResponse  # noqa: E402
+
+
+class Row(NamedTuple):
+    id: uuid.UUID
+    x: int
+    y: int
+    direction: str
+
+
+RESPONSE_FIELD = create_model_field(name="Response", type_=ProbeListResponse, mode="serialization")
+
+
+def make_rows(count: int) -> list[Row]:
+    directions = ("NORTH", "EAST", "SOUTH", "WEST")
+    return [Row(uuid.uuid4(), i % 1_000, i // 1_000, directions[i % 4]) for i in range(count)]
+
+
+def validated(rows: list[Row]) -> bytes:
+    content = ProbeListResponse(probes=[ProbeResponse.model_validate(row) for row in rows])
+    encoded = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=content))
+    return JSONResponse(encoded).body
+
+
+def orjson_rows(rows: list[Row]) -> bytes:
+    return ORJSONResponse(
+        {"probes": [_probe_fields(row) for row in rows], "next_after": None}
+    ).body
+
+
+def main() -> None:
+    print(f"{'probes':>10} {'validated':>14} {'orjson':>14} {'speedup':>8}")
+    for count in (10_000, 100_000, 1_000_000):
+        rows = make_rows(count)
+        assert validated(rows[:100]).replace(b" ", b"") == orjson_rows(rows[:100])
+
+        timings = []
+        for serialize in (validated, orjson_rows):
+            start = time.perf_counter()
+            serialize(rows)
+            timings.append((time.perf_counter() - start) / count * 1e9)
+
+        print(
+            f"{count:>10} " + " ".join(f"{t:>11.0f}ns/row" for t in timings)
+            + f" {timings[0] / timings[1]:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
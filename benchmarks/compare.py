@@ -0,0 +1,61 @@
+"""
+Compare two load driver reports and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+
+Scenarios are matched on (scenario, fleet, command length, concurrency).
+Exits with status 1 when the throughput of any of them drops, or its p95
+latency grows, by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return (result["scenario"], result["fleet"], result["command_length"], result["concurrency"])
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[str]:
+    """Print a line per matched scenario and return the regressed ones."""
+    before = {_key(result): result for result in baseline["results"]}
+    regressions = []
+
+    for result in candidate["results"]:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+
+        throughput = result["throughput_rps"] / old["throughput_rps"] - 1
+        p95 = result["p95_ms"] / old["p95_ms"] - 1
+        name = "{} fleet={} commands={} concurrency={}".format(*_key(result))
+        regressed = throughput < -threshold or p95 > threshold
+        if regressed:
+            regressions.append(name)
+
+        print(
+            f"{'REGRESSION' if regressed else 'ok':<10} {name:<55}"
+            f" throughput {throughput:+.1%}  p95 {p95:+.1%}"
+        )
+
+    return regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    if compare(baseline, candidate, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
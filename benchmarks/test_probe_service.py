@@ -0,0 +1,61 @@
+"""
+pytest-benchmark suite for the in-memory move paths.
+
+    pytest benchmarks --benchmark-json=benchmarks/results/service.json
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+import pytest
+
+from benchmarks.workloads import survey
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.batch_simulator import BatchSimulator
+from mars_probe_api.services.path_planner import Pose, plan_commands
+from mars_probe_api.services.probe_service import ProbeService
+
+
+COMMAND_LENGTHS = [10, 1_000, 100_000]
+FLEET_SIZES = [100, 10_000, 1_000_000]
+GRID_SIZE = 1_000_000
+
+
+def new_probe() -> Probe:
+    center = GRID_SIZE // 2
+    return Probe(x=center, y=center, direction="NORTH", size_x=GRID_SIZE, size_y=GRID_SIZE)
+
+
+@pytest.mark.parametrize("length", COMMAND_LENGTHS)
+def test_execute_commands_cached(benchmark, length):
+    commands = survey(length)
+    benchmark.extra_info["commands"] = len(commands)
+    ProbeService.compile(commands)
+
+    benchmark(lambda: ProbeService.execute_commands(new_probe(), commands))
+
+
+@pytest.mark.parametrize("length", COMMAND_LENGTHS)
+def test_compile_uncached(benchmark, length):
+    commands = survey(length)
+    benchmark.extra_info["commands"] = len(commands)
+
+    benchmark.pedantic(
+        ProbeService.compile,
+        args=(commands,),
+        setup=ProbeService.compile.cache_clear,
+        rounds=20,
+    )
+
+
+@pytest.mark.parametrize("fleet", FLEET_SIZES)
+def test_batch_simulator(benchmark, fleet):
+    center = GRID_SIZE // 2
+    simulator = BatchSimulator(
+        [center] * fleet, [center] * fleet, [0] * fleet, [GRID_SIZE] * fleet, [GRID_SIZE] * fleet
+    )
+    commands = survey(1_000)
+    benchmark.extra_info["fleet"] = fleet
+
+    benchmark(simulator.run, commands)
+
+
+def test_plan_without_obstacles(benchmark):
+    benchmark(plan_commands, Pose(0, 0, 0), Pose(GRID_SIZE, GRID_SIZE, 2), GRID_SIZE, GRID_SIZE)
@@ -0,0 +1,38 @@
+"""Command strings shared by the benchmarks and the load driver."""
+import json
+import random
+from pathlib import Path
+from typing import Optional
+
+
+def survey(length: int, seed: int = 0) -> str:
+    """A random walk of straight legs, about `length` commands long."""
+    rng = random.Random(seed)
+    return "".join(rng.choice(["MMMMR", "MMMML", "MMRRMM", "LMMR"]) for _ in range(max(1, length // 5)))
+
+
+def loop(length: int) -> str:
+    """
+    A square of about `length` commands that ends where it started. From
+    (0, 0) facing NORTH it never leaves the grid, so it can be replayed on
+    freshly launched probes forever.
+    """
+    side = max(1, length // 4 - 1)
+    return ("M" * side + "R") * 4
+
+
+def load_workload(path: Optional[str]) -> list[str]:
+    """
+    Command strings from a JSON Lines file, one object with a `commands`
+    key per line. Lines without one are skipped.
+    """
+    if path is None:
+        return []
+
+    commands = []
+    for line in Path(path).read_text().splitlines():
+        if line.strip():
+            item = json.loads(line)
+            if isinstance(item, dict) and isinstance(item.get("commands"), str):
+                commands.append(item["commands"])
+    return commands
@@ -1,6 +1,46 @@
-from fastapi import FastAPI 
+from contextlib import asynccontextmanager
 
-from mars_probe_api.routers import probes
+from fastapi import FastAPI
 
-app = FastAPI()
+from mars_probe_api.database import engine, settings
+from mars_probe_api.metrics import MetricsMiddleware, metrics
+from mars_probe_api.profiling import ProfilingMiddleware
+from mars_probe_api.routers import health, jobs, metrics as metrics_router, plateaus, probes
+from mars_probe_api.services.coverage import coverage_store
+from mars_probe_api.services.move_jobs import move_jobs
+from mars_probe_api.services.probe_store import probe_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.PROBE_DURABILITY == "write_behind":
+        await probe_store.start(engine, settings.PROBE_FLUSH_INTERVAL)
+    move_jobs.start(settings.MOVE_JOB_WORKERS)
+    await coverage_store.start(engine, settings.COVERAGE_FLUSH_INTERVAL)
+
+    yield
+
+    await move_jobs.stop()
+    await coverage_store.stop()
+    if probe_store.enabled:
+        await probe_store.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(probes.router)
+app.include_router(plateaus.router)
+app.include_router(jobs.router)
+app.include_router(health.router)
+
+if settings.METRICS_ENABLED:
+    metrics.enable()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router.router)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILE_DIR,
+        min_interval=settings.PROFILE_MIN_INTERVAL,
+        token=settings.PROFILE_TOKEN,
+    )
@@ -1,10 +1,114 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from mars_probe_api.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that keeps track of how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = 0
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _do_get(self):
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            self.waiters -= 1
+            self.checkouts += 1
+            self.wait_time += elapsed
+            self.max_wait_time = max(self.max_wait_time, elapsed)
+
+
+def build_engine(database_url: str, settings: Settings) -> AsyncEngine:
+    url = make_url(database_url)
+    options = {}
+
+    # SQLite manages its own pool (a single shared connection in memory).
+    if url.get_backend_name() != "sqlite":
+        if settings.DB_POOL_MODE == "null":
+            options["poolclass"] = NullPool
+        else:
+            options.update(
+                poolclass=InstrumentedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+            )
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        )
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+    return create_async_engine(url, **options)
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(
+            waiters=pool.waiters,
+            checkouts=pool.checkouts,
+            wait_time=pool.wait_time,
+            max_wait_time=pool.max_wait_time,
+        )
+
+    return status
+
+
+settings = Settings()
+engine = build_engine(settings.DATABASE_URL, settings)
+read_engine = (
+    build_engine(settings.READ_DATABASE_URL, settings)
+    if settings.READ_DATABASE_URL
+    else None
+)
+
+# Clients that need to read their own writes (e.g. right after a move) send
+# this header with the value "primary" to bypass the replica.
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
 
 
 async def get_session():
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+def get_session_factory():
+    """Factory of sessions outliving the request, e.g. for move jobs."""
+    return lambda: AsyncSession(engine, expire_on_commit=False)
+
+
+async def get_read_session(request: Request):
+    """Session for read-only endpoints: the replica when configured, else the primary."""
+    target = engine
+    if read_engine is not None and request.headers.get(READ_CONSISTENCY_HEADER) != "primary":
+        target = read_engine
+
+    async with AsyncSession(target, expire_on_commit=False) as session:
+        yield session
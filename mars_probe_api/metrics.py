@@ -0,0 +1,233 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+COMMAND_LENGTH_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Histogram:
+    """
+    Prometheus histogram. Observations only bump one bucket counter; the
+    buckets are made cumulative when rendered, on scrape.
+    """
+
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # One counter per bucket plus +Inf, then the sum.
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = _labels(self.labels + ("le",), labels + (_number(bound),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class RequestMetrics:
+    """What a single request spent, filled in while it is handled."""
+    __slots__ = ("queries", "stages")
+
+    def __init__(self):
+        self.queries = 0
+        self.stages: dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+class Metrics:
+    """
+    Process-wide registry of the API metrics, rendered in the Prometheus
+    text format by GET /metrics.
+
+    Per-request figures (stage timings, query counts) are accumulated on a
+    `RequestMetrics` held in a context variable, and only turned into
+    histogram observations once the request is over and its route is known.
+    Outside of a request, or when metrics are disabled, `stage` and
+    `observe_commands` do nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.requests = Counter(
+            "probe_api_requests_total", "Requests handled.", ("method", "endpoint", "status")
+        )
+        self.latency = Histogram(
+            "probe_api_request_duration_seconds", "Request latency.",
+            LATENCY_BUCKETS, ("method", "endpoint"),
+        )
+        self.stages = Histogram(
+            "probe_api_stage_duration_seconds",
+            "Time spent per request in each stage: fetch, simulate, persist, serialize.",
+            LATENCY_BUCKETS, ("endpoint", "stage"),
+        )
+        self.queries = Histogram(
+            "probe_api_request_queries", "SQL statements executed per request.",
+            QUERY_BUCKETS, ("endpoint",),
+        )
+        self.command_length = Histogram(
+            "probe_api_command_length", "Length of the command strings run.",
+            COMMAND_LENGTH_BUCKETS,
+        )
+
+    def enable(self) -> None:
+        """Start collecting, and count the statements of every engine."""
+        if not event.contains(Engine, "before_cursor_execute", _count_query):
+            event.listen(Engine, "before_cursor_execute", _count_query)
+        self.enabled = True
+
+    def disable(self) -> None:
+        if event.contains(Engine, "before_cursor_execute", _count_query):
+            event.remove(Engine, "before_cursor_execute", _count_query)
+        self.enabled = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the time spent in the block to stage `name` of the current request."""
+        request = _current.get()
+        if request is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            request.stages[name] = request.stages.get(name, 0.0) + elapsed
+
+    def observe_commands(self, length: int) -> None:
+        if _current.get() is not None:
+            self.command_length.observe(length)
+
+    def observe_request(
+        self,
+        method: str,
+        endpoint: str,
+        status: int,
+        elapsed: float,
+        request: RequestMetrics,
+    ) -> None:
+        self.requests.inc(method, endpoint, str(status))
+        self.latency.observe(elapsed, method, endpoint)
+        self.queries.observe(request.queries, endpoint)
+        for name, seconds in request.stages.items():
+            self.stages.observe(seconds, endpoint, name)
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._all() for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._all():
+            metric.clear()
+
+    def _all(self):
+        return self.requests, self.latency, self.stages, self.queries, self.command_length
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request and labelling it with the
+    path template of the route that handled it (e.g. `/probes/{probe_id}/move`),
+    so that probe ids do not blow up the number of series.
+    """
+
+    def __init__(self, app, registry: Optional[Metrics] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            self.registry.observe_request(scope["method"], endpoint, status, elapsed, request)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    request = _current.get()
+    if request is not None:
+        request.queries += 1
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    return value if isinstance(value, str) else repr(value)
+
+
+metrics = Metrics()
@@ -0,0 +1,57 @@
+import uuid
+
+from sqlalchemy import CheckConstraint, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from mars_probe_api.models import table_registry
+
+
+@table_registry.mapped_as_dataclass
+class Plateau:
+    __tablename__ = "plateaus"
+    __table_args__ = (
+        CheckConstraint("size_x >= 0", name="check_plateau_size_x_non_negative"),
+        CheckConstraint("size_y >= 0", name="check_plateau_size_y_non_negative"),
+    )
+
+    size_x: Mapped[int] = mapped_column(Integer, nullable=False)
+    size_y: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default_factory=uuid.uuid4)
+    # Bumped whenever the static obstacles of the plateau change.
+    obstacles_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+@table_registry.mapped_as_dataclass
+class Obstacle:
+    __tablename__ = "obstacles"
+    __table_args__ = (
+        CheckConstraint("x >= 0", name="check_obstacle_x_non_negative"),
+        CheckConstraint("y >= 0", name="check_obstacle_y_non_negative"),
+    )
+
+    plateau_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("plateaus.id", ondelete="CASCADE"), primary_key=True
+    )
+    x: Mapped[int] = mapped_column(Integer, primary_key=True)
+    y: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+@table_registry.mapped_as_dataclass
+class CoverageChunk:
+    """
+    One 64x64 chunk of the cells of a plateau visited by its probes, as
+    the compressed bits of a `ChunkedBitmap` chunk. Only chunks with a
+    visited cell have a row.
+    """
+    __tablename__ = "plateau_coverage_chunks"
+
+    plateau_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("plateaus.id", ondelete="CASCADE"), primary_key=True
+    )
+    cx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cy: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Number of bits set, summed up for the coverage of the plateau.
+    cells: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    bits: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"")
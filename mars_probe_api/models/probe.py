@@ -1,10 +1,14 @@
 import uuid
 
-from sqlalchemy import Column, Integer, String, CheckConstraint
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, CheckConstraint, ForeignKey, Index, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from mars_probe_api.models import table_registry
+from mars_probe_api.models.plateau import Plateau
 
 
 @table_registry.mapped_as_dataclass
@@ -19,6 +23,18 @@ class Probe:
         CheckConstraint("size_y >= 0", name="check_size_y_non_negative"),
         CheckConstraint("x >= 0", name="check_x_non_negative"),
         CheckConstraint("y >= 0", name="check_y_non_negative"),
+        Index("ix_probes_position", "x", "y", "direction", "id"),
+        Index("ix_probes_direction_position", "direction", "x", "y", "id"),
+        Index("ix_probes_revision", "revision"),
+        Index(
+            "ix_probes_grid_size",
+            "size_x",
+            "size_y",
+            postgresql_include=["id", "x", "y", "direction"],
+        ),
+        # Probes sharing a plateau never share a cell. Probes without a
+        # plateau have a NULL plateau_id and are not constrained.
+        UniqueConstraint("plateau_id", "x", "y", name="uq_probes_plateau_position"),
     )
 
     size_x: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -28,4 +44,33 @@ class Probe:
     x: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     y: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     direction: Mapped[str] = mapped_column(String(5), nullable=False, default="NORTH")
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    plateau_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey(Plateau.id), nullable=True, default=None
+    )
+    # Revision of the last write to the probe (see `fleet_state.write_revision`).
+    revision: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
 
+
+@table_registry.mapped_as_dataclass
+class ProbeMove:
+    """
+    One saved move of a probe, append-only. `seq` is the probe version the
+    move produced, and `commands` are run-length encoded (see
+    `command_compiler.encode_commands`).
+    """
+    __tablename__ = "probe_moves"
+
+    probe_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("probes.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    commands: Mapped[str] = mapped_column(Text, nullable=False)
+    start_x: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_y: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_direction: Mapped[str] = mapped_column(String(5), nullable=False)
+    end_x: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_y: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_direction: Mapped[str] = mapped_column(String(5), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,92 @@
+import cProfile
+import os
+import re
+import time
+import uuid
+from typing import Optional
+
+
+# Requests carrying this header are profiled when profiling is enabled. If a
+# token is configured, the header value must match it.
+PROFILE_HEADER = "X-Profile"
+_HEADER_KEY = PROFILE_HEADER.lower().encode()
+
+
+class RateLimiter:
+    """Allows one event per `min_interval` seconds, per process."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._last: Optional[float] = None
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.min_interval:
+            return False
+        self._last = now
+        return True
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling opted-in requests with cProfile and writing
+    the stats to `directory`, one `.pstats` file per request, to be read
+    with `python -m pstats` or snakeviz.
+
+    The profile covers everything run on the event loop while the request
+    is handled: the router, `ProbeService`, SQLAlchemy and the driver, but
+    also any request served concurrently. Only one request is profiled at
+    a time and at most one per `min_interval` seconds; others are served
+    normally. The response carries the file name, or `rate-limited`, in
+    the `X-Profile` header.
+    """
+
+    def __init__(self, app, directory: str, min_interval: float, token: Optional[str] = None):
+        self.app = app
+        self.directory = directory
+        self.token = token
+        self.limiter = RateLimiter(min_interval)
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        value = _header(scope, _HEADER_KEY) if scope["type"] == "http" else None
+        if value is None or (self.token is not None and value != self.token):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active or not self.limiter.allow():
+            await self.app(scope, receive, _with_header(send, b"rate-limited"))
+            return
+
+        name = _file_name(scope)
+        profile = cProfile.Profile()
+        self._active = True
+        profile.enable()
+        try:
+            await self.app(scope, receive, _with_header(send, name.encode()))
+        finally:
+            profile.disable()
+            self._active = False
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, name))
+
+
+def _header(scope, key: bytes) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == key:
+            return value.decode("latin-1")
+    return None
+
+
+def _with_header(send, value: bytes):
+    async def send_with_header(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), (_HEADER_KEY, value)]}
+        await send(message)
+    return send_with_header
+
+
+def _file_name(scope) -> str:
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{scope['method']}-{path}-{uuid.uuid4().hex[:8]}.pstats"
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from mars_probe_api.database import engine, pool_status, read_engine
+from mars_probe_api.schemas.health import PoolStatus, PoolStatusResponse
+
+
+router = APIRouter(prefix='/health', tags=['health'])
+
+
+@router.get("/pool", response_model=PoolStatusResponse)
+async def get_pool_status():
+    """
+    Database connection pool metrics for this process.
+
+    - **checked_out**: connections currently in use
+    - **waiters**: sessions currently waiting for a connection
+    - **wait_time** / **max_wait_time**: total and worst time spent waiting
+      for a connection, in seconds
+    """
+    pools = {"primary": PoolStatus(**pool_status(engine))}
+    if read_engine is not None:
+        pools["replica"] = PoolStatus(**pool_status(read_engine))
+
+    return PoolStatusResponse(pools=pools)
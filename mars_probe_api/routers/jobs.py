@@ -0,0 +1,39 @@
+import uuid
+
+from fastapi import APIRouter, HTTPException
+from http import HTTPStatus
+
+from mars_probe_api.schemas.job import MoveJobResponse
+from mars_probe_api.services.move_jobs import move_jobs
+
+
+router = APIRouter(prefix='/jobs', tags=['jobs'])
+
+
+@router.get(
+    "/{job_id}",
+    response_model=MoveJobResponse,
+    responses={
+        404: {"description": "Not Found"}
+    }
+)
+async def get_job(job_id: uuid.UUID):
+    """
+    Progress of an asynchronous move (`PUT /probes/{id}/move?async=true`).
+
+    - **status**: `queued`, `running`, `succeeded` or `failed`
+    - **done** / **total**: commands run so far, out of the whole script
+    - **x**, **y**, **direction**: pose reached so far, and the final pose
+      once the job succeeded; the probe itself only moves at the end
+    - **detail**: why the job failed
+
+    Jobs are kept in the memory of the process that accepted them.
+    """
+    job = move_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return MoveJobResponse.model_validate(job)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from mars_probe_api.metrics import metrics
+
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics of this process in the Prometheus text format: request counts
+    and latencies per endpoint, per-stage timings (fetch, simulate,
+    persist, serialize), SQL statements per request and command lengths.
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,244 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException
+from http import HTTPStatus
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+
+from mars_probe_api.database import get_read_session, get_session
+from mars_probe_api.models.plateau import CoverageChunk, Obstacle, Plateau
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.schemas.plateau import (
+    Cell,
+    PlateauCoverageResponse,
+    PlateauCreate,
+    PlateauProbeCreate,
+    PlateauResponse
+)
+from mars_probe_api.schemas.probe import ProbeResponse
+from mars_probe_api.services.coverage import coverage_store
+from mars_probe_api.services.fleet_state import write_revision
+from mars_probe_api.services.probe_service import DIRECTIONS
+from mars_probe_api.services.probe_store import ProbeState, probe_store
+from mars_probe_api.services.spatial_index import plateau_indexes
+
+
+router = APIRouter(prefix='/plateaus', tags=['plateaus'])
+Session = Annotated[AsyncSession, Depends(get_session)]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+@router.post(
+    "/",
+    status_code=HTTPStatus.CREATED,
+    response_model=PlateauResponse,
+    responses={
+        400: {"description": "Bad Request"}
+    }
+)
+async def create_plateau(plateau_data: PlateauCreate, session: Session):
+    """
+    Create a plateau shared by many probes.
+
+    - **x**: Plateau size in the X direction (integer >= 0)
+    - **y**: Plateau size in the Y direction (integer >= 0)
+    - **obstacles**: cells (**x**, **y**) no probe can enter
+    """
+    if plateau_data.x < 0:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="X must be a non-negative integer"
+        )
+
+    if plateau_data.y < 0:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Y must be a non-negative integer"
+        )
+
+    obstacles = list(dict.fromkeys((cell.x, cell.y) for cell in plateau_data.obstacles))
+    if any(not (0 <= x <= plateau_data.x and 0 <= y <= plateau_data.y) for x, y in obstacles):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Obstacles must be inside the plateau"
+        )
+
+    plateau = Plateau(size_x=plateau_data.x, size_y=plateau_data.y)
+    session.add(plateau)
+    await session.flush()
+    if obstacles:
+        await session.execute(
+            insert(Obstacle),
+            [{"plateau_id": plateau.id, "x": x, "y": y} for x, y in obstacles],
+        )
+    await session.commit()
+
+    return PlateauResponse(
+        id=plateau.id,
+        x=plateau.size_x,
+        y=plateau.size_y,
+        obstacles=[Cell(x=x, y=y) for x, y in obstacles],
+    )
+
+
+@router.get(
+    "/{plateau_id}",
+    response_model=PlateauResponse,
+    responses={
+        404: {"description": "Not Found"}
+    }
+)
+async def get_plateau(plateau_id: uuid.UUID, session: ReadSession):
+    """
+    Get a plateau and its obstacles.
+    """
+    plateau = await _get_plateau(session, plateau_id)
+    obstacles = await session.execute(
+        select(Obstacle.x, Obstacle.y)
+        .where(Obstacle.plateau_id == plateau_id)
+        .order_by(Obstacle.x, Obstacle.y)
+    )
+
+    return PlateauResponse(
+        id=plateau.id,
+        x=plateau.size_x,
+        y=plateau.size_y,
+        obstacles=[Cell(x=x, y=y) for x, y in obstacles],
+    )
+
+
+@router.post(
+    "/{plateau_id}/probes",
+    status_code=HTTPStatus.CREATED,
+    response_model=ProbeResponse,
+    responses={
+        400: {"description": "Bad Request"},
+        404: {"description": "Not Found"},
+        409: {"description": "Conflict"}
+    }
+)
+async def launch_probe(plateau_id: uuid.UUID, probe_data: PlateauProbeCreate, session: Session):
+    """
+    Launch a probe on a plateau.
+
+    - **direction**: Initial direction of the probe (NORTH, EAST, SOUTH, WEST)
+
+    The probe starts at position (0, 0), which must be free. Its moves are
+    then checked against the other probes and the obstacles of the plateau.
+
+    With the write-behind store enabled, the store is flushed first: the
+    unique position constraint is checked against the probe rows, which
+    would otherwise still hold positions the probes already left.
+    """
+    if probe_data.direction not in DIRECTIONS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f"Direction must be one of {DIRECTIONS}"
+        )
+
+    plateau = await _get_plateau(session, plateau_id)
+    occupancy = await plateau_indexes.get(session, plateau_id)
+    if (0, 0) in occupancy:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Launch position (0, 0) is occupied"
+        )
+
+    occupancy.add(0, 0)
+    try:
+        if probe_store.enabled:
+            await probe_store.flush(session)
+        revision = write_revision(session)
+        result = await session.execute(
+            insert(Probe)
+            .values(
+                id=uuid.uuid4(),
+                size_x=plateau.size_x,
+                size_y=plateau.size_y,
+                x=0,
+                y=0,
+                direction=probe_data.direction,
+                plateau_id=plateau_id,
+                revision=revision,
+            )
+            .returning(Probe.id, Probe.x, Probe.y, Probe.direction)
+        )
+        probe = result.one()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        plateau_indexes.invalidate(plateau_id)
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Launch position (0, 0) is occupied"
+        )
+    except Exception:
+        plateau_indexes.invalidate(plateau_id)
+        raise
+
+    if probe_store.enabled:
+        probe_store.add(
+            [ProbeState(*probe, plateau.size_x, plateau.size_y, 0, plateau_id, revision)]
+        )
+
+    coverage_store.record(plateau_id, [(0, 0, probe.direction, "")])
+
+    return ProbeResponse.model_validate(probe)
+
+
+@router.get(
+    "/{plateau_id}/coverage",
+    response_model=PlateauCoverageResponse,
+    responses={
+        404: {"description": "Not Found"}
+    }
+)
+async def get_coverage(plateau_id: uuid.UUID, session: ReadSession):
+    """
+    Get how much of a plateau its probes have explored.
+
+    - **total_cells**: cells of the plateau
+    - **free_cells**: cells without an obstacle
+    - **covered_cells**: distinct cells visited by a probe since launch
+    - **coverage**: covered_cells / free_cells
+    - **chunks**: 64x64 chunks of the coverage bitmap with at least one visited cell
+    - **stored_bytes**: size of the compressed chunks in the database
+
+    Coverage is written behind the moves (see `CoverageStore`), so it may
+    lag them by up to COVERAGE_FLUSH_INTERVAL seconds.
+    """
+    plateau = await _get_plateau(session, plateau_id)
+    obstacles = await session.scalar(
+        select(func.count()).select_from(Obstacle).where(Obstacle.plateau_id == plateau_id)
+    )
+    covered_cells, chunks, stored_bytes = (await session.execute(
+        select(
+            func.coalesce(func.sum(CoverageChunk.cells), 0),
+            func.count(),
+            func.coalesce(func.sum(func.length(CoverageChunk.bits)), 0),
+        ).where(CoverageChunk.plateau_id == plateau_id)
+    )).one()
+
+    total_cells = (plateau.size_x + 1) * (plateau.size_y + 1)
+    free_cells = total_cells - obstacles
+    return PlateauCoverageResponse(
+        id=plateau_id,
+        total_cells=total_cells,
+        free_cells=free_cells,
+        covered_cells=covered_cells,
+        coverage=covered_cells / free_cells if free_cells else 0.0,
+        chunks=chunks,
+        stored_bytes=stored_bytes,
+    )
+
+
+async def _get_plateau(session: AsyncSession, plateau_id: uuid.UUID) -> Plateau:
+    plateau = await session.get(Plateau, plateau_id)
+    if plateau is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Plateau not found"
+        )
+    return plateau
@@ -1,25 +1,81 @@
+import asyncio
 import uuid
 
+import orjson
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from fastapi import APIRouter
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from http import HTTPStatus
-from sqlalchemy import select
+from sqlalchemy import bindparam, column, insert, select, update, values
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
+from typing import Annotated, Optional
 
-from mars_probe_api.database import get_session
-from mars_probe_api.models.probe import Probe
+from mars_probe_api.database import get_read_session, get_session, get_session_factory
+from mars_probe_api.metrics import metrics
+from mars_probe_api.models.probe import Probe, ProbeMove
+from mars_probe_api.schemas.job import MoveJobResponse
 from mars_probe_api.schemas.probe import (
+    DEFAULT_PAGE_SIZE,
+    ProbeBatchCreate,
+    ProbeBatchMoveRequest,
+    ProbeBatchMoveResponse,
     ProbeCreate,
+    ProbeHistoryItem,
+    ProbeHistoryParams,
+    ProbeHistoryResponse,
+    ProbeListParams,
     ProbeListResponse,
     ProbeMoveRequest,
-    ProbeResponse
+    ProbeMoveResult,
+    ProbeMovesRequest,
+    ProbePlanRequest,
+    ProbePlanResponse,
+    ProbePose,
+    ProbeResponse,
+    ProbeSimulateRequest,
+    ProbeSimulateResponse
 )
-from mars_probe_api.services.probe_service import DIRECTIONS, ProbeService
+from mars_probe_api.services.batch_simulator import BatchSimulator
+from mars_probe_api.services.command_compiler import (
+    CommandStream,
+    GridLimitExceeded,
+    InvalidCommand,
+    MoveFailed,
+    append_encoded,
+    decode_commands,
+    encode_commands,
+    sample_path,
+)
+from mars_probe_api.services.coverage import ChunkedBitmap, coverage_store
+from mars_probe_api.services.fleet_state import fleet_version, listing_cache, write_revision
+from mars_probe_api.services.move_jobs import JOB_CHUNK_SIZE, MoveJob, chunk_failure, move_jobs, simulate_chunk
+from mars_probe_api.services.path_planner import (
+    NoPathFound,
+    SearchBudgetExceeded,
+    path_planner,
+    pose_of,
+)
+from mars_probe_api.services.probe_service import DIRECTIONS, HEADINGS, ProbeService
+from mars_probe_api.services.probe_store import ProbeState, probe_store
+from mars_probe_api.services.spatial_index import OccupancyIndex, OwnCellView, StaleIndex, plateau_indexes
+
 
+STREAM_BATCH_SIZE = 1_000
+# Fields of ProbeResponse, as serialized by _probe_fields.
+PROBE_FIELDS = ("id", "x", "y", "direction")
+MOVE_MAX_ATTEMPTS = 3
+# Poses per UPDATE ... FROM (VALUES ...), six parameters each, well under
+# the 32767 parameters PostgreSQL accepts per statement.
+SAVE_BATCH_SIZE = 1_000
+MAX_PATH_SAMPLES = 10_000
 
 router = APIRouter(prefix='/probes', tags=['probes'])
 Session = Annotated[AsyncSession, Depends(get_session)]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
 
 
 @router.post(
@@ -38,65 +94,393 @@ async def create(probe_data: ProbeCreate, session: Session):
     - **y**: Grid size in the Y direction (integer >= 0)
     - **direction**: Initial direction of the probe (NORTH, EAST, SOUTH, WEST)
 
-    The probe always starts at position (0, 0).
+    The probe always starts at position (0, 0). It is written and read back
+    with a single INSERT ... RETURNING.
     """
-    if not isinstance(probe_data.x, int) or probe_data.x < 0:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail="X must be a non-negative integer"
-        )
+    _validate_probe_data(probe_data)
 
-    if not isinstance(probe_data.y, int) or probe_data.y < 0:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail="Y must be a non-negative integer"
+    revision = write_revision(session)
+    result = await session.execute(
+        insert(Probe)
+        .values(
+            id=uuid.uuid4(),
+            size_x=probe_data.x,
+            size_y=probe_data.y,
+            x=0,
+            y=0,
+            direction=probe_data.direction,
+            revision=revision,
         )
+        .returning(Probe.id, Probe.x, Probe.y, Probe.direction)
+    )
+    probe = result.one()
+    await session.commit()
+
+    if probe_store.enabled:
+        probe_store.add([ProbeState(*probe, probe_data.x, probe_data.y, 0, revision=revision)])
+
+    return _probe_json(probe, HTTPStatus.CREATED)
 
-    if probe_data.direction not in DIRECTIONS:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail=f"Direction must be one of {DIRECTIONS}"
-        )
 
-    probe = Probe(
-        size_x=probe_data.x,
-        size_y=probe_data.y,
-        x=0,
-        y=0,
-        direction=probe_data.direction
+@router.post(
+    "/batch",
+    status_code=HTTPStatus.CREATED,
+    response_model=ProbeListResponse,
+    responses={
+        400: {"description": "Bad Request"}
+    }
+)
+async def create_batch(request: ProbeBatchCreate, session: Session):
+    """
+    Launch many Mars Probes at once.
+
+    - **probes**: list of probes to launch, each with the same fields as a
+      single launch (**x**, **y**, **direction**)
+
+    All probes start at position (0, 0) and are inserted in a single
+    statement; if any probe is invalid, none is launched.
+    """
+    for i, probe_data in enumerate(request.probes):
+        try:
+            _validate_probe_data(probe_data)
+        except HTTPException as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=f"probes[{i}]: {e.detail}"
+            )
+
+    revision = write_revision(session)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "size_x": probe_data.x,
+            "size_y": probe_data.y,
+            "x": 0,
+            "y": 0,
+            "direction": probe_data.direction,
+        }
+        for probe_data in request.probes
+    ]
+    await _insert_probes(session, rows, revision)
+
+    if probe_store.enabled:
+        probe_store.add(ProbeState(**row, version=0, revision=revision) for row in rows)
+
+    return ORJSONResponse(
+        {"probes": [{key: row[key] for key in PROBE_FIELDS} for row in rows], "next_after": None},
+        status_code=HTTPStatus.CREATED,
     )
 
-    session.add(probe)
-    await session.commit()
-    await session.refresh(probe)
 
-    return ProbeResponse.model_validate(probe)
+@router.get(
+    "/",
+    response_model=ProbeListResponse,
+    responses={304: {"description": "Not Modified"}},
+)
+async def list_probes(
+    session: ReadSession,
+    params: Annotated[ProbeListParams, Query()],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """
+    List registered probes and their current positions, ordered by id.
+
+    - **min_x**, **max_x**, **min_y**, **max_y**: only probes inside this
+      rectangle (bounds are inclusive, any of them may be omitted)
+    - **direction**: only probes facing this direction
+    - **min_size_x**, **max_size_x**, **min_size_y**, **max_size_y**: only
+      probes whose grid size is within these ranges
+    - **after**: only list probes whose id comes after this one (keyset cursor)
+    - **limit**: maximum number of probes to return (default
+      DEFAULT_PAGE_SIZE, at most MAX_PAGE_SIZE); when more probes are
+      available, **next_after** holds the cursor of the next page
+    - **stream**: stream probes as NDJSON, one probe per line, straight from a
+      server-side cursor instead of building the whole list in memory; all
+      matching probes are streamed unless a **limit** is given
+    - **since**: only probes changed after this fleet **version**, as
+      returned by a previous listing. Probes changed by writes that were
+      still in flight at that version are listed again, so clients should
+      apply the changes by id. A version ahead of the current one (e.g.
+      read from another database) lists every probe.
+
+    Every launch and move writes a new revision (see `write_revision`), and
+    the fleet version (see `FleetVersion`) is sent as the `ETag`. A poll
+    with a matching `If-None-Match` gets a 304 after that single statement,
+    and listings of an unchanged fleet are served from an in-process cache
+    of serialized bodies.
+
+    Served by the read replica when one is configured; send the
+    `X-Read-Consistency: primary` header to read your own recent writes.
+    """
+    if params.stream:
+        return StreamingResponse(
+            _stream_probes(session, params), media_type="application/x-ndjson"
+        )
+
+    version = await fleet_version(session)
+    if params.since is not None and params.since > version.revision:
+        params = params.model_copy(update={"since": None})
+    etag = version.etag
+    if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+
+    key = params.model_dump_json()
+    body = listing_cache.get(version, key)
+    if body is None:
+        limit = params.limit or DEFAULT_PAGE_SIZE
+        rows = await _select_probes(session, params, limit + 1)
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1].id
 
+        body = orjson.dumps({
+            "probes": [_probe_fields(row) for row in rows],
+            "next_after": next_after,
+            "version": version.revision,
+        })
+        listing_cache.put(version, key, body)
 
-@router.get("/", response_model=ProbeListResponse)
-async def list_probes(session: Session):
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.put(
+    "/move",
+    response_model=ProbeBatchMoveResponse,
+    responses={
+        400: {"description": "Bad Request"}
+    }
+)
+async def move_many(request: ProbeBatchMoveRequest, session: Session):
+    """
+    Move many probes with the same sequence of commands.
+
+    - **probe_ids**: UUIDs of the probes to move
+    - **commands**: String of commands (M, L, R), applied to every probe
+
+    Each probe moves independently: a probe that would exceed its grid limits
+    (or collide, on a plateau) keeps its position and reports the index of
+    the first failing command in **failed_at**, while the other probes are
+    moved. Probes without a plateau are simulated together in vectorized
+    steps.
     """
-    List all registered probes and their current positions.
+    ProbeService.compile(request.commands)
+
+    probe_ids = list(dict.fromkeys(request.probe_ids))
+    with metrics.stage("fetch"):
+        rows = await _load_poses(session, probe_ids)
+
+    found = [rows[probe_id] for probe_id in probe_ids if probe_id in rows]
+    free = [row for row in found if row.plateau_id is None]
+    with metrics.stage("simulate"):
+        batch = BatchSimulator.from_probes(free).run(request.commands)
+
+    results = {probe_id: _not_found_result(probe_id) for probe_id in probe_ids}
+    moved = []
+    history = []
+    encoded = encode_commands(request.commands)
+    for i, row in enumerate(free):
+        failed_at = int(batch.failed_at[i])
+        if failed_at >= 0:
+            results[row.id] = _failed_result(row, GridLimitExceeded.detail, failed_at)
+            continue
+
+        pose = _pose(row, int(batch.x[i]), int(batch.y[i]), DIRECTIONS[batch.heading[i]])
+        moved.append(pose)
+        history.append(_history_entry(row, encoded, pose))
+        results[row.id] = _success_result(pose)
+
+    # Probes sharing a plateau can block each other, so they move one by one.
+    with metrics.stage("fetch"):
+        occupancies = await _occupancies(session, found)
+    paths = defaultdict(list)
+    async with _plateau_guard(session, occupancies):
+        for row in found:
+            if row.plateau_id is None:
+                continue
+
+            try:
+                x, y, direction = _simulate(
+                    row, row.x, row.y, row.direction, request.commands, occupancies[row.plateau_id]
+                )
+            except MoveFailed as e:
+                results[row.id] = _failed_result(row, e.detail, e.position)
+                continue
+
+            pose = _pose(row, x, y, direction)
+            moved.append(pose)
+            history.append(_history_entry(row, encoded, pose))
+            paths[row.plateau_id].append((row.x, row.y, row.direction, request.commands))
+            results[row.id] = _success_result(pose)
+
+    with metrics.stage("persist"):
+        async with _plateau_guard(session, occupancies):
+            await _save_poses(session, moved, history)
+        _record_coverage(paths)
+
+    with metrics.stage("serialize"):
+        return ProbeBatchMoveResponse(results=list(results.values()))
+
+
+@router.post(
+    "/moves",
+    response_model=ProbeBatchMoveResponse,
+)
+async def move_batch(request: ProbeMovesRequest, session: Session):
     """
-    result = await session.scalars(select(Probe))
-    probes = result.all()
-    
-    probes_list = [ProbeResponse.model_validate(p) for p in probes]
-    return ProbeListResponse(probes=probes_list)
+    Execute many probe moves in a single transaction.
+
+    - **moves**: list of moves, each with:
+        - **probe_id**: UUID of the probe to move
+        - **commands**: String of commands (M, L, R)
+
+    Moves are applied in order, so several moves of the same probe are
+    chained. A move that fails (unknown probe, invalid commands, grid limits
+    exceeded or collision on a plateau) is reported in its result and leaves the probe as it
+    was; the remaining moves are still applied.
+    """
+    with metrics.stage("fetch"):
+        rows = await _load_poses(session, {item.probe_id for item in request.moves})
+        occupancies = await _occupancies(session, rows.values())
+
+    poses = {
+        probe_id: _pose(row, row.x, row.y, row.direction)
+        for probe_id, row in rows.items()
+    }
+
+    results = []
+    moved = defaultdict(list)
+    paths = defaultdict(list)
+    async with _plateau_guard(session, occupancies):
+        for item in request.moves:
+            row = rows.get(item.probe_id)
+            if row is None:
+                results.append(_not_found_result(item.probe_id))
+                continue
+
+            pose = poses[item.probe_id]
+            try:
+                x, y, direction = _simulate(
+                    row,
+                    pose["x"],
+                    pose["y"],
+                    pose["direction"],
+                    item.commands,
+                    occupancies.get(row.plateau_id),
+                )
+            except HTTPException as e:
+                results.append(_failed_result(row, e.detail, pose=pose))
+                continue
+            except MoveFailed as e:
+                results.append(_failed_result(row, e.detail, e.position, pose))
+                continue
+
+            if row.plateau_id is not None:
+                paths[row.plateau_id].append((pose["x"], pose["y"], pose["direction"], item.commands))
+            pose.update(x=x, y=y, direction=direction)
+            moved[item.probe_id].append(item.commands)
+            results.append(_success_result(pose))
+
+    # Chained moves of a probe are saved, and recorded, as a single move.
+    history = [
+        _history_entry(rows[probe_id], encode_commands("".join(commands)), poses[probe_id])
+        for probe_id, commands in moved.items()
+    ]
+    with metrics.stage("persist"):
+        async with _plateau_guard(session, occupancies):
+            await _save_poses(session, [poses[probe_id] for probe_id in moved], history)
+        _record_coverage(paths)
+
+    with metrics.stage("serialize"):
+        return ProbeBatchMoveResponse(results=results)
+
+
+@router.post(
+    "/simulate",
+    response_model=ProbeSimulateResponse,
+    responses={
+        400: {"description": "Bad Request"}
+    }
+)
+async def simulate(request: ProbeSimulateRequest):
+    """
+    Dry-run a command string, without any probe or database access.
+
+    - **x**, **y**: grid size
+    - **start**: starting pose (**x**, **y**, **direction**)
+    - **commands**: String of commands (M, L, R)
+    - **sample_every**: when given, also return the **path**: the start pose
+      and the pose after every `sample_every` commands. The interval is
+      widened so that the path has at most MAX_PATH_SAMPLES poses (plus the
+      start and end ones); the one used is returned as **sample_every**
+
+    A script that would leave the grid is not an error: **success** is false,
+    **failed_at** is the index of the failing `M` and the pose is the start
+    pose, as it would be left by `PUT /probes/{probe_id}/move`.
+    """
+    _validate_probe_data(ProbeCreate(x=request.x, y=request.y, direction=request.start.direction))
+
+    start = request.start
+    if not (0 <= start.x <= request.x and 0 <= start.y <= request.y):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Start position must be inside the grid"
+        )
+
+    failed_at = detail = None
+    try:
+        x, y, direction = ProbeService.simulate(
+            start.x, start.y, start.direction, request.x, request.y, request.commands
+        )
+    except MoveFailed as e:
+        x, y, direction = start.x, start.y, start.direction
+        failed_at, detail = e.position, e.detail
+
+    path = every = None
+    if request.sample_every is not None:
+        length = len(request.commands) if failed_at is None else failed_at
+        every = max(request.sample_every, -(-length // MAX_PATH_SAMPLES))
+        path = [
+            ProbePose(x=px, y=py, direction=DIRECTIONS[heading])
+            for px, py, heading in sample_path(
+                request.commands,
+                start.x,
+                start.y,
+                HEADINGS[start.direction],
+                every,
+                failed_at,
+            )
+        ]
+
+    return ProbeSimulateResponse(
+        success=failed_at is None,
+        x=x,
+        y=y,
+        direction=direction,
+        failed_at=failed_at,
+        detail=detail,
+        path=path,
+        sample_every=every,
+    )
 
 
 @router.put(
     "/{probe_id}/move", 
     response_model=ProbeResponse,
     responses={
+        202: {"model": MoveJobResponse, "description": "Accepted, with async=true"},
         400: {"description": "Bad Request"},
-        404: {"description": "Not Foud"}
+        404: {"description": "Not Foud"},
+        409: {"description": "Conflict"}
     }
 )
 async def move(
     probe_id: str,
     request: ProbeMoveRequest,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    run_async: Annotated[bool, Query(alias="async")] = False,
+    sessions=Depends(get_session_factory),
 ):
     """
     Move an existing probe following a sequence of commands.
@@ -106,6 +490,21 @@ async def move(
         - **M**: move forward one unit in the current direction
         - **L**: rotate left 90 degrees
         - **R**: rotate right 90 degrees
+
+    Probes launched on a plateau also stop with a 400 when a move would
+    enter a cell taken by an obstacle or another probe.
+
+    The new position is computed from the fetched row and written with a
+    single UPDATE ... RETURNING, as a compare-and-swap on the probe version
+    and without row locks. If another move lands in between, the commands are
+    re-applied on the fresh position, up to MOVE_MAX_ATTEMPTS times. On a
+    plateau, a row read before a concurrent move reserved the probe's new
+    cell is stale too: the occupancy index is rebuilt and the move retried.
+
+    With **async=true**, long scripts are run as a job instead: the commands
+    are validated, a 202 is returned right away with the job, whose progress
+    is available at `GET /jobs/{id}`, and the probe pose is saved once at
+    the end. A probe moved by another request meanwhile fails the job.
     """
     try:
         probe_id = uuid.UUID(probe_id)
@@ -115,20 +514,838 @@ async def move(
             detail="Invalid probe ID format"
         )
 
-    probe = await session.scalar(select(Probe).where(Probe.id == probe_id))
+    if run_async:
+        return await _submit_move_job(session, sessions, probe_id, request.commands)
+
+    for _ in range(MOVE_MAX_ATTEMPTS):
+        with metrics.stage("fetch"):
+            row = (await _load_poses(session, [probe_id])).get(probe_id)
+            if not row:
+                raise HTTPException(
+                    status_code=HTTPStatus.NOT_FOUND,
+                    detail="Probe not found"
+                )
+
+            occupancy = await _occupancy(session, row)
+
+        try:
+            x, y, direction = _simulate(
+                row, row.x, row.y, row.direction, request.commands, occupancy
+            )
+        except MoveFailed as e:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=str(e)
+            )
+        except StaleIndex:
+            plateau_indexes.invalidate(row.plateau_id)
+            continue
+
+        with metrics.stage("persist"):
+            history = _history_entry(
+                row, encode_commands(request.commands), _pose(row, x, y, direction)
+            )
+            async with _plateau_guard(session, [row.plateau_id]):
+                probe = await _compare_and_swap(session, row, x, y, direction, history)
+
+            if probe:
+                _record_coverage({row.plateau_id: [(row.x, row.y, row.direction, request.commands)]})
+
+        if probe:
+            with metrics.stage("serialize"):
+                return _probe_json(probe)
+
+        if occupancy is not None:
+            # The cell reserved by this move may be taken by the one that won.
+            plateau_indexes.invalidate(row.plateau_id)
+
+    raise HTTPException(
+        status_code=HTTPStatus.CONFLICT,
+        detail="Probe was moved concurrently, please retry."
+    )
+
+
+@router.put(
+    "/{probe_id}/move/stream",
+    response_model=ProbeResponse,
+    responses={
+        400: {"description": "Bad Request"},
+        404: {"description": "Not Foud"},
+        409: {"description": "Conflict"}
+    },
+    openapi_extra={
+        "requestBody": {"content": {"text/plain": {"schema": {"type": "string"}}}, "required": True}
+    },
+)
+async def move_stream(probe_id: str, request: Request, session: Session):
+    """
+    Move a probe with a command string sent as a raw, possibly chunked,
+    text/plain body instead of JSON.
+
+    Commands are validated and executed chunk by chunk as the body is
+    received, so very long scripts are never held in memory, and the move
+    is rejected with a 400 at the first invalid character or failing move,
+    reporting its position. No transaction is held while the body is
+    received. On a plateau the start cell stays reserved meanwhile (see
+    `OwnCellView`). The body cannot be replayed, so a concurrent move of
+    the same probe, or of another probe into the final cell, is reported
+    as a 409 instead of being retried.
+    """
+    probe_id = _parse_probe_id(probe_id)
+
+    row = (await _load_poses(session, [probe_id])).get(probe_id)
+    if not row:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Probe not found"
+        )
+
+    occupancy = await _occupancy(session, row)
+    stream = CommandStream(
+        row.x,
+        row.y,
+        HEADINGS[row.direction],
+        row.size_x,
+        row.size_y,
+        OwnCellView(occupancy, row.x, row.y) if occupancy is not None else None,
+        trace=ChunkedBitmap() if occupancy is not None else None,
+    )
+
+    # No transaction stays open while the body is received.
+    await session.rollback()
+    try:
+        async for chunk in request.stream():
+            stream.feed(chunk)
+    except (InvalidCommand, MoveFailed) as e:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not stream.length:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Field 'commands' is required and must be a non-empty string.",
+        )
+
+    metrics.observe_commands(stream.length)
+    x, y, direction = stream.x, stream.y, DIRECTIONS[stream.heading]
+    if occupancy is not None:
+        async with _plateau_guard(session, [row.plateau_id]):
+            occupancy.move((row.x, row.y), (x, y))
+
+    history = _history_entry(row, stream.encoded, _pose(row, x, y, direction))
+    async with _plateau_guard(session, [row.plateau_id]):
+        probe = await _compare_and_swap(session, row, x, y, direction, history)
+
     if not probe:
+        if occupancy is not None:
+            plateau_indexes.invalidate(row.plateau_id)
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Probe was moved concurrently, please retry."
+        )
+
+    if row.plateau_id is not None:
+        coverage_store.merge(row.plateau_id, stream.trace)
+
+    return _probe_json(probe)
+
+
+@router.post(
+    "/{probe_id}/plan",
+    response_model=ProbePlanResponse,
+    responses={
+        400: {"description": "Bad Request"},
+        404: {"description": "Not Foud"},
+        422: {"description": "Unprocessable Entity"}
+    }
+)
+async def plan(probe_id: str, request: ProbePlanRequest, session: Session):
+    """
+    Compute the shortest command string taking a probe to a target pose.
+
+    - **probe_id**: UUID of the probe
+    - **x**, **y**: target position, inside the probe's grid
+    - **direction**: target direction (NORTH, EAST, SOUTH, WEST)
+
+    The probe is not moved: the returned **commands** can be sent to
+    `PUT /probes/{probe_id}/move`. On a plateau the route goes around the
+    obstacles; other probes may still be in the way when it is executed.
+    A search around obstacles that gives up before finding a route, or
+    proving there is none, is reported as a 422.
+    """
+    try:
+        probe_id = uuid.UUID(probe_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid probe ID format"
+        )
+
+    if request.direction not in DIRECTIONS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f"Direction must be one of {DIRECTIONS}"
+        )
+
+    row = (await _load_poses(session, [probe_id])).get(probe_id)
+    if not row:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail="Probe not found"
         )
 
+    if not (0 <= request.x <= row.size_x and 0 <= request.y <= row.size_y):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Target position is outside the grid"
+        )
+
     try:
-        ProbeService.execute_commands(probe, request.commands)
-    except HTTPException as e:
-        raise e
+        commands = await path_planner.plan(
+            session,
+            pose_of(row.x, row.y, row.direction),
+            pose_of(request.x, request.y, request.direction),
+            row.size_x,
+            row.size_y,
+            row.plateau_id,
+        )
+    except NoPathFound:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Target pose is unreachable"
+        )
+    except SearchBudgetExceeded:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="No route found within the search budget"
+        )
+
+    return ProbePlanResponse(id=probe_id, commands=commands, length=len(commands))
+
+
+@router.get(
+    "/{probe_id}/history",
+    response_model=ProbeHistoryResponse,
+    responses={
+        400: {"description": "Bad Request"},
+        404: {"description": "Not Foud"}
+    }
+)
+async def history(
+    probe_id: str,
+    session: ReadSession,
+    params: Annotated[ProbeHistoryParams, Query()],
+):
+    """
+    List the saved moves of a probe, oldest first.
+
+    - **after**: only return moves with a greater sequence number; pass the
+      `next_after` of the previous page to get the next one
+    - **limit**: maximum number of moves to return (default 100)
+
+    Each move has its sequence number (the probe version it produced), its
+    commands and the poses before and after it. Moves chained in one
+    `POST /probes/moves` request are recorded as a single move.
+    """
+    probe_id = _parse_probe_id(probe_id)
+
+    query = (
+        select(ProbeMove)
+        .where(ProbeMove.probe_id == probe_id)
+        .order_by(ProbeMove.seq)
+        .limit(params.limit + 1)
+    )
+    if params.after is not None:
+        query = query.where(ProbeMove.seq > params.after)
+
+    entries = [_as_entry(move) for move in await session.scalars(query)]
+    if probe_store.enabled:
+        entries += [
+            entry for entry in probe_store.pending_history(probe_id)
+            if params.after is None or entry["seq"] > params.after
+        ]
+        entries = sorted(entries, key=lambda entry: entry["seq"])[:params.limit + 1]
+
+    if not entries and not await _probe_exists(session, probe_id):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Probe not found"
+        )
+
+    next_after = None
+    if len(entries) > params.limit:
+        entries = entries[:params.limit]
+        next_after = entries[-1]["seq"]
+
+    return ProbeHistoryResponse(moves=[_history_item(entry) for entry in entries], next_after=next_after)
+
+
+@router.get(
+    "/{probe_id}/history/{seq}",
+    response_model=ProbeHistoryItem,
+    responses={
+        400: {"description": "Bad Request"},
+        404: {"description": "Not Foud"}
+    }
+)
+async def history_move(probe_id: str, seq: int, session: ReadSession):
+    """
+    Get one saved move of a probe.
+
+    Every move stores the pose it ended at, so this is also the pose of the
+    probe at sequence **seq**, found without replaying earlier moves.
+    """
+    probe_id = _parse_probe_id(probe_id)
+
+    move = await session.get(ProbeMove, (probe_id, seq))
+    if move is not None:
+        return _history_item(_as_entry(move))
+
+    if probe_store.enabled:
+        for entry in probe_store.pending_history(probe_id):
+            if entry["seq"] == seq:
+                return _history_item(entry)
+
+    raise HTTPException(
+        status_code=HTTPStatus.NOT_FOUND,
+        detail="Move not found"
+    )
+
+
+def _parse_probe_id(probe_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(probe_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid probe ID format"
+        )
+
+
+async def _probe_exists(session: AsyncSession, probe_id: uuid.UUID) -> bool:
+    if probe_store.enabled:
+        return bool(probe_store.get_many([probe_id]))
+    return await session.scalar(select(Probe.id).where(Probe.id == probe_id)) is not None
+
+
+def _as_entry(move: ProbeMove) -> dict:
+    return {column: getattr(move, column) for column in ProbeMove.__table__.columns.keys()}
+
+
+def _validate_probe_data(probe_data: ProbeCreate) -> None:
+    if not isinstance(probe_data.x, int) or probe_data.x < 0:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="X must be a non-negative integer"
+        )
+
+    if not isinstance(probe_data.y, int) or probe_data.y < 0:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Y must be a non-negative integer"
+        )
+
+    if probe_data.direction not in DIRECTIONS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f"Direction must be one of {DIRECTIONS}"
+        )
+
+
+async def _insert_probes(session: AsyncSession, rows: list[dict], revision) -> None:
+    """
+    Insert many probes, all written with `revision` (see `write_revision`),
+    in one round trip: COPY on asyncpg, a multi-row executemany INSERT on
+    every other driver. COPY only takes values, so there the revision of
+    the transaction is read first.
+    """
+    connection = await session.connection()
+
+    if connection.dialect.driver == "asyncpg":
+        if not isinstance(revision, int):
+            revision = await session.scalar(select(revision))
+        rows = [{**row, "revision": revision} for row in rows]
+        columns = list(rows[0])
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Probe.__tablename__,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await session.execute(insert(Probe).values(revision=revision), rows)
 
-    session.add(probe)
     await session.commit()
-    await session.refresh(probe)
 
-    return ProbeResponse.model_validate(probe)
+
+_FILTER_COLUMNS = {
+    "x": Probe.x,
+    "y": Probe.y,
+    "size_x": Probe.size_x,
+    "size_y": Probe.size_y,
+}
+
+
+def _apply_filters(query, filters: ProbeListParams):
+    for name, column in _FILTER_COLUMNS.items():
+        lower = getattr(filters, f"min_{name}")
+        upper = getattr(filters, f"max_{name}")
+        if lower is not None:
+            query = query.where(column >= lower)
+        if upper is not None:
+            query = query.where(column <= upper)
+
+    if filters.direction is not None:
+        query = query.where(Probe.direction == filters.direction)
+
+    return query
+
+
+def _list_query(params: ProbeListParams, limit: int = None):
+    query = select(Probe.id, Probe.x, Probe.y, Probe.direction).order_by(Probe.id)
+    query = _apply_filters(query, params)
+    if params.after is not None:
+        query = query.where(Probe.id > params.after)
+    if params.since is not None:
+        query = query.where(Probe.revision > params.since)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+async def _select_probes(session: AsyncSession, params: ProbeListParams, limit: int = None) -> list:
+    if probe_store.enabled:
+        return list(probe_store.select(params, limit))
+
+    return (await session.execute(_list_query(params, limit))).all()
+
+
+async def _stream_probes(session: AsyncSession, params: ProbeListParams):
+    if probe_store.enabled:
+        for state in probe_store.select(params, params.limit):
+            yield orjson.dumps(_probe_fields(state)) + b"\n"
+        return
+
+    query = _list_query(params, params.limit)
+    result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for row in result:
+        yield orjson.dumps(_probe_fields(row)) + b"\n"
+
+
+async def _load_poses(session: AsyncSession, probe_ids) -> dict:
+    """Fetch the pose, grid size and version of many probes with a single IN query."""
+    if probe_store.enabled:
+        return probe_store.get_many(probe_ids)
+
+    result = await session.execute(
+        select(
+            Probe.id,
+            Probe.x,
+            Probe.y,
+            Probe.direction,
+            Probe.size_x,
+            Probe.size_y,
+            Probe.version,
+            Probe.plateau_id,
+        ).where(Probe.id.in_(probe_ids))
+    )
+    return {row.id: row for row in result}
+
+
+async def _compare_and_swap(
+    session: AsyncSession,
+    row,
+    x: int,
+    y: int,
+    direction: str,
+    history: dict,
+):
+    """
+    Write a new pose only if the probe still has the version it was read
+    with, along with its `history` row. Returns the updated row, or None
+    when another write got there first.
+    """
+    if probe_store.enabled:
+        probe = probe_store.compare_and_swap(row, x, y, direction)
+        if probe:
+            probe_store.append_history([history])
+        return probe
+
+    result = await session.execute(
+        update(Probe)
+        .where(Probe.id == row.id, Probe.version == row.version)
+        .values(
+            x=x,
+            y=y,
+            direction=direction,
+            version=Probe.version + 1,
+            revision=write_revision(session),
+        )
+        .returning(Probe.id, Probe.x, Probe.y, Probe.direction)
+    )
+    probe = result.one_or_none()
+    if probe:
+        await session.execute(insert(ProbeMove).values(**history))
+    await session.commit()
+    return probe
+
+
+async def _save_poses(session: AsyncSession, poses: list[dict], history: list[dict]) -> None:
+    """
+    Persist many new poses with one executemany UPDATE, and their `history`
+    rows with one executemany INSERT. Each pose carries the version it was
+    read with; if any probe changed meanwhile the whole batch is rolled back
+    (see `_update_poses`).
+
+    Probes on a plateau are first detached from it, so that probes trading
+    cells within the batch never trip the unique position constraint midway.
+    """
+    if probe_store.enabled:
+        if not probe_store.save_many(poses):
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="Probes were moved concurrently, please retry."
+            )
+        probe_store.append_history(history)
+        return
+
+    if poses:
+        table = Probe.__table__
+        on_plateau = [pose for pose in poses if pose["plateau_id"] is not None]
+        if on_plateau:
+            await session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"), table.c.version == bindparam("b_version"))
+                .values(plateau_id=None),
+                [{"b_id": pose["id"], "b_version": pose["version"]} for pose in on_plateau],
+            )
+
+        if not await _update_poses(session, poses, write_revision(session)):
+            await session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="Probes were moved concurrently, please retry."
+            )
+
+        await session.execute(insert(ProbeMove), history)
+
+    await session.commit()
+
+
+async def _update_poses(session: AsyncSession, poses: list[dict], revision) -> bool:
+    """
+    Write `poses`, with `revision` (see `write_revision`), where the probe
+    still has the version the pose was read with, and return whether every
+    one of them was written.
+
+    asyncpg does not report executemany row counts, so on PostgreSQL the
+    poses are joined as a VALUES list, SAVE_BATCH_SIZE at a time, and the
+    ids the UPDATE returns are compared with the expected ones. SQLite
+    cannot name the columns of a VALUES alias, but does report the row
+    count of an executemany.
+    """
+    table = Probe.__table__
+    if session.bind.dialect.name != "postgresql":
+        result = await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.version == bindparam("b_version"))
+            .values(
+                x=bindparam("b_x"),
+                y=bindparam("b_y"),
+                direction=bindparam("b_direction"),
+                plateau_id=bindparam("b_plateau_id"),
+                version=table.c.version + 1,
+                revision=revision,
+            ),
+            [{f"b_{key}": value for key, value in pose.items()} for pose in poses],
+        )
+        return result.rowcount == len(poses)
+
+    updated = set()
+    for start in range(0, len(poses), SAVE_BATCH_SIZE):
+        result = await session.execute(
+            _update_poses_statement(poses[start:start + SAVE_BATCH_SIZE], revision)
+        )
+        updated.update(result.scalars())
+    return updated == {pose["id"] for pose in poses}
+
+
+def _update_poses_statement(poses: list[dict], revision):
+    table = Probe.__table__
+    rows = values(
+        column("id", table.c.id.type),
+        column("version", table.c.version.type),
+        column("x", table.c.x.type),
+        column("y", table.c.y.type),
+        column("direction", table.c.direction.type),
+        column("plateau_id", table.c.plateau_id.type),
+        name="poses",
+    ).data([
+        (pose["id"], pose["version"], pose["x"], pose["y"], pose["direction"], pose["plateau_id"])
+        for pose in poses
+    ])
+    return (
+        update(table)
+        .where(table.c.id == rows.c.id, table.c.version == rows.c.version)
+        .values(
+            x=rows.c.x,
+            y=rows.c.y,
+            direction=rows.c.direction,
+            plateau_id=rows.c.plateau_id,
+            version=table.c.version + 1,
+            revision=revision,
+        )
+        .returning(table.c.id)
+    )
+
+
+async def _occupancy(session: AsyncSession, row) -> Optional[OccupancyIndex]:
+    if row.plateau_id is None:
+        return None
+    return await plateau_indexes.get(session, row.plateau_id)
+
+
+async def _occupancies(session: AsyncSession, rows) -> dict:
+    """Occupancy index of every plateau the given probes are on."""
+    plateau_ids = {row.plateau_id for row in rows if row.plateau_id is not None}
+    return {
+        plateau_id: await plateau_indexes.get(session, plateau_id)
+        for plateau_id in plateau_ids
+    }
+
+
+def _simulate(row, x: int, y: int, direction: str, commands: str, occupancy):
+    """
+    Run commands for the probe in `row` starting at the given pose. On a
+    plateau, the probe's cell is left out of the index while simulating and
+    then moved to the final position, reserving it until the move is saved.
+    """
+    if occupancy is None:
+        return ProbeService.simulate(x, y, direction, row.size_x, row.size_y, commands)
+
+    occupancy.remove(x, y)
+    try:
+        new_x, new_y, new_direction = ProbeService.simulate(
+            x, y, direction, row.size_x, row.size_y, commands, occupancy
+        )
+    except Exception:
+        occupancy.add(x, y)
+        raise
+
+    occupancy.add(new_x, new_y)
+    return new_x, new_y, new_direction
+
+
+@asynccontextmanager
+async def _plateau_guard(session: AsyncSession, plateau_ids):
+    """
+    Drop the cached occupancy of the given plateaus when simulating or saving
+    fails, since cells were already reserved for moves that did not happen.
+    A probe moved by a concurrent request (see `StaleIndex`), or a final
+    position taken in the database meanwhile, surfaces as a 409.
+    """
+    try:
+        yield
+    except Exception as e:
+        for plateau_id in plateau_ids:
+            if plateau_id is not None:
+                plateau_indexes.invalidate(plateau_id)
+
+        if isinstance(e, StaleIndex):
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="Probes were moved concurrently, please retry."
+            )
+        if isinstance(e, IntegrityError):
+            await session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="Probe position was taken concurrently, please retry."
+            )
+        raise
+
+
+def _record_coverage(paths: dict) -> None:
+    """Mark the cells crossed by saved moves, grouped by plateau, as covered."""
+    for plateau_id, plateau_paths in paths.items():
+        if plateau_id is not None:
+            coverage_store.record(plateau_id, plateau_paths)
+
+
+def _history_entry(row, encoded_commands: str, pose: dict) -> dict:
+    """`ProbeMove` row of a move from the pose in `row` to `pose`."""
+    return {
+        "probe_id": row.id,
+        "seq": row.version + 1,
+        "commands": encoded_commands,
+        "start_x": row.x,
+        "start_y": row.y,
+        "start_direction": row.direction,
+        "end_x": pose["x"],
+        "end_y": pose["y"],
+        "end_direction": pose["direction"],
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _history_item(entry) -> ProbeHistoryItem:
+    return ProbeHistoryItem(
+        seq=entry["seq"],
+        commands=decode_commands(entry["commands"]),
+        start=ProbePose(x=entry["start_x"], y=entry["start_y"], direction=entry["start_direction"]),
+        end=ProbePose(x=entry["end_x"], y=entry["end_y"], direction=entry["end_direction"]),
+        created_at=entry["created_at"],
+    )
+
+
+def _pose(row, x: int, y: int, direction: str) -> dict:
+    return {
+        "id": row.id,
+        "x": x,
+        "y": y,
+        "direction": direction,
+        "version": row.version,
+        "plateau_id": row.plateau_id,
+    }
+
+
+def _probe_fields(row) -> dict:
+    return {"id": row.id, "x": row.x, "y": row.y, "direction": row.direction}
+
+
+def _probe_json(row, status_code: int = HTTPStatus.OK) -> ORJSONResponse:
+    """
+    `ProbeResponse` body of a row, serialized with orjson. Returning a
+    response skips the `response_model` validation of FastAPI: rows come
+    from the database or the store, so they already have the right types.
+    """
+    return ORJSONResponse(_probe_fields(row), status_code=status_code)
+
+
+def _not_found_result(probe_id: uuid.UUID) -> ProbeMoveResult:
+    return ProbeMoveResult(id=probe_id, success=False, detail="Probe not found")
+
+
+def _success_result(pose: dict) -> ProbeMoveResult:
+    return ProbeMoveResult(
+        id=pose["id"],
+        success=True,
+        x=pose["x"],
+        y=pose["y"],
+        direction=pose["direction"],
+    )
+
+
+def _failed_result(row, detail: str, failed_at: int = None, pose: dict = None) -> ProbeMoveResult:
+    pose = pose or {"x": row.x, "y": row.y, "direction": row.direction}
+    return ProbeMoveResult(
+        id=row.id,
+        success=False,
+        x=pose["x"],
+        y=pose["y"],
+        direction=pose["direction"],
+        detail=detail,
+        failed_at=failed_at,
+    )
+
+
+async def _submit_move_job(session: AsyncSession, sessions, probe_id: uuid.UUID, commands: str):
+    ProbeService.validate_commands(commands)
+    if not await _probe_exists(session, probe_id):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Probe not found"
+        )
+
+    job = MoveJob(probe_id, len(commands))
+    move_jobs.submit(job, lambda job: _run_move_job(job, sessions, commands))
+    return ORJSONResponse(
+        MoveJobResponse.model_validate(job).model_dump(mode="json"),
+        status_code=HTTPStatus.ACCEPTED,
+    )
+
+
+async def _run_move_job(job: MoveJob, sessions, commands: str) -> None:
+    """
+    Run a move job: simulate the script in chunks of JOB_CHUNK_SIZE commands,
+    recording progress after each, then save the pose like `move` does.
+    Probes without a plateau are simulated in the worker processes; probes
+    on a plateau need the live occupancy index, so their chunks run here
+    like `move_stream` does, yielding to other requests in between.
+    """
+    async with sessions() as session:
+        row = (await _load_poses(session, [job.probe_id])).get(job.probe_id)
+        if not row:
+            job.fail("Probe not found")
+            return
+
+        occupancy = await _occupancy(session, row)
+        # No transaction stays open while the script runs.
+        await session.rollback()
+
+        if occupancy is None:
+            x, y, direction, encoded = await _simulate_job(job, row, commands)
+            trace = None
+        else:
+            try:
+                x, y, direction, encoded, trace = await _simulate_job_on_plateau(
+                    job, row, commands, occupancy
+                )
+            except StaleIndex:
+                plateau_indexes.invalidate(row.plateau_id)
+                job.fail("Probe was moved while the job was running.")
+                return
+
+        history = _history_entry(row, encoded, _pose(row, x, y, direction))
+        async with _plateau_guard(session, [row.plateau_id]):
+            probe = await _compare_and_swap(session, row, x, y, direction, history)
+
+        if not probe:
+            if occupancy is not None:
+                plateau_indexes.invalidate(row.plateau_id)
+            job.fail("Probe was moved while the job was running.")
+            return
+
+        if trace is not None:
+            coverage_store.merge(row.plateau_id, trace)
+        job.succeed(x, y, direction)
+
+
+async def _simulate_job(job: MoveJob, row, commands: str):
+    x, y, heading = row.x, row.y, HEADINGS[row.direction]
+    parts = []
+    for offset in range(0, len(commands), JOB_CHUNK_SIZE):
+        chunk = commands[offset:offset + JOB_CHUNK_SIZE]
+        x, y, heading, failure, encoded = await move_jobs.run_in_process(
+            simulate_chunk, x, y, heading, row.size_x, row.size_y, chunk
+        )
+        if failure is not None:
+            raise chunk_failure(failure, offset)
+
+        append_encoded(parts, encoded)
+        job.progress(offset + len(chunk), x, y, DIRECTIONS[heading])
+
+    return x, y, DIRECTIONS[heading], "".join(parts)
+
+
+async def _simulate_job_on_plateau(job: MoveJob, row, commands: str, occupancy: OccupancyIndex):
+    stream = CommandStream(
+        row.x,
+        row.y,
+        HEADINGS[row.direction],
+        row.size_x,
+        row.size_y,
+        OwnCellView(occupancy, row.x, row.y),
+        trace=ChunkedBitmap(),
+    )
+
+    for offset in range(0, len(commands), JOB_CHUNK_SIZE):
+        # Commands were validated, so they are ASCII.
+        stream.feed(commands[offset:offset + JOB_CHUNK_SIZE].encode())
+        job.progress(stream.length, stream.x, stream.y, DIRECTIONS[stream.heading])
+        await asyncio.sleep(0)
+
+    occupancy.move((row.x, row.y), (stream.x, stream.y))
+    return stream.x, stream.y, DIRECTIONS[stream.heading], stream.encoded, stream.trace
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+
+class PoolStatus(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    waiters: Optional[int] = None
+    checkouts: Optional[int] = None
+    wait_time: Optional[float] = None
+    max_wait_time: Optional[float] = None
+
+
+class PoolStatusResponse(BaseModel):
+    pools: Dict[str, PoolStatus] = Field(default_factory=dict)
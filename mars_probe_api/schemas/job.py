@@ -0,0 +1,23 @@
+import uuid
+
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+
+class MoveJobResponse(BaseModel):
+    id: uuid.UUID
+    probe_id: uuid.UUID
+    status: Literal["queued", "running", "succeeded", "failed"]
+    total: int
+    done: int
+    x: Optional[int] = None
+    y: Optional[int] = None
+    direction: Optional[str] = None
+    detail: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,35 @@
+import uuid
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class Cell(BaseModel):
+    x: int
+    y: int
+
+
+class PlateauCreate(BaseModel):
+    x: int
+    y: int
+    obstacles: List[Cell] = Field(default_factory=list)
+
+
+class PlateauResponse(BaseModel):
+    id: uuid.UUID
+    x: int
+    y: int
+    obstacles: List[Cell] = Field(default_factory=list)
+
+
+class PlateauProbeCreate(BaseModel):
+    direction: str
+
+
+class PlateauCoverageResponse(BaseModel):
+    id: uuid.UUID
+    total_cells: int
+    free_cells: int
+    covered_cells: int
+    coverage: float
+    chunks: int
+    stored_bytes: int
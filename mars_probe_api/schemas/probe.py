@@ -1,6 +1,7 @@
 import uuid
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Literal, List
+from typing import Literal, List, Optional
 
 
 class ProbeCreate(BaseModel):
@@ -9,6 +10,10 @@ class ProbeCreate(BaseModel):
     direction: str
 
 
+class ProbeBatchCreate(BaseModel):
+    probes: List[ProbeCreate] = Field(min_length=1)
+
+
 class ProbeResponse(BaseModel):
     id: uuid.UUID
     x: int
@@ -22,7 +27,117 @@ class ProbeResponse(BaseModel):
 
 class ProbeListResponse(BaseModel):
     probes: List[ProbeResponse] = Field(default_factory=list)
+    next_after: Optional[uuid.UUID] = None
+    # Fleet version the listing was read at, to pass as `since` next time.
+    version: Optional[int] = None
+
+
+# Page size of GET /probes without a `limit`, and the largest one allowed.
+DEFAULT_PAGE_SIZE = 1_000
+MAX_PAGE_SIZE = 10_000
+
+
+class ProbeListParams(BaseModel):
+    min_x: Optional[int] = Field(default=None, ge=0)
+    max_x: Optional[int] = Field(default=None, ge=0)
+    min_y: Optional[int] = Field(default=None, ge=0)
+    max_y: Optional[int] = Field(default=None, ge=0)
+    direction: Optional[Literal["NORTH", "EAST", "SOUTH", "WEST"]] = None
+    min_size_x: Optional[int] = Field(default=None, ge=0)
+    max_size_x: Optional[int] = Field(default=None, ge=0)
+    min_size_y: Optional[int] = Field(default=None, ge=0)
+    max_size_y: Optional[int] = Field(default=None, ge=0)
+    after: Optional[uuid.UUID] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=MAX_PAGE_SIZE)
+    stream: bool = False
+    since: Optional[int] = Field(default=None, ge=0)
 
 
 class ProbeMoveRequest(BaseModel):
     commands: str
+
+
+class ProbeBatchMoveRequest(BaseModel):
+    probe_ids: List[uuid.UUID] = Field(min_length=1)
+    commands: str
+
+
+class ProbeMoveItem(BaseModel):
+    probe_id: uuid.UUID
+    commands: str
+
+
+class ProbeMovesRequest(BaseModel):
+    moves: List[ProbeMoveItem] = Field(min_length=1)
+
+
+class ProbeMoveResult(BaseModel):
+    id: uuid.UUID
+    success: bool
+    x: Optional[int] = None
+    y: Optional[int] = None
+    direction: Optional[str] = None
+    detail: Optional[str] = None
+    failed_at: Optional[int] = None
+
+
+class ProbeBatchMoveResponse(BaseModel):
+    results: List[ProbeMoveResult] = Field(default_factory=list)
+
+
+class ProbePlanRequest(BaseModel):
+    x: int
+    y: int
+    direction: str
+
+
+class ProbePlanResponse(BaseModel):
+    id: uuid.UUID
+    commands: str
+    length: int
+
+
+MAX_HISTORY_PAGE_SIZE = 1_000
+
+
+class ProbeHistoryParams(BaseModel):
+    after: Optional[int] = Field(default=None, ge=0)
+    limit: int = Field(default=100, ge=1, le=MAX_HISTORY_PAGE_SIZE)
+
+
+class ProbePose(BaseModel):
+    x: int
+    y: int
+    direction: str
+
+
+class ProbeHistoryItem(BaseModel):
+    seq: int
+    commands: str
+    start: ProbePose
+    end: ProbePose
+    created_at: datetime
+
+
+class ProbeHistoryResponse(BaseModel):
+    moves: List[ProbeHistoryItem] = Field(default_factory=list)
+    next_after: Optional[int] = None
+
+
+class ProbeSimulateRequest(BaseModel):
+    x: int
+    y: int
+    start: ProbePose
+    commands: str
+    sample_every: Optional[int] = Field(default=None, ge=1)
+
+
+class ProbeSimulateResponse(BaseModel):
+    success: bool
+    x: int
+    y: int
+    direction: str
+    failed_at: Optional[int] = None
+    detail: Optional[str] = None
+    path: Optional[List[ProbePose]] = None
+    sample_every: Optional[int] = None
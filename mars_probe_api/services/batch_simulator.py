@@ -0,0 +1,81 @@
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.command_compiler import HEADING_DELTAS
+from mars_probe_api.services.probe_service import HEADINGS, ProbeService
+
+
+_DX = np.array([dx for dx, _ in HEADING_DELTAS], dtype=np.int64)
+_DY = np.array([dy for _, dy in HEADING_DELTAS], dtype=np.int64)
+
+
+class BatchResult(NamedTuple):
+    """
+    Final poses of a batch. `failed_at` holds, for each probe, the index of
+    the first `M` that would leave the grid, or -1 when the probe succeeded.
+    Failed probes keep their initial pose, like `ProbeService.execute_commands`.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    heading: np.ndarray
+    failed_at: np.ndarray
+
+
+class BatchSimulator:
+    """
+    Applies one command string to many probes at once.
+
+    Poses are held as NumPy arrays and the program is executed run by run
+    (see `command_compiler`), each run being a handful of vectorized
+    operations over the whole fleet.
+    """
+
+    def __init__(self, x, y, heading, size_x, size_y):
+        self.x = np.asarray(x, dtype=np.int64)
+        self.y = np.asarray(y, dtype=np.int64)
+        self.heading = np.asarray(heading, dtype=np.int64)
+        self.size_x = np.asarray(size_x, dtype=np.int64)
+        self.size_y = np.asarray(size_y, dtype=np.int64)
+
+    @classmethod
+    def from_probes(cls, probes: Sequence[Probe]) -> "BatchSimulator":
+        return cls(
+            [p.x for p in probes],
+            [p.y for p in probes],
+            [HEADINGS[p.direction] for p in probes],
+            [p.size_x for p in probes],
+            [p.size_y for p in probes],
+        )
+
+    def run(self, commands: str) -> BatchResult:
+        program = ProbeService.compile(commands)
+
+        x, y, heading = self.x.copy(), self.y.copy(), self.heading.copy()
+        failed_at = np.full(x.shape, -1, dtype=np.int64)
+        alive = np.ones(x.shape, dtype=bool)
+
+        for offset, turn, steps in program.runs:
+            heading = (heading + turn) % 4
+            if not steps:
+                continue
+
+            new_x = x + _DX[heading] * steps
+            new_y = y + _DY[heading] * steps
+
+            out = alive & (
+                (new_x < 0) | (new_x > self.size_x) | (new_y < 0) | (new_y > self.size_y)
+            )
+            if out.any():
+                room = np.choose(heading, [self.size_y - y, self.size_x - x, y, x])
+                failed_at[out] = offset + np.maximum(room[out], 0)
+                alive &= ~out
+
+            x = np.where(alive, new_x, x)
+            y = np.where(alive, new_y, y)
+
+        failed = ~alive
+        x[failed], y[failed], heading[failed] = self.x[failed], self.y[failed], self.heading[failed]
+
+        return BatchResult(x, y, heading, failed_at)
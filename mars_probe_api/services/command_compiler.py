@@ -0,0 +1,349 @@
+import re
+from typing import NamedTuple, Optional, Protocol
+
+
+# (dx, dy) for each heading index, in the same order as DIRECTIONS:
+# NORTH, EAST, SOUTH, WEST.
+HEADING_DELTAS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# Length from which `CommandStream` stops merging encoded chunks together.
+ENCODED_PART_SIZE = 4096
+
+_RUN_PATTERN = re.compile(r"([LR]*)(M*)")
+_REPEAT_PATTERN = re.compile(r"M+|L+|R+")
+_ENCODED_PATTERN = re.compile(r"(\d*)([MLR])")
+_LAST_ENCODED_PATTERN = re.compile(r"(\d*)([MLR])$")
+_INVALID_PATTERN = re.compile(r"[^MLR]")
+
+
+class CommandRun(NamedTuple):
+    """
+    A chain of turns followed by a straight line of moves.
+
+    - **offset**: index in the command string of the first `M` of the run
+    - **turn**: net rotation applied before moving, in quarter turns (0-3, clockwise)
+    - **steps**: number of consecutive `M` commands
+    """
+    offset: int
+    turn: int
+    steps: int
+
+
+class Envelope(NamedTuple):
+    """
+    Net displacement and bounding box of a program's path, relative to the
+    starting position, for one starting heading.
+    """
+    dx: int
+    dy: int
+    min_x: int
+    max_x: int
+    min_y: int
+    max_y: int
+
+
+class CompiledProgram(NamedTuple):
+    """
+    Reusable transform of a command string.
+
+    - **runs**: compiled runs, kept to locate the failing move when a bounds check fails
+    - **rotation**: net rotation of the whole program, in quarter turns (0-3, clockwise)
+    - **envelopes**: one `Envelope` per starting heading, indexed like DIRECTIONS
+    """
+    runs: tuple[CommandRun, ...]
+    rotation: int
+    envelopes: tuple[Envelope, Envelope, Envelope, Envelope]
+
+
+class MoveFailed(Exception):
+    """A move that cannot be made; `position` is the index of the offending `M`."""
+    detail = "Invalid move."
+
+    def __init__(self, position: int):
+        super().__init__(f"{self.detail} (command at position {position})")
+        self.position = position
+
+
+class GridLimitExceeded(MoveFailed):
+    detail = "Invalid move: probe would exceed grid limits."
+
+
+class CollisionDetected(MoveFailed):
+    detail = "Invalid move: probe would collide with an obstacle or another probe."
+
+
+class InvalidCommand(Exception):
+    """A character other than M, L or R; `position` is its index."""
+    detail = "Invalid command sequence. Allowed commands: 'M', 'L', 'R'."
+
+    def __init__(self, position: int):
+        super().__init__(f"{self.detail} (command at position {position})")
+        self.position = position
+
+
+class Occupancy(Protocol):
+    def free_steps(self, x: int, y: int, heading: int, steps: int) -> int:
+        """Number of cells, up to `steps`, the probe can cross along `heading` before an occupied one."""
+
+
+def compile_commands(commands: str) -> tuple[CommandRun, ...]:
+    """
+    Validate and collapse a command string into runs, in a single pass.
+
+    Turn chains are reduced mod 4 and consecutive `M`s become a single
+    displacement, so execution cost depends on the number of runs instead of
+    the number of commands. The pattern only stops matching, with an empty
+    match, on a character other than M, L or R, which raises
+    `InvalidCommand` with its index.
+    """
+    runs = []
+    for match in _RUN_PATTERN.finditer(commands):
+        if match.start() == match.end():
+            if match.start() < len(commands):
+                raise InvalidCommand(match.start())
+            continue
+
+        turns, moves = match.group(1), match.group(2)
+        turn = (turns.count("R") - turns.count("L")) % 4
+        runs.append(CommandRun(match.start(2), turn, len(moves)))
+
+    return tuple(runs)
+
+
+def encode_commands(commands: str) -> str:
+    """Run-length encode a command string: "MMMLRR" becomes "3ML2R"."""
+    return "".join(
+        f"{len(run)}{run[0]}" if len(run) > 1 else run
+        for run in _REPEAT_PATTERN.findall(commands)
+    )
+
+
+def decode_commands(encoded: str) -> str:
+    """Inverse of `encode_commands`."""
+    return "".join(
+        command * int(count or 1) for count, command in _ENCODED_PATTERN.findall(encoded)
+    )
+
+
+def append_encoded(parts: list[str], encoded: str) -> None:
+    """
+    Append the encoding of the next chunk of a command string to the
+    encodings of the previous ones, so that `"".join(parts)` is the encoding
+    of the whole string: a run cut between two chunks is moved, whole,
+    onto the new chunk.
+    """
+    if not encoded:
+        return
+
+    if parts:
+        tail = _LAST_ENCODED_PATTERN.search(parts[-1])
+        head = _ENCODED_PATTERN.match(encoded)
+        if tail.group(2) == head.group(2):
+            count = int(tail.group(1) or 1) + int(head.group(1) or 1)
+            encoded = f"{count}{head.group(2)}" + encoded[head.end():]
+            parts[-1] = parts[-1][:tail.start()]
+            if not parts[-1]:
+                parts.pop()
+
+    parts.append(encoded)
+
+
+def find_invalid(commands: str) -> Optional[int]:
+    """Index of the first character other than M, L or R, if any."""
+    invalid = _INVALID_PATTERN.search(commands)
+    return invalid.start() if invalid else None
+
+
+def compile_program(commands: str) -> CompiledProgram:
+    """
+    Compile a command string into a `CompiledProgram`. Raises `InvalidCommand`.
+
+    Every run moves in a straight line, so the extremes of the path are
+    reached at run end points and the envelope is exact: the program stays
+    inside the grid if and only if its bounding box does.
+    """
+    runs = compile_commands(commands)
+    rotation = sum(run.turn for run in runs) % 4
+    envelopes = tuple(_envelope(runs, heading) for heading in range(4))
+    return CompiledProgram(runs, rotation, envelopes)
+
+
+def apply_program(
+    program: CompiledProgram,
+    x: int,
+    y: int,
+    heading: int,
+    size_x: int,
+    size_y: int,
+) -> tuple[int, int, int]:
+    """
+    Apply a compiled program to a pose in constant time and return the final
+    `(x, y, heading)`. Raises `GridLimitExceeded` like `execute_runs`.
+    """
+    dx, dy, min_x, max_x, min_y, max_y = program.envelopes[heading]
+
+    if not (
+        0 <= x + min_x and x + max_x <= size_x
+        and 0 <= y + min_y and y + max_y <= size_y
+    ):
+        # Only failures pay for a walk over the runs, to find the failing move.
+        execute_runs(program.runs, x, y, heading, size_x, size_y)
+
+    return x + dx, y + dy, (heading + program.rotation) % 4
+
+
+def execute_runs(
+    runs: tuple[CommandRun, ...],
+    x: int,
+    y: int,
+    heading: int,
+    size_x: int,
+    size_y: int,
+    occupancy: Optional[Occupancy] = None,
+) -> tuple[int, int, int]:
+    """
+    Apply compiled runs to a pose and return the final `(x, y, heading)`.
+
+    A run moves in a straight line, so checking its end point against the
+    grid is equivalent to checking every intermediate step. When an
+    `occupancy` is given, each run also asks it how far the probe can go
+    before an occupied cell. Raises `GridLimitExceeded` or
+    `CollisionDetected` with the index of the first offending `M`.
+    """
+    for offset, turn, steps in runs:
+        heading = (heading + turn) % 4
+        if not steps:
+            continue
+
+        dx, dy = HEADING_DELTAS[heading]
+        new_x, new_y = x + dx * steps, y + dy * steps
+        in_grid = 0 <= new_x <= size_x and 0 <= new_y <= size_y
+        room = steps if in_grid else _room(x, y, heading, size_x, size_y)
+
+        if occupancy is not None:
+            free = occupancy.free_steps(x, y, heading, min(steps, room))
+            if free < min(steps, room):
+                raise CollisionDetected(offset + free)
+
+        if not in_grid:
+            raise GridLimitExceeded(offset + room)
+
+        x, y = new_x, new_y
+
+    return x, y, heading
+
+
+def sample_path(
+    commands: str,
+    x: int,
+    y: int,
+    heading: int,
+    every: int,
+    limit: Optional[int] = None,
+) -> list[tuple[int, int, int]]:
+    """
+    Poses of a probe running already validated `commands`: the start pose,
+    then the pose after every `every` commands and after the last one.
+    Only the first `limit` commands are run when given, e.g. up to a
+    failing move. Bounds are not checked.
+    """
+    commands = commands if limit is None else commands[:limit]
+    path = [(x, y, heading)]
+    for position, command in enumerate(commands, start=1):
+        if command == "M":
+            dx, dy = HEADING_DELTAS[heading]
+            x, y = x + dx, y + dy
+        else:
+            heading = (heading + (1 if command == "R" else -1)) % 4
+
+        if position % every == 0 or position == len(commands):
+            path.append((x, y, heading))
+
+    return path
+
+
+class CommandStream:
+    """
+    Validates and executes a command string received in chunks, in a
+    single pass and without keeping the string around.
+
+    Each chunk is validated and compiled into runs in one pass and applied
+    like `execute_runs`, so a failure surfaces as soon as the chunk holding
+    it is fed, with its index in the whole string. The commands are kept
+    run-length encoded (see `encode_commands`) for the move history, as
+    one string per chunk joined with `append_encoded`, so they never take
+    more memory than the encoding itself. The crossed cells are added to
+    `trace` when one is given.
+    """
+
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        heading: int,
+        size_x: int,
+        size_y: int,
+        occupancy: Optional[Occupancy] = None,
+        trace=None,
+    ):
+        self.x, self.y, self.heading = x, y, heading
+        self.size_x, self.size_y = size_x, size_y
+        self.occupancy = occupancy
+        self.trace = trace
+        self.length = 0
+        self._encoded: list[str] = []
+
+        if trace is not None:
+            trace.add(x, y)
+
+    def feed(self, chunk: bytes) -> None:
+        """Apply the next chunk. Raises `InvalidCommand` or `MoveFailed`."""
+        # latin-1 maps every byte to one character, so indexes are kept and
+        # any non-ASCII byte is reported as an invalid command.
+        commands = chunk.decode("latin-1")
+        try:
+            runs = compile_commands(commands)
+        except InvalidCommand as e:
+            raise InvalidCommand(self.length + e.position)
+
+        for run in runs:
+            try:
+                x, y, heading = execute_runs(
+                    (run,), self.x, self.y, self.heading, self.size_x, self.size_y, self.occupancy
+                )
+            except MoveFailed as e:
+                raise type(e)(self.length + e.position)
+
+            if self.trace is not None:
+                self.trace.add_run(self.x, self.y, heading, run.steps)
+            self.x, self.y, self.heading = x, y, heading
+
+        append_encoded(self._encoded, encode_commands(commands))
+        # Short parts are merged, so tiny chunks do not pile up small strings.
+        if len(self._encoded) > 1 and len(self._encoded[-2]) < ENCODED_PART_SIZE:
+            self._encoded[-2:] = ["".join(self._encoded[-2:])]
+        self.length += len(commands)
+
+    @property
+    def encoded(self) -> str:
+        """The commands fed so far, as `encode_commands` would encode them."""
+        return "".join(self._encoded)
+
+
+def _room(x: int, y: int, heading: int, size_x: int, size_y: int) -> int:
+    """Number of steps the probe can still take along `heading` inside the grid."""
+    room = (size_y - y, size_x - x, y, x)[heading]
+    return max(room, 0)
+
+
+def _envelope(runs: tuple[CommandRun, ...], heading: int) -> Envelope:
+    x = y = min_x = max_x = min_y = max_y = 0
+
+    for _, turn, steps in runs:
+        heading = (heading + turn) % 4
+        dx, dy = HEADING_DELTAS[heading]
+        x, y = x + dx * steps, y + dy * steps
+        min_x, max_x = min(min_x, x), max(max_x, x)
+        min_y, max_y = min(min_y, y), max(max_y, y)
+
+    return Envelope(x, y, min_x, max_x, min_y, max_y)
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import uuid
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from mars_probe_api.models.plateau import CoverageChunk
+from mars_probe_api.services.command_compiler import HEADING_DELTAS
+from mars_probe_api.services.probe_service import HEADINGS, ProbeService
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SHIFT = 6
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_BYTES = CHUNK_SIZE * CHUNK_SIZE // 8
+# Chunks locked per SELECT ... FOR UPDATE, to stay under parameter limits.
+LOCK_BATCH_SIZE = 1_000
+
+_CHUNK_MASK = CHUNK_SIZE - 1
+# One bit per row of a chunk, at column 0.
+_COLUMN = sum(1 << (row * CHUNK_SIZE) for row in range(CHUNK_SIZE))
+
+
+class ChunkedBitmap:
+    """
+    Set of cells of a plateau, split in 64x64 chunks.
+
+    Each chunk that has at least one cell set is a 4096-bit Python int, laid
+    out row by row, so memory grows with the number of touched chunks rather
+    than with the plateau size. Setting or testing a cell is O(1), and a
+    straight run of moves sets a whole segment of a chunk with one mask.
+    """
+
+    def __init__(self):
+        self._chunks: dict[tuple[int, int], int] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        x, y = cell
+        chunk = self._chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT), 0)
+        return bool(chunk >> _bit(x, y) & 1)
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def add(self, x: int, y: int) -> bool:
+        """Set a cell; returns whether it was not set before."""
+        return self._set((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT), 1 << _bit(x, y)) == 1
+
+    def add_run(self, x: int, y: int, heading: int, steps: int) -> int:
+        """
+        Set the `steps` cells crossed when moving from (x, y) along
+        `heading`, not including (x, y) itself. Returns how many were new.
+        """
+        if not steps:
+            return 0
+
+        if heading in (0, 2):
+            low, high = (y + 1, y + steps) if heading == 0 else (y - steps, y - 1)
+            return self._add_column(x, low, high)
+
+        low, high = (x + 1, x + steps) if heading == 1 else (x - steps, x - 1)
+        return self._add_row(y, low, high)
+
+    def update(self, other: "ChunkedBitmap") -> int:
+        """Set every cell of `other`. Returns how many were new."""
+        return sum(self._set(key, bits) for key, bits in other._chunks.items())
+
+    def chunks(self) -> Iterator[tuple[tuple[int, int], int]]:
+        """Key and bits of every chunk with at least one cell set."""
+        return iter(self._chunks.items())
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[tuple[int, int, bytes]]) -> "ChunkedBitmap":
+        """Bitmap of stored chunks, as (cx, cy, bits) like `CoverageChunk` rows."""
+        bitmap = cls()
+        for cx, cy, data in chunks:
+            bitmap._set((cx, cy), unpack_chunk(data))
+        return bitmap
+
+    def _set(self, key: tuple[int, int], mask: int) -> int:
+        chunk = self._chunks.get(key, 0)
+        new = (mask & ~chunk).bit_count()
+        if new:
+            self._chunks[key] = chunk | mask
+            self._count += new
+        return new
+
+    def _add_row(self, y: int, low: int, high: int) -> int:
+        cy, row = y >> CHUNK_SHIFT, (y & _CHUNK_MASK) * CHUNK_SIZE
+        new = 0
+        for cx in range(low >> CHUNK_SHIFT, (high >> CHUNK_SHIFT) + 1):
+            first = max(low, cx << CHUNK_SHIFT) & _CHUNK_MASK
+            last = min(high, (cx << CHUNK_SHIFT) + _CHUNK_MASK) & _CHUNK_MASK
+            new += self._set((cx, cy), ((1 << (last - first + 1)) - 1) << (row + first))
+        return new
+
+    def _add_column(self, x: int, low: int, high: int) -> int:
+        cx, column = x >> CHUNK_SHIFT, _COLUMN << (x & _CHUNK_MASK)
+        new = 0
+        for cy in range(low >> CHUNK_SHIFT, (high >> CHUNK_SHIFT) + 1):
+            first = max(low, cy << CHUNK_SHIFT) & _CHUNK_MASK
+            last = min(high, (cy << CHUNK_SHIFT) + _CHUNK_MASK) & _CHUNK_MASK
+            rows = (1 << ((last + 1) * CHUNK_SIZE)) - (1 << (first * CHUNK_SIZE))
+            new += self._set((cx, cy), column & rows)
+        return new
+
+
+def _bit(x: int, y: int) -> int:
+    return (y & _CHUNK_MASK) * CHUNK_SIZE + (x & _CHUNK_MASK)
+
+
+def pack_chunk(bits: int) -> bytes:
+    return zlib.compress(bits.to_bytes(CHUNK_BYTES, "little"))
+
+
+def unpack_chunk(data: Optional[bytes]) -> int:
+    return int.from_bytes(zlib.decompress(data), "little") if data else 0
+
+
+def cover_path(bitmap: ChunkedBitmap, x: int, y: int, direction: str, commands: str) -> int:
+    """
+    Mark every cell a probe crosses when running already validated
+    `commands` from (x, y), start included. Returns how many were new.
+    """
+    new = int(bitmap.add(x, y))
+    if not commands:
+        return new
+
+    heading = HEADINGS[direction]
+    for _, turn, steps in ProbeService.compile(commands).runs:
+        heading = (heading + turn) % 4
+        new += bitmap.add_run(x, y, heading, steps)
+        dx, dy = HEADING_DELTAS[heading]
+        x, y = x + dx * steps, y + dy * steps
+    return new
+
+
+class CoverageStore:
+    """
+    Write-behind coverage of plateaus, one `CoverageChunk` row per chunk.
+
+    Moves only add the cells they crossed to an in-memory bitmap of pending
+    cells per plateau, so they never wait on the database. Every flush
+    interval and on shutdown, the pending cells of each plateau are merged
+    into its stored chunks in one transaction: the touched rows are locked
+    in key order, so flushes of several processes serialize per chunk
+    without deadlocking, and missing rows are first inserted empty,
+    ignoring the ones a concurrent flush just inserted. Stored coverage
+    thus lags the moves by up to a flush interval.
+
+    Coverage is recorded after the moves are committed, so a failed flush
+    is logged rather than raised: its cells are kept for the next one,
+    unless the plateau no longer exists.
+    """
+
+    def __init__(self):
+        self._pending: dict[uuid.UUID, ChunkedBitmap] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def start(self, engine: AsyncEngine, flush_interval: float) -> None:
+        """Start the periodic flush."""
+        self._engine = engine
+        self._flusher = asyncio.create_task(self._flush_periodically(flush_interval))
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write the remaining pending cells."""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        if self._engine and self._pending:
+            async with AsyncSession(self._engine) as session:
+                await self.flush(session)
+
+    def record(self, plateau_id: uuid.UUID, paths: Iterable[tuple[int, int, str, str]]) -> None:
+        """Add the cells crossed by `paths` (start x, start y, direction, commands)."""
+        cells = ChunkedBitmap()
+        for path in paths:
+            cover_path(cells, *path)
+        self.merge(plateau_id, cells)
+
+    def merge(self, plateau_id: uuid.UUID, cells: ChunkedBitmap) -> None:
+        """Add already collected `cells`."""
+        if not len(cells):
+            return
+
+        pending = self._pending.get(plateau_id)
+        if pending is None:
+            self._pending[plateau_id] = cells
+        else:
+            pending.update(cells)
+
+    async def flush(self, session: AsyncSession) -> int:
+        """
+        Write the pending cells of every plateau, one transaction per
+        plateau. Returns how many plateaus were written.
+        """
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            written = 0
+            for plateau_id, cells in pending.items():
+                try:
+                    await self._update(session, plateau_id, dict(cells.chunks()))
+                    written += 1
+                except Exception as e:
+                    await session.rollback()
+                    logger.exception("Failed to record the coverage of plateau %s", plateau_id)
+                    if not isinstance(e, IntegrityError):
+                        self.merge(plateau_id, cells)
+            return written
+
+    def clear(self) -> None:
+        self._pending.clear()
+
+    async def load(self, session: AsyncSession, plateau_id: uuid.UUID) -> ChunkedBitmap:
+        """Every stored covered cell of a plateau."""
+        result = await session.execute(
+            select(CoverageChunk.cx, CoverageChunk.cy, CoverageChunk.bits)
+            .where(CoverageChunk.plateau_id == plateau_id)
+        )
+        return ChunkedBitmap.from_chunks(result)
+
+    async def _update(
+        self, session: AsyncSession, plateau_id: uuid.UUID, masks: dict[tuple[int, int], int]
+    ) -> None:
+        keys = sorted(masks)
+        stored = await self._lock(session, plateau_id, keys)
+        missing = [key for key in keys if key not in stored]
+        if missing:
+            await session.execute(
+                _insert_ignoring_conflicts(session, CoverageChunk.__table__),
+                [{"plateau_id": plateau_id, "cx": cx, "cy": cy, "cells": 0, "bits": b""} for cx, cy in missing],
+            )
+            stored.update(await self._lock(session, plateau_id, missing))
+
+        changes = []
+        for key in keys:
+            bits = stored[key] | masks[key]
+            if bits != stored[key]:
+                changes.append({
+                    "b_cx": key[0],
+                    "b_cy": key[1],
+                    "b_cells": bits.bit_count(),
+                    "b_bits": pack_chunk(bits),
+                })
+
+        if changes:
+            table = CoverageChunk.__table__
+            await session.execute(
+                update(table)
+                .where(
+                    table.c.plateau_id == plateau_id,
+                    table.c.cx == bindparam("b_cx"),
+                    table.c.cy == bindparam("b_cy"),
+                )
+                .values(cells=bindparam("b_cells"), bits=bindparam("b_bits")),
+                changes,
+            )
+        await session.commit()
+
+    async def _lock(
+        self, session: AsyncSession, plateau_id: uuid.UUID, keys: list[tuple[int, int]]
+    ) -> dict[tuple[int, int], int]:
+        """Lock the stored chunks among `keys`, in order, and return their bits."""
+        stored = {}
+        for start in range(0, len(keys), LOCK_BATCH_SIZE):
+            result = await session.execute(
+                select(CoverageChunk.cx, CoverageChunk.cy, CoverageChunk.bits)
+                .where(
+                    CoverageChunk.plateau_id == plateau_id,
+                    tuple_(CoverageChunk.cx, CoverageChunk.cy).in_(keys[start:start + LOCK_BATCH_SIZE]),
+                )
+                .order_by(CoverageChunk.cx, CoverageChunk.cy)
+                .with_for_update()
+            )
+            stored.update(((cx, cy), unpack_chunk(data)) for cx, cy, data in result)
+        return stored
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSession(self._engine) as session:
+                    await self.flush(session)
+            except Exception:
+                logger.exception("Failed to flush coverage, will retry")
+
+
+def _insert_ignoring_conflicts(session: AsyncSession, table):
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return sqlite.insert(table).on_conflict_do_nothing()
+
+
+coverage_store = CoverageStore()
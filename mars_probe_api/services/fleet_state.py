@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+
+from sqlalchemy import BigInteger, Text, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.probe_store import probe_store
+
+
+LISTING_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FleetVersion(NamedTuple):
+    """
+    Version of the fleet, as seen by a listing.
+
+    - **revision**: every probe written with a revision up to this one is
+      visible, returned as the listing `version` to pass as `since`
+    - **tag**: identifies the rest of what the listing sees, i.e. writes
+      above `revision` that already committed
+    """
+    revision: int
+    tag: str = ""
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.revision}-{self.tag}"' if self.tag else f'"{self.revision}"'
+
+
+def write_revision(session: AsyncSession) -> Union[int, ColumnElement]:
+    """
+    Revision of a write about to be made to probes, to be stored as their
+    `revision` by the same statement, without a round trip of its own.
+
+    On PostgreSQL it is the id of the writing transaction, so `fleet_version`
+    can tell from a snapshot which revisions may still be in flight. SQLite
+    serializes writers, so the highest revision plus one is never committed
+    out of order there. The write-behind store uses its in-memory counter.
+    """
+    if probe_store.enabled:
+        return probe_store.next_revision()
+
+    if session.bind.dialect.name == "postgresql":
+        return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+    return select(func.coalesce(func.max(Probe.revision), 0) + 1).scalar_subquery()
+
+
+async def fleet_version(session: AsyncSession) -> FleetVersion:
+    """
+    Current `FleetVersion`, read with a single statement.
+
+    On PostgreSQL the revision is the xmin of the current snapshot minus
+    one: transactions below it are all finished, so no write can still
+    commit a revision up to it. Those at or above it that did commit are
+    listed too, so the tag is a hash of the whole snapshot. Elsewhere the
+    revision is the highest probe revision, read from the revision index.
+    """
+    if probe_store.enabled:
+        return FleetVersion(probe_store.version)
+
+    if session.bind.dialect.name == "postgresql":
+        snapshot = func.pg_current_snapshot()
+        xmin = cast(cast(func.pg_snapshot_xmin(snapshot), Text), BigInteger)
+        result = await session.execute(select(xmin - 1, func.md5(cast(snapshot, Text))))
+        return FleetVersion(*result.one())
+
+    return FleetVersion(await session.scalar(select(func.coalesce(func.max(Probe.revision), 0))))
+
+
+class ListingCache:
+    """
+    Serialized GET /probes bodies of a single fleet version, keyed by the
+    query parameters, up to `max_bytes` in all. Storing a body of a newer
+    version drops every other one, and bodies of older versions (e.g. read
+    from a lagging replica) are not stored.
+    """
+
+    def __init__(self, max_bytes: int = LISTING_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.version: Optional[FleetVersion] = None
+        self.hits = self.misses = 0
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, version: FleetVersion, key: str) -> Optional[bytes]:
+        body = self._bodies.get(key) if version == self.version else None
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._bodies.move_to_end(key)
+        return body
+
+    def put(self, version: FleetVersion, key: str, body: bytes) -> None:
+        if self.version is not None and version < self.version:
+            return
+        if version != self.version:
+            self._bodies.clear()
+            self.size = 0
+            self.version = version
+        if len(body) > self.max_bytes:
+            return
+
+        previous = self._bodies.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._bodies[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+        self.size = 0
+        self.version = None
+        self.hits = self.misses = 0
+
+
+listing_cache = ListingCache()
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import multiprocessing
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from mars_probe_api.services.command_compiler import (
+    CollisionDetected,
+    GridLimitExceeded,
+    InvalidCommand,
+    MoveFailed,
+    compile_commands,
+    encode_commands,
+    execute_runs,
+)
+
+
+logger = logging.getLogger(__name__)
+
+JOB_CHUNK_SIZE = 1_000_000
+JOB_RETENTION = 10_000
+
+_FAILURES = {error.__name__: error for error in (InvalidCommand, GridLimitExceeded, CollisionDetected)}
+
+
+class MoveJob:
+    """
+    State of an asynchronous move, updated by the worker running it.
+
+    - **status**: `queued`, `running`, `succeeded` or `failed`
+    - **done** / **total**: commands run so far, out of the whole script
+    - **x**, **y**, **direction**: pose reached after `done` commands, and
+      the final pose once the job succeeded
+    """
+
+    def __init__(self, probe_id: uuid.UUID, total: int):
+        self.id = uuid.uuid4()
+        self.probe_id = probe_id
+        self.status = "queued"
+        self.total = total
+        self.done = 0
+        self.x: Optional[int] = None
+        self.y: Optional[int] = None
+        self.direction: Optional[str] = None
+        self.detail: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def progress(self, done: int, x: int, y: int, direction: str) -> None:
+        self.done = done
+        self.x, self.y, self.direction = x, y, direction
+
+    def succeed(self, x: int, y: int, direction: str) -> None:
+        self.progress(self.total, x, y, direction)
+        self.status = "succeeded"
+        self.finished_at = datetime.now(timezone.utc)
+
+    def fail(self, detail: str) -> None:
+        self.status = "failed"
+        self.detail = detail
+        self.finished_at = datetime.now(timezone.utc)
+
+
+class MoveJobQueue:
+    """
+    Local queue of move jobs, drained by a fixed number of worker tasks.
+
+    Jobs run their CPU-bound simulation in a process pool, chunk by chunk
+    (see `simulate_chunk`), so the event loop stays free for short moves.
+    Jobs live in this process only: they are lost on restart, and must be
+    queried from the process that accepted them. The last JOB_RETENTION
+    finished jobs are kept.
+    """
+
+    def __init__(self):
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: OrderedDict[uuid.UUID, MoveJob] = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, workers: int) -> None:
+        # Forking a process that runs threads (the driver, the event loop
+        # executor) is unsafe, so workers are spawned.
+        self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers and fail the jobs that did not finish."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+        for job in self._jobs.values():
+            if not job.finished:
+                job.fail("Shut down before the job finished.")
+
+    def submit(self, job: MoveJob, run: Callable[[MoveJob], Awaitable[None]]) -> None:
+        """Queue `run(job)`. It raises to fail the job, with the error as detail."""
+        self._jobs[job.id] = job
+        self._queue.put_nowait((job, run))
+
+    def get(self, job_id: uuid.UUID) -> Optional[MoveJob]:
+        return self._jobs.get(job_id)
+
+    async def run_in_process(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _work(self) -> None:
+        while True:
+            job, run = await self._queue.get()
+            job.status = "running"
+            try:
+                await run(job)
+            except (InvalidCommand, MoveFailed) as e:
+                job.fail(str(e))
+            except Exception as e:
+                logger.exception("Move job %s failed", job.id)
+                job.fail(getattr(e, "detail", None) or str(e))
+            finally:
+                self._queue.task_done()
+                self._retire()
+
+    def _retire(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - JOB_RETENTION)]:
+            del self._jobs[job_id]
+
+
+def simulate_chunk(
+    x: int,
+    y: int,
+    heading: int,
+    size_x: int,
+    size_y: int,
+    commands: str,
+) -> tuple[int, int, int, Optional[tuple[str, int]], str]:
+    """
+    Run a chunk of a script in a worker process. Returns the final pose, the
+    failure as `(error name, position in the chunk)` if any, since the
+    errors do not pickle, and the run-length encoded chunk.
+    """
+    try:
+        x, y, heading = execute_runs(compile_commands(commands), x, y, heading, size_x, size_y)
+    except (InvalidCommand, MoveFailed) as e:
+        return x, y, heading, (type(e).__name__, e.position), ""
+    return x, y, heading, None, encode_commands(commands)
+
+
+def chunk_failure(failure: tuple[str, int], offset: int) -> Exception:
+    """Error of a `simulate_chunk` failure, positioned in the whole script."""
+    name, position = failure
+    return _FAILURES[name](offset + position)
+
+
+move_jobs = MoveJobQueue()
@@ -0,0 +1,247 @@
+import heapq
+import uuid
+from collections import OrderedDict
+from itertools import count, permutations
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mars_probe_api.models.plateau import Obstacle, Plateau
+from mars_probe_api.services.command_compiler import HEADING_DELTAS
+from mars_probe_api.services.move_jobs import move_jobs
+from mars_probe_api.services.probe_service import HEADINGS
+from mars_probe_api.services.spatial_index import OccupancyIndex
+
+
+PLAN_CACHE_SIZE = 1024
+PLAN_MAX_EXPANSIONS = 200_000
+
+# Commands turning heading `a` into heading `b`, indexed by (b - a) % 4,
+# with the same semantics as ProbeService._turn: L is -1, R is +1.
+_TURNS = ("", "R", "RR", "L")
+
+
+class Pose(NamedTuple):
+    x: int
+    y: int
+    heading: int
+
+
+class NoPathFound(Exception):
+    """The goal pose cannot be reached."""
+
+
+class SearchBudgetExceeded(Exception):
+    """The search gave up after PLAN_MAX_EXPANSIONS states, without an answer."""
+
+
+def plan_commands(
+    start: Pose,
+    goal: Pose,
+    size_x: int,
+    size_y: int,
+    obstacles: Optional[OccupancyIndex] = None,
+) -> str:
+    """
+    Shortest `M`/`L`/`R` command string taking a probe from `start` to `goal`.
+
+    Without obstacles in the way, the best route is at most two straight
+    legs, and is built directly. Otherwise an A* search runs over
+    `(x, y, heading)` states, guided by the cost of that obstacle-free route,
+    which never overestimates the real one.
+    """
+    if obstacles is not None and (goal.x, goal.y) in obstacles:
+        raise NoPathFound()
+
+    routes = sorted(_routes(start, goal))
+    for cost, legs in routes:
+        if cost > routes[0][0]:
+            break
+        if obstacles is None or _is_free(start, legs, obstacles):
+            return _route_commands(start.heading, legs, goal.heading)
+
+    return _search(start, goal, size_x, size_y, obstacles)
+
+
+def _routes(start: Pose, goal: Pose):
+    """Every obstacle-free route as (cost, legs), a leg being (heading, steps)."""
+    legs = []
+    if goal.x != start.x:
+        legs.append((1 if goal.x > start.x else 3, abs(goal.x - start.x)))
+    if goal.y != start.y:
+        legs.append((0 if goal.y > start.y else 2, abs(goal.y - start.y)))
+
+    for order in permutations(legs):
+        heading, turns = start.heading, 0
+        for leg_heading, _ in order:
+            turns += len(_TURNS[(leg_heading - heading) % 4])
+            heading = leg_heading
+        turns += len(_TURNS[(goal.heading - heading) % 4])
+        yield turns + sum(steps for _, steps in order), order
+
+
+def _route_cost(start: Pose, goal: Pose) -> int:
+    return min(cost for cost, _ in _routes(start, goal))
+
+
+def _is_free(start: Pose, legs, obstacles: OccupancyIndex) -> bool:
+    x, y = start.x, start.y
+    for heading, steps in legs:
+        if obstacles.free_steps(x, y, heading, steps) < steps:
+            return False
+        dx, dy = HEADING_DELTAS[heading]
+        x, y = x + dx * steps, y + dy * steps
+    return True
+
+
+def _route_commands(heading: int, legs, goal_heading: int) -> str:
+    commands = []
+    for leg_heading, steps in legs:
+        commands.append(_TURNS[(leg_heading - heading) % 4] + "M" * steps)
+        heading = leg_heading
+    commands.append(_TURNS[(goal_heading - heading) % 4])
+    return "".join(commands)
+
+
+def _search(
+    start: Pose,
+    goal: Pose,
+    size_x: int,
+    size_y: int,
+    obstacles: OccupancyIndex,
+) -> str:
+    # Ties on f are broken on the deepest state, then on insertion order.
+    tie = count()
+    queue = [(_route_cost(start, goal), 0, next(tie), start)]
+    parents: dict[Pose, tuple[Optional[Pose], str]] = {start: (None, "")}
+    costs = {start: 0}
+
+    while queue:
+        _, depth, _, pose = heapq.heappop(queue)
+        g = -depth
+        if pose == goal:
+            return _commands_to(pose, parents)
+        if g > costs[pose]:
+            continue
+        if len(costs) > PLAN_MAX_EXPANSIONS:
+            raise SearchBudgetExceeded()
+
+        dx, dy = HEADING_DELTAS[pose.heading]
+        neighbours = [
+            (Pose(pose.x, pose.y, (pose.heading - 1) % 4), "L"),
+            (Pose(pose.x, pose.y, (pose.heading + 1) % 4), "R"),
+        ]
+        x, y = pose.x + dx, pose.y + dy
+        if 0 <= x <= size_x and 0 <= y <= size_y and (x, y) not in obstacles:
+            neighbours.append((Pose(x, y, pose.heading), "M"))
+
+        for neighbour, command in neighbours:
+            if g + 1 < costs.get(neighbour, g + 2):
+                costs[neighbour] = g + 1
+                parents[neighbour] = (pose, command)
+                f = g + 1 + _route_cost(neighbour, goal)
+                heapq.heappush(queue, (f, -(g + 1), next(tie), neighbour))
+
+    raise NoPathFound()
+
+
+def _commands_to(pose: Pose, parents) -> str:
+    commands = []
+    parent, command = parents[pose]
+    while parent is not None:
+        commands.append(command)
+        parent, command = parents[parent]
+    return "".join(reversed(commands))
+
+
+class PathPlanner:
+    """
+    Bounded LRU cache of plans, keyed by plateau and obstacles version, grid
+    size, start and goal poses. Unreachable goals are cached too, since
+    proving them costs a full search; searches that ran out of budget are
+    not, since they proved nothing.
+
+    Searches around obstacles run in the move jobs process pool (or a
+    thread when it is not started), so the event loop is never blocked.
+    """
+
+    def __init__(self, maxsize: int = PLAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._plans: OrderedDict[tuple, Optional[str]] = OrderedDict()
+
+    async def plan(
+        self,
+        session: AsyncSession,
+        start: Pose,
+        goal: Pose,
+        size_x: int,
+        size_y: int,
+        plateau_id: Optional[uuid.UUID] = None,
+    ) -> str:
+        """
+        Commands from `start` to `goal`, avoiding the static obstacles of the
+        plateau, if any. Other probes move, so they are not planned around.
+        Raises `NoPathFound`.
+        """
+        obstacles_version = None
+        if plateau_id is not None:
+            obstacles_version = await session.scalar(
+                select(Plateau.obstacles_version).where(Plateau.id == plateau_id)
+            )
+
+        key = (plateau_id, obstacles_version, size_x, size_y, start, goal)
+        if key in self._plans:
+            self.hits += 1
+            self._plans.move_to_end(key)
+            commands = self._plans[key]
+        else:
+            self.misses += 1
+            obstacles = await _obstacles(session, plateau_id, size_x, size_y)
+            try:
+                if obstacles is None:
+                    commands = plan_commands(start, goal, size_x, size_y)
+                else:
+                    commands = await move_jobs.run_in_process(
+                        plan_commands, start, goal, size_x, size_y, obstacles
+                    )
+            except NoPathFound:
+                commands = None
+
+            self._plans[key] = commands
+            if len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+        if commands is None:
+            raise NoPathFound()
+        return commands
+
+    def clear(self) -> None:
+        self._plans.clear()
+        self.hits = self.misses = 0
+
+
+async def _obstacles(
+    session: AsyncSession,
+    plateau_id: Optional[uuid.UUID],
+    size_x: int,
+    size_y: int,
+) -> Optional[OccupancyIndex]:
+    if plateau_id is None:
+        return None
+
+    index = OccupancyIndex(size_x, size_y)
+    cells = await session.execute(
+        select(Obstacle.x, Obstacle.y).where(Obstacle.plateau_id == plateau_id)
+    )
+    for x, y in cells:
+        index.add(x, y)
+    return index
+
+
+def pose_of(x: int, y: int, direction: str) -> Pose:
+    return Pose(x, y, HEADINGS[direction])
+
+
+path_planner = PathPlanner()
@@ -1,10 +1,46 @@
 from fastapi import HTTPException
+from functools import lru_cache, wraps
 from http import HTTPStatus
+from typing import Optional
+from mars_probe_api.metrics import metrics
 from mars_probe_api.models.probe import Probe
-from copy import deepcopy
+from mars_probe_api.services.command_compiler import (
+    CompiledProgram,
+    InvalidCommand,
+    MoveFailed,
+    Occupancy,
+    apply_program,
+    compile_program,
+    execute_runs,
+    find_invalid,
+)
 
 
 DIRECTIONS = ["NORTH", "EAST", "SOUTH", "WEST"]
+# Heading index of each direction, to avoid scanning DIRECTIONS with .index().
+HEADINGS = {direction: heading for heading, direction in enumerate(DIRECTIONS)}
+PROGRAM_CACHE_SIZE = 1024
+# Longer scripts are compiled on every call: a cached program keeps its key
+# and runs alive, so this bounds the cache to a few tens of MB.
+PROGRAM_CACHE_MAX_LENGTH = 512
+
+
+def _cache_short_scripts(compile):
+    """
+    `lru_cache` for command strings of at most PROGRAM_CACHE_MAX_LENGTH
+    characters, with the same `cache_info()` and `cache_clear()`.
+    """
+    cached = lru_cache(maxsize=PROGRAM_CACHE_SIZE)(compile)
+
+    @wraps(compile)
+    def wrapper(commands: str) -> CompiledProgram:
+        if commands and len(commands) > PROGRAM_CACHE_MAX_LENGTH:
+            return compile(commands)
+        return cached(commands)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
 
 
 class ProbeService:
@@ -12,42 +48,107 @@ class ProbeService:
 
     @staticmethod
     def validate_commands(commands: str) -> None:
-        if not commands.strip():
+        ProbeService._require_commands(commands)
+
+        position = find_invalid(commands)
+        if position is not None:
+            raise ProbeService._invalid_commands(InvalidCommand(position))
+
+    @staticmethod
+    @_cache_short_scripts
+    def compile(commands: str) -> CompiledProgram:
+        """
+        Validate and compile a command string, caching the result.
+
+        Validation is fused into compilation, so the string is scanned once,
+        and an invalid command is reported with its position. Fleets replay
+        the same survey patterns over and over, so repeated strings skip
+        both entirely; long one-off scripts are not cached. Hit/miss
+        counters are available through `ProbeService.compile.cache_info()`.
+        """
+        ProbeService._require_commands(commands)
+        try:
+            return compile_program(commands)
+        except InvalidCommand as e:
+            raise ProbeService._invalid_commands(e)
+
+    @staticmethod
+    def _require_commands(commands: str) -> None:
+        # isspace() stops at the first non-blank character, unlike strip().
+        if not commands or commands.isspace():
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
                 detail="Field 'commands' is required and must be a non-empty string.",
             )
 
-        invalid = [c for c in commands if c not in ProbeService.VALID_COMMANDS]
-        if invalid:
+    @staticmethod
+    def _invalid_commands(error: InvalidCommand) -> HTTPException:
+        return HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=str(error),
+        )
+
+    @staticmethod
+    def execute_commands(probe: Probe, commands: str) -> Probe:
+        probe.x, probe.y, probe.direction = ProbeService.apply_commands(
+            probe.x, probe.y, probe.direction, probe.size_x, probe.size_y, commands
+        )
+        return probe
+
+    @staticmethod
+    def apply_commands(
+        x: int,
+        y: int,
+        direction: str,
+        size_x: int,
+        size_y: int,
+        commands: str,
+        occupancy: Optional[Occupancy] = None,
+    ) -> tuple[int, int, str]:
+        """
+        Same as `execute_commands`, on a plain pose instead of a `Probe`.
+        Returns the final `(x, y, direction)`.
+        """
+        try:
+            return ProbeService.simulate(x, y, direction, size_x, size_y, commands, occupancy)
+        except MoveFailed as e:
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
-                detail="Invalid command sequence. Allowed commands: 'M', 'L', 'R'.",
+                detail=str(e)
             )
 
     @staticmethod
-    def execute_commands(probe: Probe, commands: str) -> Probe:
-        ProbeService.validate_commands(commands)
+    def simulate(
+        x: int,
+        y: int,
+        direction: str,
+        size_x: int,
+        size_y: int,
+        commands: str,
+        occupancy: Optional[Occupancy] = None,
+    ) -> tuple[int, int, str]:
+        """
+        Run commands on a pose and return the final `(x, y, direction)`.
 
-        temp_probe = deepcopy(probe)
+        Raises `MoveFailed` (with the offending command position) instead of
+        an HTTP error when the probe would leave the grid or, when an
+        `occupancy` of the plateau is given, run into an occupied cell.
+        """
+        metrics.observe_commands(len(commands))
+        with metrics.stage("simulate"):
+            program = ProbeService.compile(commands)
+            heading = HEADINGS[direction]
 
-        try:
-            for command in commands:
-                if command == "L":
-                    temp_probe.direction = ProbeService._turn(temp_probe.direction, left=True)
-                elif command == "R":
-                    temp_probe.direction = ProbeService._turn(temp_probe.direction, left=False)
-                elif command == "M":
-                    ProbeService._move(temp_probe)
-        except HTTPException as e:
-            raise e
-
-        probe.x, probe.y, probe.direction = temp_probe.x, temp_probe.y, temp_probe.direction
-        return probe
+            if occupancy is None:
+                x, y, heading = apply_program(program, x, y, heading, size_x, size_y)
+            else:
+                x, y, heading = execute_runs(program.runs, x, y, heading, size_x, size_y, occupancy)
+
+        return x, y, DIRECTIONS[heading]
 
     @staticmethod
     def _turn(direction: str, left: bool) -> str:
-        idx = DIRECTIONS.index(direction)
+        idx = HEADINGS[direction]
         return DIRECTIONS[(idx - 1) % 4] if left else DIRECTIONS[(idx + 1) % 4]
 
     @staticmethod
@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import uuid
+from bisect import bisect_right, insort
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import BigInteger, Text, bindparam, cast, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from mars_probe_api.models.probe import Probe, ProbeMove
+from mars_probe_api.schemas.probe import ProbeListParams
+
+
+logger = logging.getLogger(__name__)
+
+# Number of new ids from which `ProbeStore.add` rebuilds the id list once
+# instead of inserting them one by one.
+SPLICE_MIN_IDS = 128
+
+
+class ProbeState(NamedTuple):
+    id: uuid.UUID
+    x: int
+    y: int
+    direction: str
+    size_x: int
+    size_y: int
+    version: int
+    plateau_id: Optional[uuid.UUID] = None
+    revision: int = 0
+
+
+class ProbeStore:
+    """
+    In-process, write-behind copy of the probes table.
+
+    When enabled, moves and listings are served from memory. Successive moves
+    of a probe only overwrite its in-memory pose and mark it dirty, and dirty
+    poses are flushed to the database in batches every flush interval and on
+    shutdown, together with the history rows of the moves. The store assumes
+    it is the only writer of probe poses, so it must run in a single worker
+    process. For the same reason it allocates probe revisions from an
+    in-memory counter, the fleet `version`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.version = self._flushed_version = 0
+        self._probes: dict[uuid.UUID, ProbeState] = {}
+        self._ids: list[uuid.UUID] = []
+        self._dirty: set[uuid.UUID] = set()
+        self._history: list[dict] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def start(self, engine: AsyncEngine, flush_interval: float) -> None:
+        """Load every probe into memory and start the periodic flush."""
+        self._engine = engine
+        async with AsyncSession(engine) as session:
+            await self.load(session)
+        self._flusher = asyncio.create_task(self._flush_periodically(flush_interval))
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write the remaining dirty poses."""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        if self._engine:
+            async with AsyncSession(self._engine) as session:
+                await self.flush(session)
+
+        self.enabled = False
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(
+                Probe.id,
+                Probe.x,
+                Probe.y,
+                Probe.direction,
+                Probe.size_x,
+                Probe.size_y,
+                Probe.version,
+                Probe.plateau_id,
+                Probe.revision,
+            ).order_by(Probe.id)
+        )
+        self._probes = {row.id: ProbeState(*row) for row in result}
+        version = func.coalesce(func.max(Probe.revision), 0)
+        if session.bind.dialect.name == "postgresql":
+            # Not below the fleet version listings read from the database
+            # (see `fleet_state.fleet_version`), so their `since` still holds.
+            xmin = func.pg_snapshot_xmin(func.pg_current_snapshot())
+            version = func.greatest(version, cast(cast(xmin, Text), BigInteger) - 1)
+        self.version = self._flushed_version = await session.scalar(select(version))
+        self._ids = list(self._probes)
+        self._dirty.clear()
+        self._history.clear()
+        self.enabled = True
+
+    def add(self, states: Iterable[ProbeState]) -> None:
+        """
+        Register probes that were just inserted in the database. Each
+        insertion into the sorted id list moves it, so beyond SPLICE_MIN_IDS
+        new ids they are sorted, located by bisection and spliced in between
+        slices of the list, which is then rebuilt once for the whole batch.
+        """
+        new = set()
+        for state in states:
+            if state.id not in self._probes:
+                new.add(state.id)
+            self._probes[state.id] = state
+
+        if len(new) < SPLICE_MIN_IDS:
+            for probe_id in new:
+                insort(self._ids, probe_id)
+        else:
+            ids, start = [], 0
+            for probe_id in sorted(new):
+                position = bisect_right(self._ids, probe_id, start)
+                ids += self._ids[start:position]
+                ids.append(probe_id)
+                start = position
+            ids += self._ids[start:]
+            self._ids = ids
+
+    def get_many(self, probe_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, ProbeState]:
+        return {
+            probe_id: self._probes[probe_id]
+            for probe_id in probe_ids
+            if probe_id in self._probes
+        }
+
+    def on_plateau(self, plateau_id: uuid.UUID) -> list[ProbeState]:
+        return [state for state in self._probes.values() if state.plateau_id == plateau_id]
+
+    def next_revision(self) -> int:
+        """Bump the fleet version, as the revision of a write about to be made."""
+        self.version += 1
+        return self.version
+
+    def compare_and_swap(
+        self, row, x: int, y: int, direction: str, revision: Optional[int] = None
+    ) -> Optional[ProbeState]:
+        current = self._probes.get(row.id)
+        if current is None or current.version != row.version:
+            return None
+
+        state = current._replace(
+            x=x,
+            y=y,
+            direction=direction,
+            version=current.version + 1,
+            revision=revision or self.next_revision(),
+        )
+        self._probes[row.id] = state
+        self._dirty.add(row.id)
+        return state
+
+    def save_many(self, poses: list[dict]) -> bool:
+        """
+        Apply many poses read at a given version. Nothing is applied, and
+        False is returned, if any of the probes changed since.
+        """
+        for pose in poses:
+            current = self._probes.get(pose["id"])
+            if current is None or current.version != pose["version"]:
+                return False
+
+        revision = self.next_revision()
+        for pose in poses:
+            self.compare_and_swap(
+                self._probes[pose["id"]], pose["x"], pose["y"], pose["direction"], revision
+            )
+        return True
+
+    def append_history(self, entries: Iterable[dict]) -> None:
+        """Queue `ProbeMove` rows of saved moves until the next flush."""
+        self._history.extend(entries)
+
+    def pending_history(self, probe_id: uuid.UUID) -> list[dict]:
+        return [entry for entry in self._history if entry["probe_id"] == probe_id]
+
+    def select(self, params: ProbeListParams, limit: Optional[int] = None) -> Iterator[ProbeState]:
+        """Probes matching the listing filters, ordered by id, like GET /probes."""
+        start = bisect_right(self._ids, params.after) if params.after is not None else 0
+        states = (self._probes[probe_id] for probe_id in self._ids[start:])
+        matching = (state for state in states if _matches(state, params))
+        return islice(matching, limit) if limit is not None else matching
+
+    async def flush(self, session: AsyncSession) -> int:
+        """
+        Write every dirty pose with one executemany UPDATE, and the queued
+        history with one executemany INSERT. Returns how many poses.
+
+        Like `_save_poses` in the probes router, probes on a plateau are
+        first detached from it, so that probes that traded cells since the
+        last flush never trip the unique position constraint midway. Flushes
+        run one at a time, so an older snapshot never overwrites a newer one.
+        """
+        async with self._flush_lock:
+            return await self._flush(session)
+
+    async def _flush(self, session: AsyncSession) -> int:
+        dirty, self._dirty = self._dirty, set()
+        history, self._history = self._history, []
+        version = self.version
+        if not dirty and version == self._flushed_version:
+            return 0
+
+        states = [self._probes[probe_id] for probe_id in dirty]
+        table = Probe.__table__
+        try:
+            on_plateau = [state for state in states if state.plateau_id is not None]
+            if on_plateau:
+                await session.execute(
+                    update(table).where(table.c.id == bindparam("b_id")).values(plateau_id=None),
+                    [{"b_id": state.id} for state in on_plateau],
+                )
+            if states:
+                await session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        x=bindparam("b_x"),
+                        y=bindparam("b_y"),
+                        direction=bindparam("b_direction"),
+                        version=bindparam("b_version"),
+                        revision=bindparam("b_revision"),
+                        plateau_id=bindparam("b_plateau_id"),
+                    ),
+                    [
+                        {
+                            "b_id": state.id,
+                            "b_x": state.x,
+                            "b_y": state.y,
+                            "b_direction": state.direction,
+                            "b_version": state.version,
+                            "b_revision": state.revision,
+                            "b_plateau_id": state.plateau_id,
+                        }
+                        for state in states
+                    ],
+                )
+            if history:
+                await session.execute(insert(ProbeMove), history)
+            await session.commit()
+        except Exception:
+            self._dirty |= dirty
+            self._history[:0] = history
+            raise
+
+        self._flushed_version = version
+        return len(states)
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSession(self._engine) as session:
+                    await self.flush(session)
+            except Exception:
+                logger.exception("Failed to flush probe store, will retry")
+
+
+def _matches(state: ProbeState, params: ProbeListParams) -> bool:
+    for name in ("x", "y", "size_x", "size_y"):
+        value = getattr(state, name)
+        lower = getattr(params, f"min_{name}")
+        upper = getattr(params, f"max_{name}")
+        if lower is not None and value < lower:
+            return False
+        if upper is not None and value > upper:
+            return False
+
+    if params.since is not None and state.revision <= params.since:
+        return False
+
+    return params.direction is None or state.direction == params.direction
+
+
+probe_store = ProbeStore()
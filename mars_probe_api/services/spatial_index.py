@@ -0,0 +1,158 @@
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mars_probe_api.models.plateau import Obstacle, Plateau
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.probe_store import probe_store
+
+
+class StaleIndex(Exception):
+    """
+    A cell to free is not occupied, or a cell to take already is: the index
+    no longer matches the probe rows.
+    """
+
+
+class OccupancyIndex:
+    """
+    Occupied cells of a plateau (probes and static obstacles), kept as a
+    sorted list of x per row and of y per column. Checking a straight run
+    of moves is then two bisections, whatever the number of probes.
+    """
+
+    def __init__(self, size_x: int, size_y: int, obstacles_version: int = 0):
+        self.size_x = size_x
+        self.size_y = size_y
+        self.obstacles_version = obstacles_version
+        self._rows: dict[int, list[int]] = defaultdict(list)
+        self._cols: dict[int, list[int]] = defaultdict(list)
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        x, y = cell
+        row = self._rows.get(y, ())
+        i = bisect_left(row, x)
+        return i < len(row) and row[i] == x
+
+    def add(self, x: int, y: int) -> None:
+        insort(self._rows[y], x)
+        insort(self._cols[x], y)
+
+    def remove(self, x: int, y: int) -> None:
+        """Free an occupied cell. Raises `StaleIndex` if it is not occupied."""
+        if (x, y) not in self:
+            raise StaleIndex(x, y)
+
+        row, col = self._rows[y], self._cols[x]
+        row.pop(bisect_left(row, x))
+        col.pop(bisect_left(col, y))
+
+    def move(self, from_cell: tuple[int, int], to_cell: tuple[int, int]) -> None:
+        """
+        Move the reservation of a probe. Raises `StaleIndex` if `from_cell`
+        is not occupied, or if `to_cell` already is.
+        """
+        if from_cell != to_cell:
+            if to_cell in self:
+                raise StaleIndex(*to_cell)
+            self.remove(*from_cell)
+            self.add(*to_cell)
+
+    def free_steps(
+        self, x: int, y: int, heading: int, steps: int, passable: Optional[tuple[int, int]] = None
+    ) -> int:
+        """See `Occupancy`. The `passable` cell, if any, never blocks."""
+        if heading in (0, 2):
+            line, position = self._cols.get(x, ()), y
+            skip = passable[1] if passable is not None and passable[0] == x else None
+        else:
+            line, position = self._rows.get(y, ()), x
+            skip = passable[0] if passable is not None and passable[1] == y else None
+
+        if heading in (0, 1):
+            i = bisect_right(line, position)
+            if i < len(line) and line[i] == skip:
+                i += 1
+            if i < len(line) and line[i] - position <= steps:
+                return line[i] - position - 1
+        else:
+            i = bisect_left(line, position) - 1
+            if i >= 0 and line[i] == skip:
+                i -= 1
+            if i >= 0 and position - line[i] <= steps:
+                return position - line[i] - 1
+
+        return steps
+
+
+class OwnCellView:
+    """
+    `Occupancy` seen by a probe moving from (x, y) over several awaits (a
+    streamed body, a job run in chunks). The start cell stays reserved in
+    the shared index, so no other probe can move into it meanwhile, but the
+    probe itself may cross it. Once done, `OccupancyIndex.move` hands the
+    reservation over to the final cell.
+    """
+
+    def __init__(self, index: OccupancyIndex, x: int, y: int):
+        self.index = index
+        self.cell = (x, y)
+
+    def free_steps(self, x: int, y: int, heading: int, steps: int) -> int:
+        return self.index.free_steps(x, y, heading, steps, passable=self.cell)
+
+
+class PlateauIndexes:
+    """
+    Per-process cache of one `OccupancyIndex` per plateau, built from the
+    database the first time a plateau is used. Moves keep it up to date; an
+    index that may have diverged from the database is simply invalidated
+    and rebuilt on next use. With the write-behind store enabled, probe
+    positions are taken from the store, since the rows lag behind it.
+
+    Nothing tells a process about moves made by another one, so plateau
+    moves require a single worker process, like the write-behind store.
+    With several, the unique position constraint only rejects a move that
+    ends on a taken cell; one crossing a cell another process just took,
+    or blocked by a probe that has since left, goes undetected.
+    """
+
+    def __init__(self):
+        self._indexes: dict[uuid.UUID, OccupancyIndex] = {}
+
+    async def get(self, session: AsyncSession, plateau_id: uuid.UUID) -> Optional[OccupancyIndex]:
+        index = self._indexes.get(plateau_id)
+        if index is not None:
+            return index
+
+        plateau = await session.get(Plateau, plateau_id)
+        if plateau is None:
+            return None
+
+        index = OccupancyIndex(plateau.size_x, plateau.size_y, plateau.obstacles_version)
+        obstacles = select(Obstacle.x, Obstacle.y).where(Obstacle.plateau_id == plateau_id)
+        if probe_store.enabled:
+            cells = list(await session.execute(obstacles))
+            cells += [(state.x, state.y) for state in probe_store.on_plateau(plateau_id)]
+        else:
+            cells = await session.execute(
+                obstacles.union_all(select(Probe.x, Probe.y).where(Probe.plateau_id == plateau_id))
+            )
+        for x, y in cells:
+            index.add(x, y)
+
+        self._indexes[plateau_id] = index
+        return index
+
+    def invalidate(self, plateau_id: Optional[uuid.UUID] = None) -> None:
+        if plateau_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(plateau_id, None)
+
+
+plateau_indexes = PlateauIndexes()
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -8,3 +9,39 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    # Optional read replica, used by read-only endpoints.
+    READ_DATABASE_URL: Optional[str] = None
+
+    # "queue" keeps a pool of connections per process, "null" opens a new
+    # connection per session and is meant for deployments behind PgBouncer.
+    DB_POOL_MODE: Literal["queue", "null"] = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache; set to 0 behind PgBouncer in
+    # transaction pooling mode.
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # "sync" writes every move to the database before answering,
+    # "write_behind" serves probes from memory and flushes them periodically.
+    PROBE_DURABILITY: Literal["sync", "write_behind"] = "sync"
+    PROBE_FLUSH_INTERVAL: float = 1.0
+    # Seconds between writes of the plateau coverage buffered by moves.
+    COVERAGE_FLUSH_INTERVAL: float = 1.0
+
+    # Request, stage and query metrics served at /metrics. When disabled,
+    # neither the middleware nor the query counter run.
+    METRICS_ENABLED: bool = True
+
+    # Requests sent with the X-Profile header are profiled with cProfile and
+    # the stats written to PROFILE_DIR, at most one per PROFILE_MIN_INTERVAL
+    # seconds per process. With PROFILE_TOKEN set, the header must carry it.
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MIN_INTERVAL: float = 60.0
+    PROFILE_TOKEN: Optional[str] = None
+
+    # Worker processes (and queue consumers) of asynchronous move jobs.
+    MOVE_JOB_WORKERS: int = 2
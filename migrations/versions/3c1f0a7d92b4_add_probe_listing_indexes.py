@@ -0,0 +1,45 @@
+"""add probe listing indexes
+
+Revision ID: 3c1f0a7d92b4
+Revises: ff8de762f6bd
+Create Date: 2026-10-18 10:12:44.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0a7d92b4'
+down_revision: Union[str, Sequence[str], None] = 'ff8de762f6bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_probes_position",
+        "probes",
+        ["x", "y", "direction", "id"]
+    )
+    op.create_index(
+        "ix_probes_direction_position",
+        "probes",
+        ["direction", "x", "y", "id"]
+    )
+    op.create_index(
+        "ix_probes_grid_size",
+        "probes",
+        ["size_x", "size_y"],
+        postgresql_include=["id", "x", "y", "direction"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_probes_grid_size", table_name="probes")
+    op.drop_index("ix_probes_direction_position", table_name="probes")
+    op.drop_index("ix_probes_position", table_name="probes")
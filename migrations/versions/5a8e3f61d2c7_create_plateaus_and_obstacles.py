@@ -0,0 +1,56 @@
+"""create plateaus and obstacles
+
+Revision ID: 5a8e3f61d2c7
+Revises: b7d4e2a9c013
+Create Date: 2026-10-18 14:26:51.730218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8e3f61d2c7'
+down_revision: Union[str, Sequence[str], None] = 'b7d4e2a9c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('plateaus',
+    sa.Column('size_x', sa.Integer(), nullable=False),
+    sa.Column('size_y', sa.Integer(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('obstacles_version', sa.Integer(), server_default='0', nullable=False),
+    sa.CheckConstraint('size_x >= 0', name='check_plateau_size_x_non_negative'),
+    sa.CheckConstraint('size_y >= 0', name='check_plateau_size_y_non_negative'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('obstacles',
+    sa.Column('plateau_id', sa.UUID(), nullable=False),
+    sa.Column('x', sa.Integer(), nullable=False),
+    sa.Column('y', sa.Integer(), nullable=False),
+    sa.CheckConstraint('x >= 0', name='check_obstacle_x_non_negative'),
+    sa.CheckConstraint('y >= 0', name='check_obstacle_y_non_negative'),
+    sa.ForeignKeyConstraint(['plateau_id'], ['plateaus.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plateau_id', 'x', 'y')
+    )
+    op.add_column('probes', sa.Column('plateau_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'probes_plateau_id_fkey', 'probes', 'plateaus', ['plateau_id'], ['id']
+    )
+    op.create_unique_constraint(
+        'uq_probes_plateau_position', 'probes', ['plateau_id', 'x', 'y']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_probes_plateau_position', 'probes', type_='unique')
+    op.drop_constraint('probes_plateau_id_fkey', 'probes', type_='foreignkey')
+    op.drop_column('probes', 'plateau_id')
+    op.drop_table('obstacles')
+    op.drop_table('plateaus')
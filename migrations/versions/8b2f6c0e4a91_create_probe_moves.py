@@ -0,0 +1,41 @@
+"""create probe moves
+
+Revision ID: 8b2f6c0e4a91
+Revises: d41c9b7e5f20
+Create Date: 2026-10-18 15:41:37.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2f6c0e4a91'
+down_revision: Union[str, Sequence[str], None] = 'd41c9b7e5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('probe_moves',
+    sa.Column('probe_id', sa.UUID(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('commands', sa.Text(), nullable=False),
+    sa.Column('start_x', sa.Integer(), nullable=False),
+    sa.Column('start_y', sa.Integer(), nullable=False),
+    sa.Column('start_direction', sa.String(length=5), nullable=False),
+    sa.Column('end_x', sa.Integer(), nullable=False),
+    sa.Column('end_y', sa.Integer(), nullable=False),
+    sa.Column('end_direction', sa.String(length=5), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['probe_id'], ['probes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('probe_id', 'seq')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('probe_moves')
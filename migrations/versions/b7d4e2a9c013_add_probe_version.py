@@ -0,0 +1,31 @@
+"""add probe version
+
+Revision ID: b7d4e2a9c013
+Revises: 3c1f0a7d92b4
+Create Date: 2026-10-18 11:03:17.094512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2a9c013'
+down_revision: Union[str, Sequence[str], None] = '3c1f0a7d92b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "probes",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("probes", "version")
@@ -0,0 +1,33 @@
+"""add probe revision
+
+Revision ID: c6a1f4d8e2b7
+Revises: 8b2f6c0e4a91
+Create Date: 2026-10-18 17:12:05.418362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a1f4d8e2b7'
+down_revision: Union[str, Sequence[str], None] = '8b2f6c0e4a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "probes",
+        sa.Column("revision", sa.BigInteger(), nullable=False, server_default="0")
+    )
+    op.create_index("ix_probes_revision", "probes", ["revision"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_probes_revision", table_name="probes")
+    op.drop_column("probes", "revision")
@@ -0,0 +1,36 @@
+"""create plateau coverage
+
+Revision ID: d41c9b7e5f20
+Revises: 5a8e3f61d2c7
+Create Date: 2026-10-18 15:02:13.480126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c9b7e5f20'
+down_revision: Union[str, Sequence[str], None] = '5a8e3f61d2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('plateau_coverage_chunks',
+    sa.Column('plateau_id', sa.UUID(), nullable=False),
+    sa.Column('cx', sa.Integer(), nullable=False),
+    sa.Column('cy', sa.Integer(), nullable=False),
+    sa.Column('cells', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('bits', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['plateau_id'], ['plateaus.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plateau_id', 'cx', 'cy')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('plateau_coverage_chunks')
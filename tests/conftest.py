@@ -2,13 +2,20 @@ import pytest
 import pytest_asyncio
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from mars_probe_api.app import app
-from mars_probe_api.database import get_session
+from mars_probe_api.database import get_read_session, get_session, get_session_factory, settings
 from mars_probe_api.models import table_registry
+from mars_probe_api.models.plateau import Obstacle, Plateau
 from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.coverage import coverage_store
+from mars_probe_api.services.fleet_state import listing_cache
+from mars_probe_api.services.path_planner import path_planner
+from mars_probe_api.services.probe_store import probe_store
+from mars_probe_api.services.spatial_index import plateau_indexes
 
 
 @pytest_asyncio.fixture
@@ -30,14 +37,22 @@ async def db_session():
 
 
 @pytest_asyncio.fixture
-async def app_client(db_session):
+async def app_client(db_session, monkeypatch):
+    # Coverage is flushed by the tests themselves, into the test database.
+    monkeypatch.setattr(settings, "COVERAGE_FLUSH_INTERVAL", 3600.0)
+
     async def get_session_override():
         yield db_session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_session_factory] = lambda: lambda: AsyncSession(
+        db_session.bind, expire_on_commit=False
+    )
 
     with TestClient(app) as client:
         yield client
+        coverage_store.clear()
 
     app.dependency_overrides.clear()
 
@@ -58,3 +73,45 @@ async def probe_b(db_session):
     await db_session.commit()
     await db_session.refresh(probe)
     return probe
+
+
+@pytest.fixture
+def statements(db_session):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture
+async def write_behind(db_session):
+    await probe_store.load(db_session)
+    yield probe_store
+    probe_store.__init__()
+
+
+@pytest.fixture(autouse=True)
+def clear_plateau_caches():
+    yield
+    plateau_indexes.invalidate()
+    path_planner.clear()
+    listing_cache.clear()
+    coverage_store.clear()
+
+
+@pytest_asyncio.fixture
+async def plateau(db_session):
+    plateau = Plateau(size_x=5, size_y=5)
+    db_session.add(plateau)
+    await db_session.flush()
+    db_session.add_all([
+        Obstacle(plateau_id=plateau.id, x=0, y=3),
+        Obstacle(plateau_id=plateau.id, x=3, y=0),
+    ])
+    await db_session.commit()
+    return plateau
@@ -23,6 +23,9 @@ class TestProbeModel:
             "x": 0,
             "y": 0,
             "direction": "NORTH",
+            "version": 0,
+            "plateau_id": None,
+            "revision": 0,
         }
 
     async def test_create_probe_with_invalid_direction(self, db_session):
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.asyncio
+class TestPoolStatus:
+    async def test_pool_status(self, app_client):
+        response = app_client.get("/health/pool")
+        assert response.status_code == 200
+
+        pools = response.json()["pools"]
+        assert list(pools) == ["primary"]
+        assert pools["primary"]["pool"]
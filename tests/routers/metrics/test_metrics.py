@@ -0,0 +1,65 @@
+import pytest
+
+from mars_probe_api.metrics import Histogram, metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name} not found")
+
+
+class TestHistogram:
+    def test_render_is_cumulative(self):
+        histogram = Histogram("latency", "Latency.", (1, 5), ("endpoint",))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value, "/a")
+
+        assert list(histogram.render()) == [
+            "# HELP latency Latency.",
+            "# TYPE latency histogram",
+            'latency_bucket{endpoint="/a",le="1"} 2',
+            'latency_bucket{endpoint="/a",le="5"} 3',
+            'latency_bucket{endpoint="/a",le="+Inf"} 4',
+            'latency_sum{endpoint="/a"} 14.5',
+            'latency_count{endpoint="/a"} 4',
+        ]
+
+
+@pytest.mark.asyncio
+class TestMetrics:
+    async def test_move_records_stages_and_queries(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MMRMM"})
+        assert response.status_code == 200
+
+        text = app_client.get("/metrics").text
+        endpoint = 'endpoint="/probes/{probe_id}/move"'
+        assert sample(text, f'probe_api_requests_total{{method="PUT",{endpoint},status="200"}}') == 1
+        for stage in ("fetch", "simulate", "persist", "serialize"):
+            assert sample(text, f'probe_api_stage_duration_seconds_count{{{endpoint},stage="{stage}"}}') == 1
+        # Select, compare-and-swap update and history insert.
+        assert sample(text, f"probe_api_request_queries_sum{{{endpoint}}}") == 3
+        assert sample(text, 'probe_api_command_length_bucket{le="10"}') == 1
+
+    async def test_failed_requests_are_labelled_with_status(self, app_client, probe_a):
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MMMMMMMM"})
+
+        text = app_client.get("/metrics").text
+        assert sample(
+            text,
+            'probe_api_requests_total{method="PUT",endpoint="/probes/{probe_id}/move",status="400"}',
+        ) == 1
+
+    async def test_stages_are_ignored_outside_requests(self):
+        with metrics.stage("simulate"):
+            metrics.observe_commands(10)
+        assert "probe_api_stage_duration_seconds_count" not in metrics.render()
+        assert metrics.command_length.count() == 0
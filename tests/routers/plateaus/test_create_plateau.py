@@ -0,0 +1,36 @@
+import pytest
+import uuid
+
+
+@pytest.mark.asyncio
+class TestPlateauCreate:
+    async def test_create_plateau_success(self, app_client):
+        payload = {"x": 10, "y": 8, "obstacles": [{"x": 1, "y": 2}, {"x": 1, "y": 2}, {"x": 10, "y": 8}]}
+
+        response = app_client.post("/plateaus", json=payload)
+        assert response.status_code == 201
+
+        data = response.json()
+        assert (data["x"], data["y"]) == (10, 8)
+        assert data["obstacles"] == [{"x": 1, "y": 2}, {"x": 10, "y": 8}]
+
+        response = app_client.get(f"/plateaus/{data['id']}")
+        assert response.status_code == 200
+        assert response.json() == data
+
+    @pytest.mark.parametrize(
+        "payload, expected_detail",
+        [
+            ({"x": -1, "y": 5}, "X must be a non-negative integer"),
+            ({"x": 5, "y": -1}, "Y must be a non-negative integer"),
+            ({"x": 5, "y": 5, "obstacles": [{"x": 6, "y": 0}]}, "Obstacles must be inside the plateau"),
+        ]
+    )
+    async def test_create_plateau_with_invalid_values(self, app_client, payload, expected_detail):
+        response = app_client.post("/plateaus", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == expected_detail
+
+    async def test_get_plateau_not_found(self, app_client):
+        response = app_client.get(f"/plateaus/{uuid.uuid4()}")
+        assert response.status_code == 404
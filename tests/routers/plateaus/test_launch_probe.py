@@ -0,0 +1,36 @@
+import pytest
+import uuid
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import Probe
+
+
+@pytest.mark.asyncio
+class TestPlateauLaunchProbe:
+    async def test_launch_probe_success(self, app_client, db_session, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        assert response.status_code == 201
+
+        data = response.json()
+        assert (data["x"], data["y"], data["direction"]) == (0, 0, "EAST")
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == uuid.UUID(data["id"])))
+        assert db_probe.plateau_id == plateau.id
+        assert (db_probe.size_x, db_probe.size_y) == (5, 5)
+
+    async def test_launch_probe_on_occupied_position(self, app_client, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        assert response.status_code == 201
+
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Launch position (0, 0) is occupied"
+
+    async def test_launch_probe_with_invalid_direction(self, app_client, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "UP"})
+        assert response.status_code == 400
+
+    async def test_launch_probe_plateau_not_found(self, app_client):
+        response = app_client.post(f"/plateaus/{uuid.uuid4()}/probes", json={"direction": "EAST"})
+        assert response.status_code == 404
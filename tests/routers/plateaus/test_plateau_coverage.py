@@ -0,0 +1,84 @@
+import pytest
+import uuid
+
+from mars_probe_api.services.coverage import coverage_store
+
+
+@pytest.mark.asyncio
+class TestPlateauCoverage:
+    async def test_coverage_of_new_plateau(self, app_client):
+        response = app_client.post("/plateaus", json={"x": 9, "y": 9, "obstacles": [{"x": 5, "y": 5}]})
+        plateau_id = response.json()["id"]
+
+        response = app_client.get(f"/plateaus/{plateau_id}/coverage")
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": plateau_id,
+            "total_cells": 100,
+            "free_cells": 99,
+            "covered_cells": 0,
+            "coverage": 0.0,
+            "chunks": 0,
+            "stored_bytes": 0,
+        }
+
+    async def test_moves_record_coverage(self, app_client, db_session, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        probe_id = response.json()["id"]
+
+        app_client.put(f"/probes/{probe_id}/move", json={"commands": "MMLMM"})
+        # Crossing visited cells again does not count twice.
+        app_client.put(f"/probes/{probe_id}/move", json={"commands": "LLMMRMM"})
+
+        await coverage_store.flush(db_session)
+        response = app_client.get(f"/plateaus/{plateau.id}/coverage")
+        data = response.json()
+        assert data["covered_cells"] == 5
+        assert data["free_cells"] == 34
+        assert data["coverage"] == pytest.approx(5 / 34)
+        assert data["chunks"] == 1
+        assert data["stored_bytes"] > 0
+
+        bitmap = await coverage_store.load(db_session, plateau.id)
+        assert all(cell in bitmap for cell in [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)])
+
+    async def test_batch_moves_record_coverage(self, app_client, db_session, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        probe_id = response.json()["id"]
+
+        app_client.post(
+            "/probes/moves",
+            json={"moves": [{"probe_id": probe_id, "commands": "MM"}, {"probe_id": probe_id, "commands": "LM"}]},
+        )
+        app_client.put("/probes/move", json={"probe_ids": [probe_id], "commands": "M"})
+
+        await coverage_store.flush(db_session)
+        response = app_client.get(f"/plateaus/{plateau.id}/coverage")
+        assert response.json()["covered_cells"] == 5
+
+    async def test_failed_moves_do_not_record_coverage(self, app_client, db_session, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        probe_id = response.json()["id"]
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "MMMM"})
+        assert response.status_code == 400
+
+        await coverage_store.flush(db_session)
+        response = app_client.get(f"/plateaus/{plateau.id}/coverage")
+        assert response.json()["covered_cells"] == 1
+
+    async def test_coverage_lags_until_flushed(self, app_client, db_session, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        probe_id = response.json()["id"]
+        app_client.put(f"/probes/{probe_id}/move", json={"commands": "MM"})
+
+        response = app_client.get(f"/plateaus/{plateau.id}/coverage")
+        assert response.json()["covered_cells"] == 0
+
+        assert await coverage_store.flush(db_session) == 1
+        response = app_client.get(f"/plateaus/{plateau.id}/coverage")
+        assert response.json()["covered_cells"] == 3
+
+    async def test_coverage_plateau_not_found(self, app_client):
+        response = app_client.get(f"/plateaus/{uuid.uuid4()}/coverage")
+        assert response.status_code == 404
@@ -63,3 +63,11 @@ class TestProbeCreate:
         assert response.status_code == 422
         resp_json = response.json()
         assert any(expected_msg in err.get("msg", "").lower() for err in resp_json["detail"])
+
+    async def test_create_probe_statements(self, app_client, statements):
+        response = app_client.post("/probes", json={"x": 5, "y": 5, "direction": "NORTH"})
+        assert response.status_code == 201
+
+        assert len(statements) == 1
+        assert statements[0].startswith("INSERT INTO probes")
+        assert "RETURNING" in statements[0]
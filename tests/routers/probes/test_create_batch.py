@@ -0,0 +1,49 @@
+import pytest
+import uuid
+
+from sqlalchemy import select
+from mars_probe_api.models.probe import Probe
+
+
+@pytest.mark.asyncio
+class TestProbeCreateBatch:
+    async def test_create_batch_success(self, app_client, db_session):
+        payload = {
+            "probes": [
+                {"x": 5, "y": 5, "direction": "NORTH"},
+                {"x": 3, "y": 7, "direction": "WEST"},
+            ]
+        }
+
+        response = app_client.post("/probes/batch", json=payload)
+        assert response.status_code == 201
+
+        probes = response.json()["probes"]
+        assert len(probes) == 2
+        assert [p["direction"] for p in probes] == ["NORTH", "WEST"]
+        assert all(p["x"] == 0 and p["y"] == 0 for p in probes)
+
+        db_probes = (await db_session.scalars(
+            select(Probe).where(Probe.id.in_([uuid.UUID(p["id"]) for p in probes]))
+        )).all()
+        sizes = {str(p.id): (p.size_x, p.size_y) for p in db_probes}
+        assert sizes == {probes[0]["id"]: (5, 5), probes[1]["id"]: (3, 7)}
+
+    async def test_create_batch_rejects_whole_batch(self, app_client, db_session):
+        payload = {
+            "probes": [
+                {"x": 5, "y": 5, "direction": "NORTH"},
+                {"x": 5, "y": 5, "direction": "UP"},
+            ]
+        }
+
+        response = app_client.post("/probes/batch", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == (
+            "probes[1]: Direction must be one of ['NORTH', 'EAST', 'SOUTH', 'WEST']"
+        )
+        assert (await db_session.scalars(select(Probe))).all() == []
+
+    async def test_create_batch_without_probes(self, app_client):
+        response = app_client.post("/probes/batch", json={"probes": []})
+        assert response.status_code == 422
@@ -0,0 +1,89 @@
+import pytest
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import ProbeMove
+
+
+@pytest.mark.asyncio
+class TestProbeHistory:
+    async def test_moves_are_recorded(self, app_client, db_session, probe_a):
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MMMRR"})
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "LM"})
+
+        response = app_client.get(f"/probes/{probe_a.id}/history")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["next_after"] is None
+        assert [move["seq"] for move in data["moves"]] == [1, 2]
+        assert data["moves"][0]["commands"] == "MMMRR"
+        assert data["moves"][0]["start"] == {"x": 0, "y": 0, "direction": "NORTH"}
+        assert data["moves"][0]["end"] == {"x": 0, "y": 3, "direction": "SOUTH"}
+        assert data["moves"][1]["start"] == data["moves"][0]["end"]
+        assert data["moves"][1]["end"] == {"x": 1, "y": 3, "direction": "EAST"}
+
+        stored = await db_session.scalars(select(ProbeMove.commands).order_by(ProbeMove.seq))
+        assert list(stored) == ["3M2R", "LM"]
+
+    async def test_failed_moves_are_not_recorded(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MMMMMM"})
+        assert response.status_code == 400
+
+        response = app_client.get(f"/probes/{probe_a.id}/history")
+        assert response.json()["moves"] == []
+
+    async def test_history_pagination(self, app_client, probe_a):
+        for _ in range(5):
+            app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "R"})
+
+        response = app_client.get(f"/probes/{probe_a.id}/history", params={"limit": 2})
+        data = response.json()
+        assert [move["seq"] for move in data["moves"]] == [1, 2]
+        assert data["next_after"] == 2
+
+        response = app_client.get(
+            f"/probes/{probe_a.id}/history", params={"limit": 2, "after": data["next_after"]}
+        )
+        assert [move["seq"] for move in response.json()["moves"]] == [3, 4]
+
+    async def test_pose_at_sequence(self, app_client, probe_a):
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "RM"})
+
+        response = app_client.get(f"/probes/{probe_a.id}/history/1")
+        assert response.status_code == 200
+        assert response.json()["end"] == {"x": 0, "y": 1, "direction": "NORTH"}
+
+        response = app_client.get(f"/probes/{probe_a.id}/history/3")
+        assert response.status_code == 404
+
+    async def test_batch_moves_are_recorded(self, app_client, probe_a, probe_b):
+        app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": str(probe_a.id), "commands": "M"},
+                    {"probe_id": str(probe_a.id), "commands": "MMMMMMMM"},
+                    {"probe_id": str(probe_a.id), "commands": "RM"},
+                ]
+            },
+        )
+        app_client.put(
+            "/probes/move", json={"probe_ids": [str(probe_a.id), str(probe_b.id)], "commands": "M"}
+        )
+
+        moves = app_client.get(f"/probes/{probe_a.id}/history").json()["moves"]
+        assert [(move["seq"], move["commands"]) for move in moves] == [(1, "MRM"), (2, "M")]
+        assert moves[0]["end"] == {"x": 1, "y": 1, "direction": "EAST"}
+
+        moves = app_client.get(f"/probes/{probe_b.id}/history").json()["moves"]
+        assert [(move["seq"], move["commands"]) for move in moves] == [(1, "M")]
+
+    async def test_history_probe_not_found(self, app_client):
+        response = app_client.get("/probes/3fa85f64-5717-4562-b3fc-2c963f66afa6/history")
+        assert response.status_code == 404
+
+    async def test_history_invalid_probe_id(self, app_client):
+        response = app_client.get("/probes/not-a-uuid/history")
+        assert response.status_code == 400
@@ -1,4 +1,11 @@
+import json
+
 import pytest
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.routers import probes
+from mars_probe_api.schemas.probe import MAX_PAGE_SIZE, ProbeListResponse
 
 
 @pytest.mark.asyncio
@@ -48,3 +55,143 @@ class TestListProbe:
             assert isinstance(p["x"], int)
             assert isinstance(p["y"], int)
             assert p["direction"] in ["NORTH", "SOUTH", "EAST", "WEST"]
+
+    async def test_list_probes_paginated(self, app_client, probe_a, probe_b):
+        first_id, second_id = sorted([str(probe_a.id), str(probe_b.id)])
+
+        response = app_client.get("/probes", params={"limit": 1})
+        assert response.status_code == 200
+        data = response.json()
+        assert [p["id"] for p in data["probes"]] == [first_id]
+        assert data["next_after"] == first_id
+
+        response = app_client.get("/probes", params={"limit": 1, "after": data["next_after"]})
+        data = response.json()
+        assert [p["id"] for p in data["probes"]] == [second_id]
+        assert data["next_after"] is None
+
+    async def test_list_probes_invalid_limit(self, app_client):
+        response = app_client.get("/probes", params={"limit": 0})
+        assert response.status_code == 422
+
+    async def test_list_probes_limit_above_maximum(self, app_client):
+        response = app_client.get("/probes", params={"limit": MAX_PAGE_SIZE + 1})
+        assert response.status_code == 422
+
+    async def test_list_probes_default_page_size(self, app_client, probe_a, probe_b, monkeypatch):
+        monkeypatch.setattr(probes, "DEFAULT_PAGE_SIZE", 1)
+        first_id = min(str(probe_a.id), str(probe_b.id))
+
+        data = app_client.get("/probes").json()
+        assert [p["id"] for p in data["probes"]] == [first_id]
+        assert data["next_after"] == first_id
+
+    async def test_list_probes_stream(self, app_client, probe_a, probe_b):
+        response = app_client.get("/probes", params={"stream": True})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [p["id"] for p in lines] == sorted([str(probe_a.id), str(probe_b.id)])
+        assert set(lines[0].keys()) == {"id", "x", "y", "direction"}
+
+    async def test_list_probes_stream_after(self, app_client, probe_a, probe_b):
+        first_id, second_id = sorted([str(probe_a.id), str(probe_b.id)])
+
+        response = app_client.get("/probes", params={"stream": True, "after": first_id})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [p["id"] for p in lines] == [second_id]
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"direction": "EAST"}, ["b"]),
+            ({"min_x": 1}, ["c"]),
+            ({"min_x": 0, "max_x": 1, "min_y": 0, "max_y": 0}, ["a", "b"]),
+            ({"min_size_x": 4}, ["a", "c"]),
+            ({"max_size_y": 3}, ["b"]),
+            ({"min_size_x": 4, "direction": "NORTH", "max_y": 1}, ["a"]),
+        ]
+    )
+    async def test_list_probes_filtered(self, app_client, db_session, probe_a, probe_b, params, expected):
+        probe_c = Probe(size_x=10, size_y=10, x=4, y=2, direction="NORTH")
+        db_session.add(probe_c)
+        await db_session.commit()
+        names = {str(probe_a.id): "a", str(probe_b.id): "b", str(probe_c.id): "c"}
+
+        response = app_client.get("/probes", params=params)
+        assert response.status_code == 200
+        assert sorted(names[p["id"]] for p in response.json()["probes"]) == expected
+
+    @pytest.mark.parametrize("params", [{"direction": "UP"}, {"min_x": -1}])
+    async def test_list_probes_invalid_filters(self, app_client, params):
+        response = app_client.get("/probes", params=params)
+        assert response.status_code == 422
+
+    async def test_list_probes_matches_response_model(self, app_client, probe_a, probe_b):
+        response = app_client.get("/probes", params={"limit": 1})
+        assert response.headers["content-type"] == "application/json"
+
+        data = response.json()
+        assert ProbeListResponse.model_validate(data).model_dump(mode="json") == data
+
+    async def test_list_probes_etag_not_modified(self, app_client, probe_a, statements):
+        response = app_client.get("/probes")
+        etag = response.headers["etag"]
+
+        statements.clear()
+        response = app_client.get("/probes", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert len(statements) == 1
+        assert "max(probes.revision)" in statements[0]
+
+    async def test_list_probes_etag_changes_on_move(self, app_client, probe_a):
+        etag = app_client.get("/probes").headers["etag"]
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+
+        response = app_client.get("/probes", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["probes"][0]["y"] == 1
+
+    async def test_list_probes_served_from_cache(self, app_client, probe_a, statements):
+        first = app_client.get("/probes", params={"limit": 10})
+        statements.clear()
+        second = app_client.get("/probes", params={"limit": 10})
+
+        assert second.content == first.content
+        assert len(statements) == 1
+
+    async def test_list_probes_write_takes_next_revision(self, app_client, db_session, probe_a, probe_b):
+        probe_id = probe_a.id
+        probe_a.revision, probe_b.revision = 5, 9
+        await db_session.commit()
+        etag = app_client.get("/probes").headers["etag"]
+
+        app_client.put(f"/probes/{probe_id}/move", json={"commands": "M"})
+
+        response = app_client.get("/probes", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["version"] == 10
+        assert await db_session.scalar(select(Probe.revision).where(Probe.id == probe_id)) == 10
+
+    async def test_list_probes_since(self, app_client, db_session, probe_a, probe_b):
+        probe_a.revision, probe_b.revision = 1, 10
+        await db_session.commit()
+
+        data = app_client.get("/probes", params={"since": 5}).json()
+        assert [probe["id"] for probe in data["probes"]] == [str(probe_b.id)]
+        assert data["version"] == 10
+
+        data = app_client.get("/probes", params={"since": data["version"]}).json()
+        assert data["probes"] == []
+
+    async def test_list_probes_since_ahead_lists_every_probe(self, app_client, db_session, probe_a, probe_b):
+        probe_a.revision, probe_b.revision = 1, 10
+        await db_session.commit()
+
+        data = app_client.get("/probes", params={"since": 50}).json()
+        assert len(data["probes"]) == 2
+        assert data["version"] == 10
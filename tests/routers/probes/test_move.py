@@ -1,9 +1,11 @@
 import pytest
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from types import SimpleNamespace
 
 from mars_probe_api.models.probe import Probe
+from mars_probe_api.routers import probes
 
 
 @pytest.mark.asyncio
@@ -46,6 +48,11 @@ class TestProbeMove:
         response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
         assert response.status_code == 400
         assert "exceed grid limits" in response.text
+
+    async def test_move_probe_failure_reports_position(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MMMMMMMM"})
+        assert response.status_code == 400
+        assert response.json()["detail"].endswith("(command at position 5)")
     
     async def test_move_probe_partial_sequence_not_applied(self, app_client, db_session, probe_b):
         response = app_client.put(f"/probes/{probe_b.id}/move", json={"commands": "MMMMM"})
@@ -60,7 +67,7 @@ class TestProbeMove:
     @pytest.mark.parametrize(
         "payload, expected_detail",
         [
-            ({"commands": "MXR"}, "Invalid command sequence. Allowed commands: 'M', 'L', 'R'."),
+            ({"commands": "MXR"}, "Invalid command sequence. Allowed commands: 'M', 'L', 'R'. (command at position 1)"),
             ({"commands": ""}, "Field 'commands' is required and must be a non-empty string."),
         ]
     )
@@ -82,3 +89,58 @@ class TestProbeMove:
 
         resp_json = response.json()
         assert any(expected_detail in err.get("msg", "") for err in resp_json["detail"])
+
+    async def test_move_probe_increments_version(self, app_client, db_session, probe_a):
+        for _ in range(2):
+            response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+            assert response.status_code == 200
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_a.id))
+        await db_session.refresh(db_probe)
+        assert db_probe.version == 2
+        assert db_probe.y == 2
+
+    async def test_move_probe_retries_after_concurrent_move(self, app_client, db_session, probe_a, monkeypatch):
+        load_poses = probes._load_poses
+        calls = []
+
+        async def load_poses_with_concurrent_move(session, probe_ids):
+            calls.append(probe_ids)
+            if len(calls) == 1:
+                await session.execute(
+                    update(Probe).where(Probe.id == probe_a.id).values(y=3, version=Probe.version + 1)
+                )
+                await session.commit()
+                rows = await load_poses(session, probe_ids)
+                return {key: SimpleNamespace(**{**row._asdict(), "y": 0, "version": 0}) for key, row in rows.items()}
+            return await load_poses(session, probe_ids)
+
+        monkeypatch.setattr(probes, "_load_poses", load_poses_with_concurrent_move)
+
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+        assert response.status_code == 200
+        assert response.json()["y"] == 4
+        assert len(calls) == 2
+
+    async def test_move_probe_conflict_after_max_attempts(self, app_client, probe_a, monkeypatch):
+        load_poses = probes._load_poses
+
+        async def load_stale_poses(session, probe_ids):
+            rows = await load_poses(session, probe_ids)
+            return {key: SimpleNamespace(**{**row._asdict(), "version": -1}) for key, row in rows.items()}
+
+        monkeypatch.setattr(probes, "_load_poses", load_stale_poses)
+
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+        assert response.status_code == 409
+        assert "moved concurrently" in response.text
+
+    async def test_move_probe_statements(self, app_client, probe_a, statements):
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MM"})
+        assert response.status_code == 200
+
+        assert len(statements) == 3
+        assert statements[0].startswith("SELECT")
+        assert statements[1].startswith("UPDATE probes")
+        assert "RETURNING" in statements[1]
+        assert statements[2].startswith("INSERT INTO probe_moves")
@@ -0,0 +1,79 @@
+import pytest
+import uuid
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import Probe
+
+
+@pytest.mark.asyncio
+class TestProbeMoveBatch:
+    async def test_move_batch_success(self, app_client, db_session, probe_a, probe_b):
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": str(probe_a.id), "commands": "MM"},
+                    {"probe_id": str(probe_b.id), "commands": "MLM"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert all(r["success"] for r in results)
+        assert (results[0]["x"], results[0]["y"], results[0]["direction"]) == (0, 2, "NORTH")
+        assert (results[1]["x"], results[1]["y"], results[1]["direction"]) == (1, 1, "NORTH")
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_b.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.x, db_probe.y, db_probe.direction) == (1, 1, "NORTH")
+
+    async def test_move_batch_chains_moves_of_same_probe(self, app_client, db_session, probe_a):
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": str(probe_a.id), "commands": "MM"},
+                    {"probe_id": str(probe_a.id), "commands": "RM"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert (results[1]["x"], results[1]["y"], results[1]["direction"]) == (1, 2, "EAST")
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_a.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.x, db_probe.y, db_probe.direction) == (1, 2, "EAST")
+
+    async def test_move_batch_partial_failures(self, app_client, db_session, probe_a, probe_b):
+        fake_id = uuid.uuid4()
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": str(probe_a.id), "commands": "M"},
+                    {"probe_id": str(probe_b.id), "commands": "MMMM"},
+                    {"probe_id": str(probe_b.id), "commands": "MXR"},
+                    {"probe_id": str(fake_id), "commands": "M"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert [r["success"] for r in results] == [True, False, False, False]
+        assert results[1]["failed_at"] == 3
+        assert "exceed grid limits" in results[1]["detail"]
+        assert "Invalid command sequence" in results[2]["detail"]
+        assert results[3]["detail"] == "Probe not found"
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_b.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.x, db_probe.y, db_probe.direction) == (0, 0, "EAST")
+
+    async def test_move_batch_without_moves(self, app_client):
+        response = app_client.post("/probes/moves", json={"moves": []})
+        assert response.status_code == 422
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import ProbeMove
+from mars_probe_api.routers import probes
+from mars_probe_api.services.coverage import coverage_store
+from mars_probe_api.services.spatial_index import plateau_indexes
+
+
+def wait_for_job(app_client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = app_client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+class TestProbeMoveJob:
+    async def test_move_job_success(self, app_client, db_session, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move?async=true", json={"commands": "MMRMML"})
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        assert response.json()["total"] == 6
+
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "succeeded"
+        assert (job["done"], job["x"], job["y"], job["direction"]) == (6, 2, 2, "NORTH")
+
+        probe = app_client.get("/probes").json()["probes"][0]
+        assert (probe["x"], probe["y"], probe["direction"]) == (2, 2, "NORTH")
+        commands = await db_session.scalar(select(ProbeMove.commands).where(ProbeMove.probe_id == probe_a.id))
+        assert commands == "2MR2ML"
+
+    async def test_move_job_in_chunks(self, app_client, db_session, probe_a, monkeypatch):
+        monkeypatch.setattr(probes, "JOB_CHUNK_SIZE", 4)
+        response = app_client.put(f"/probes/{probe_a.id}/move?async=true", json={"commands": "MMMRRRRLLMMM"})
+
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "succeeded"
+        assert (job["x"], job["y"], job["direction"]) == (0, 0, "SOUTH")
+        commands = await db_session.scalar(select(ProbeMove.commands).where(ProbeMove.probe_id == probe_a.id))
+        assert commands == "3M4R2L3M"
+
+    async def test_move_job_out_of_bounds(self, app_client, probe_a, monkeypatch):
+        monkeypatch.setattr(probes, "JOB_CHUNK_SIZE", 4)
+        response = app_client.put(f"/probes/{probe_a.id}/move?async=true", json={"commands": "RRRRMMMMMMMM"})
+
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "failed"
+        assert job["detail"].endswith("(command at position 9)")
+        assert app_client.get("/probes").json()["probes"][0]["y"] == 0
+
+    async def test_move_job_on_plateau(self, app_client, db_session, plateau):
+        plateau_id = plateau.id
+        probe_id = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "NORTH"}).json()["id"]
+
+        response = app_client.put(f"/probes/{probe_id}/move?async=true", json={"commands": "MMM"})
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "failed"
+        assert "collide" in job["detail"]
+
+        response = app_client.put(f"/probes/{probe_id}/move?async=true", json={"commands": "MMRM"})
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "succeeded"
+        await coverage_store.flush(db_session)
+        assert app_client.get(f"/plateaus/{plateau_id}/coverage").json()["covered_cells"] == 4
+
+    async def test_move_job_on_plateau_keeps_start_cell_reserved(
+        self, app_client, db_session, plateau, monkeypatch
+    ):
+        monkeypatch.setattr(probes, "JOB_CHUNK_SIZE", 3)
+        plateau_id = plateau.id
+        probe_id = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"}).json()["id"]
+        index = await plateau_indexes.get(db_session, plateau_id)
+
+        response = app_client.put(f"/probes/{probe_id}/move?async=true", json={"commands": "MMRRMMMM"})
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "failed"
+        assert (0, 0) in index
+        assert (0, 2) not in index
+
+        response = app_client.put(f"/probes/{probe_id}/move?async=true", json={"commands": "RMLMLMLMLM"})
+        job = wait_for_job(app_client, response.json()["id"])
+        assert job["status"] == "succeeded"
+        assert (job["x"], job["y"]) == (1, 0)
+        assert (0, 0) not in index
+        assert (1, 0) in index
+
+    async def test_move_job_rejected_upfront(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move?async=true", json={"commands": "MXM"})
+        assert response.status_code == 400
+        assert "position 1" in response.json()["detail"]
+
+        response = app_client.put(
+            "/probes/3fa85f64-5717-4562-b3fc-2c963f66afa6/move?async=true", json={"commands": "M"}
+        )
+        assert response.status_code == 404
+
+    async def test_job_not_found(self, app_client):
+        response = app_client.get("/jobs/3fa85f64-5717-4562-b3fc-2c963f66afa6")
+        assert response.status_code == 404
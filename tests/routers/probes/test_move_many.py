@@ -0,0 +1,111 @@
+import pytest
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+from types import SimpleNamespace
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.routers import probes
+
+
+@pytest.mark.asyncio
+class TestProbeMoveMany:
+    async def test_move_many_success(self, app_client, db_session, probe_a, probe_b):
+        response = app_client.put(
+            "/probes/move",
+            json={"probe_ids": [str(probe_a.id), str(probe_b.id)], "commands": "MML"},
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert [r["id"] for r in results] == [str(probe_a.id), str(probe_b.id)]
+        assert all(r["success"] for r in results)
+        assert (results[0]["x"], results[0]["y"], results[0]["direction"]) == (0, 2, "WEST")
+        assert (results[1]["x"], results[1]["y"], results[1]["direction"]) == (2, 0, "NORTH")
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_b.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.x, db_probe.y, db_probe.direction) == (2, 0, "NORTH")
+        assert db_probe.version == 1
+
+    async def test_move_many_partial_failure(self, app_client, db_session, probe_a, probe_b):
+        response = app_client.put(
+            "/probes/move",
+            json={"probe_ids": [str(probe_a.id), str(probe_b.id)], "commands": "RMMMM"},
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert results[0]["success"] is True
+        assert (results[0]["x"], results[0]["y"]) == (4, 0)
+        assert results[1]["success"] is False
+        assert results[1]["failed_at"] == 1
+        assert "exceed grid limits" in results[1]["detail"]
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_b.id))
+        assert (db_probe.x, db_probe.y, db_probe.direction) == (0, 0, "EAST")
+
+    async def test_move_many_conflict_when_a_probe_moved_concurrently(
+        self, app_client, db_session, probe_a, probe_b, monkeypatch
+    ):
+        probe_ids = [probe_a.id, probe_b.id]
+        load_poses = probes._load_poses
+
+        async def load_poses_with_stale_probe_b(session, ids):
+            rows = await load_poses(session, ids)
+            return {
+                key: SimpleNamespace(**{**row._asdict(), "version": -1}) if key == probe_ids[1] else row
+                for key, row in rows.items()
+            }
+
+        monkeypatch.setattr(probes, "_load_poses", load_poses_with_stale_probe_b)
+
+        response = app_client.put(
+            "/probes/move", json={"probe_ids": [str(i) for i in probe_ids], "commands": "M"}
+        )
+        assert response.status_code == 409
+
+        versions = await db_session.scalars(select(Probe.version).where(Probe.id.in_(probe_ids)))
+        assert list(versions) == [0, 0]
+
+    async def test_update_poses_statement_returns_updated_ids(self):
+        pose = {"id": uuid.uuid4(), "version": 3, "x": 1, "y": 2, "direction": "EAST", "plateau_id": None}
+        sql = str(probes._update_poses_statement([pose, pose], 7).compile(dialect=asyncpg.dialect()))
+
+        assert "FROM (VALUES ($" in sql
+        assert "AS poses (id, version, x, y, direction, plateau_id)" in sql
+        assert "probes.version = poses.version" in sql
+        assert sql.endswith("RETURNING probes.id")
+
+    async def test_move_many_not_found(self, app_client, probe_a):
+        fake_id = uuid.uuid4()
+        response = app_client.put(
+            "/probes/move",
+            json={"probe_ids": [str(fake_id), str(probe_a.id)], "commands": "M"},
+        )
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert results[0] == {
+            "id": str(fake_id),
+            "success": False,
+            "x": None,
+            "y": None,
+            "direction": None,
+            "detail": "Probe not found",
+            "failed_at": None,
+        }
+        assert results[1]["success"] is True
+
+    async def test_move_many_with_invalid_commands(self, app_client, probe_a):
+        response = app_client.put(
+            "/probes/move",
+            json={"probe_ids": [str(probe_a.id)], "commands": "MXR"},
+        )
+        assert response.status_code == 400
+        assert "Invalid command sequence" in response.text
+
+    async def test_move_many_without_probes(self, app_client):
+        response = app_client.put("/probes/move", json={"probe_ids": [], "commands": "M"})
+        assert response.status_code == 422
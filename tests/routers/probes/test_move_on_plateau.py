@@ -0,0 +1,123 @@
+import pytest
+
+from mars_probe_api.services.spatial_index import plateau_indexes
+
+
+@pytest.mark.asyncio
+class TestProbeMoveOnPlateau:
+    def launch(self, app_client, plateau, direction="NORTH"):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": direction})
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    async def test_move_stops_at_obstacle(self, app_client, plateau):
+        probe_id = self.launch(app_client, plateau)
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "MM"})
+        assert response.status_code == 200
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "M"})
+        assert response.status_code == 400
+        assert "collide" in response.json()["detail"]
+
+    async def test_move_collides_with_other_probe(self, app_client, plateau):
+        first = self.launch(app_client, plateau)
+        response = app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        assert response.status_code == 200
+
+        second = self.launch(app_client, plateau)
+        response = app_client.put(f"/probes/{second}/move", json={"commands": "M"})
+        assert response.status_code == 400
+        assert "collide" in response.json()["detail"]
+
+        response = app_client.put(f"/probes/{second}/move", json={"commands": "RMM"})
+        assert response.status_code == 200
+        assert (response.json()["x"], response.json()["y"]) == (2, 0)
+
+    async def test_probe_can_cross_its_own_start(self, app_client, plateau):
+        probe_id = self.launch(app_client, plateau, direction="EAST")
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "MLMLMLM"})
+        assert response.status_code == 200
+        assert (response.json()["x"], response.json()["y"]) == (0, 0)
+
+    async def test_move_batch_on_plateau(self, app_client, db_session, plateau):
+        first = self.launch(app_client, plateau)
+        app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        second = self.launch(app_client, plateau)
+
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": second, "commands": "M"},
+                    {"probe_id": first, "commands": "M"},
+                    {"probe_id": second, "commands": "M"},
+                ]
+            },
+        )
+        results = response.json()["results"]
+        assert [r["success"] for r in results] == [False, True, True]
+        assert results[0]["failed_at"] == 0
+        assert (results[2]["x"], results[2]["y"]) == (0, 1)
+
+    async def test_move_batch_probes_trading_cells(self, app_client, plateau):
+        first = self.launch(app_client, plateau)
+        app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        second = self.launch(app_client, plateau)
+
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": first, "commands": "RM"},
+                    {"probe_id": second, "commands": "M"},
+                    {"probe_id": first, "commands": "RMRM"},
+                ]
+            },
+        )
+        results = response.json()["results"]
+        assert all(r["success"] for r in results)
+        assert (results[1]["x"], results[1]["y"]) == (0, 1)
+        assert (results[2]["x"], results[2]["y"]) == (0, 0)
+
+    async def test_move_many_on_plateau(self, app_client, plateau, probe_a):
+        first = self.launch(app_client, plateau)
+        app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        second = self.launch(app_client, plateau)
+
+        response = app_client.put(
+            "/probes/move",
+            json={"probe_ids": [second, str(probe_a.id)], "commands": "MM"},
+        )
+        results = response.json()["results"]
+        assert results[0]["success"] is False
+        assert "collide" in results[0]["detail"]
+        assert results[1]["success"] is True
+        assert results[1]["y"] == 2
+
+    async def test_move_retries_when_index_is_stale(self, app_client, db_session, plateau):
+        probe_id = self.launch(app_client, plateau)
+        # A concurrent move of the probe reserved its new cell after this
+        # request read the row: the probe is no longer at (0, 0) in the index.
+        index = await plateau_indexes.get(db_session, plateau.id)
+        index.move((0, 0), (0, 1))
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "RM"})
+        assert response.status_code == 200
+        assert (response.json()["x"], response.json()["y"]) == (1, 0)
+
+        index = await plateau_indexes.get(db_session, plateau.id)
+        assert (1, 0) in index
+        assert (0, 0) not in index and (0, 1) not in index
+
+    async def test_move_many_conflict_when_index_is_stale(self, app_client, db_session, plateau):
+        probe_id = self.launch(app_client, plateau)
+        index = await plateau_indexes.get(db_session, plateau.id)
+        index.move((0, 0), (0, 1))
+
+        response = app_client.put("/probes/move", json={"probe_ids": [probe_id], "commands": "M"})
+        assert response.status_code == 409
+
+        response = app_client.put("/probes/move", json={"probe_ids": [probe_id], "commands": "M"})
+        assert response.json()["results"][0]["success"] is True
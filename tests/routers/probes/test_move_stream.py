@@ -0,0 +1,106 @@
+import pytest
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import ProbeMove
+from mars_probe_api.services.coverage import coverage_store
+from mars_probe_api.services.spatial_index import plateau_indexes
+
+
+def chunked(*chunks):
+    yield from (chunk.encode() for chunk in chunks)
+
+
+@pytest.mark.asyncio
+class TestProbeMoveStream:
+    async def test_move_stream_success(self, app_client, db_session, probe_a):
+        probe_id = probe_a.id
+        response = app_client.put(
+            f"/probes/{probe_id}/move/stream",
+            content=chunked("MMR", "MM", "L"),
+            headers={"Content-Type": "text/plain"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"id": str(probe_id), "x": 2, "y": 2, "direction": "NORTH"}
+
+        commands = await db_session.scalar(select(ProbeMove.commands).where(ProbeMove.probe_id == probe_id))
+        assert commands == "2MR2ML"
+
+    async def test_move_stream_long_script(self, app_client, probe_a):
+        script = "RRRR" * 250_000 + "MMMMM"
+        response = app_client.put(
+            f"/probes/{probe_a.id}/move/stream",
+            content=chunked(*(script[i:i + 65_536] for i in range(0, len(script), 65_536))),
+        )
+        assert response.status_code == 200
+        assert response.json()["y"] == 5
+
+    async def test_move_stream_invalid_character(self, app_client, probe_a):
+        probe_id = probe_a.id
+        response = app_client.put(f"/probes/{probe_id}/move/stream", content=chunked("MM", "RX", "M"))
+        assert response.status_code == 400
+        assert "position 3" in response.json()["detail"]
+
+        response = app_client.get(f"/probes/{probe_id}/history")
+        assert response.json()["moves"] == []
+
+    async def test_move_stream_out_of_bounds(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move/stream", content=chunked("MMM", "MMMM"))
+        assert response.status_code == 400
+        assert "exceed grid limits" in response.json()["detail"]
+        assert "position 5" in response.json()["detail"]
+
+    async def test_move_stream_empty_body(self, app_client, probe_a):
+        response = app_client.put(f"/probes/{probe_a.id}/move/stream", content=b"")
+        assert response.status_code == 400
+
+    async def test_move_stream_on_plateau(self, app_client, db_session, plateau):
+        plateau_id = plateau.id
+        response = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+
+        response = app_client.put(f"/probes/{probe_id}/move/stream", content=chunked("MM", "M"))
+        assert response.status_code == 400
+        assert "collide" in response.json()["detail"]
+
+        response = app_client.put(f"/probes/{probe_id}/move/stream", content=chunked("MM", "RMM"))
+        assert response.status_code == 200
+
+        await coverage_store.flush(db_session)
+        response = app_client.get(f"/plateaus/{plateau_id}/coverage")
+        assert response.json()["covered_cells"] == 5
+
+    async def test_move_stream_keeps_start_cell_reserved(self, app_client, db_session, plateau):
+        plateau_id = plateau.id
+        response = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+        index = await plateau_indexes.get(db_session, plateau_id)
+
+        response = app_client.put(f"/probes/{probe_id}/move/stream", content=chunked("MM", "X"))
+        assert response.status_code == 400
+        assert (0, 0) in index
+        index.remove(0, 0)
+        assert (0, 0) not in index
+        index.add(0, 0)
+
+        response = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"})
+        assert response.status_code == 409
+
+    async def test_move_stream_crosses_its_own_start(self, app_client, db_session, plateau):
+        plateau_id = plateau.id
+        response = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+
+        response = app_client.put(f"/probes/{probe_id}/move/stream", content=chunked("RMLML", "MLMLM"))
+        assert response.status_code == 200
+        assert (response.json()["x"], response.json()["y"]) == (1, 0)
+
+        index = await plateau_indexes.get(db_session, plateau_id)
+        assert (0, 0) not in index
+        assert (1, 0) in index
+
+    async def test_move_stream_probe_not_found(self, app_client):
+        response = app_client.put(
+            "/probes/3fa85f64-5717-4562-b3fc-2c963f66afa6/move/stream", content=b"M"
+        )
+        assert response.status_code == 404
@@ -0,0 +1,91 @@
+import pytest
+
+from mars_probe_api.services import path_planner as path_planner_module
+from mars_probe_api.services.move_jobs import move_jobs
+from mars_probe_api.services.path_planner import path_planner
+
+
+@pytest.mark.asyncio
+class TestProbePlan:
+    async def test_plan_success(self, app_client, probe_a):
+        response = app_client.post(
+            f"/probes/{probe_a.id}/plan", json={"x": 3, "y": 2, "direction": "SOUTH"}
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["id"] == str(probe_a.id)
+        assert data["commands"] == "MMRMMMR"
+        assert data["length"] == 7
+
+        response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": data["commands"]})
+        assert response.json() == {"id": str(probe_a.id), "x": 3, "y": 2, "direction": "SOUTH"}
+
+    async def test_plans_are_cached(self, app_client, probe_a):
+        for _ in range(3):
+            app_client.post(f"/probes/{probe_a.id}/plan", json={"x": 1, "y": 1, "direction": "EAST"})
+
+        assert (path_planner.misses, path_planner.hits) == (1, 2)
+
+    async def test_plan_around_obstacles(self, app_client, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+
+        response = app_client.post(f"/probes/{probe_id}/plan", json={"x": 0, "y": 4, "direction": "NORTH"})
+        assert response.status_code == 200
+        commands = response.json()["commands"]
+        assert len(commands) == 10
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": commands})
+        assert response.status_code == 200
+        assert (response.json()["x"], response.json()["y"]) == (0, 4)
+
+    async def test_plan_to_obstacle(self, app_client, plateau):
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+
+        response = app_client.post(f"/probes/{probe_id}/plan", json={"x": 0, "y": 3, "direction": "NORTH"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Target pose is unreachable"
+
+    async def test_plan_search_budget_exceeded(self, app_client, plateau, monkeypatch):
+        plateau_id = plateau.id
+        response = app_client.post(f"/plateaus/{plateau_id}/probes", json={"direction": "NORTH"})
+        probe_id = response.json()["id"]
+
+        # Search in a thread of this process, which sees the patched budget.
+        monkeypatch.setattr(move_jobs, "executor", None)
+        monkeypatch.setattr(path_planner_module, "PLAN_MAX_EXPANSIONS", 5)
+        for _ in range(2):
+            response = app_client.post(f"/probes/{probe_id}/plan", json={"x": 0, "y": 4, "direction": "NORTH"})
+            assert response.status_code == 422
+            assert response.json()["detail"] == "No route found within the search budget"
+        # Running out of budget proves nothing, so it is not cached.
+        assert (path_planner.misses, path_planner.hits) == (2, 0)
+
+        monkeypatch.setattr(path_planner_module, "PLAN_MAX_EXPANSIONS", 200_000)
+        response = app_client.post(f"/probes/{probe_id}/plan", json={"x": 0, "y": 4, "direction": "NORTH"})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "payload, expected_detail",
+        [
+            ({"x": 6, "y": 0, "direction": "NORTH"}, "Target position is outside the grid"),
+            ({"x": 0, "y": -1, "direction": "NORTH"}, "Target position is outside the grid"),
+            ({"x": 0, "y": 0, "direction": "UP"}, "Direction must be one of ['NORTH', 'EAST', 'SOUTH', 'WEST']"),
+        ]
+    )
+    async def test_plan_with_invalid_target(self, app_client, probe_a, payload, expected_detail):
+        response = app_client.post(f"/probes/{probe_a.id}/plan", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == expected_detail
+
+    async def test_plan_probe_not_found(self, app_client):
+        response = app_client.post(
+            "/probes/3fa85f64-5717-4562-b3fc-2c963f66afa6/plan", json={"x": 0, "y": 0, "direction": "NORTH"}
+        )
+        assert response.status_code == 404
+
+    async def test_plan_invalid_probe_id(self, app_client):
+        response = app_client.post("/probes/not-a-uuid/plan", json={"x": 0, "y": 0, "direction": "NORTH"})
+        assert response.status_code == 400
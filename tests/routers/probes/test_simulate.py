@@ -0,0 +1,117 @@
+import pytest
+
+from mars_probe_api.routers import probes
+
+
+@pytest.mark.asyncio
+class TestProbeSimulate:
+    async def test_simulate_success(self, app_client, statements):
+        response = app_client.post(
+            "/probes/simulate",
+            json={"x": 5, "y": 5, "start": {"x": 1, "y": 1, "direction": "NORTH"}, "commands": "MMRMM"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "success": True,
+            "x": 3,
+            "y": 3,
+            "direction": "EAST",
+            "failed_at": None,
+            "detail": None,
+            "path": None,
+            "sample_every": None,
+        }
+        assert statements == []
+
+    async def test_simulate_reports_failing_step(self, app_client):
+        response = app_client.post(
+            "/probes/simulate",
+            json={"x": 3, "y": 3, "start": {"x": 0, "y": 0, "direction": "NORTH"}, "commands": "MMRMMMMM"},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["success"] is False
+        assert data["failed_at"] == 6
+        assert "exceed grid limits" in data["detail"]
+        assert (data["x"], data["y"], data["direction"]) == (0, 0, "NORTH")
+
+    async def test_simulate_sampled_path(self, app_client):
+        response = app_client.post(
+            "/probes/simulate",
+            json={
+                "x": 5,
+                "y": 5,
+                "start": {"x": 0, "y": 0, "direction": "NORTH"},
+                "commands": "MMRMM",
+                "sample_every": 2,
+            },
+        )
+        assert response.json()["path"] == [
+            {"x": 0, "y": 0, "direction": "NORTH"},
+            {"x": 0, "y": 2, "direction": "NORTH"},
+            {"x": 1, "y": 2, "direction": "EAST"},
+            {"x": 2, "y": 2, "direction": "EAST"},
+        ]
+        assert response.json()["sample_every"] == 2
+
+    async def test_simulate_path_length_is_capped(self, app_client, monkeypatch):
+        monkeypatch.setattr(probes, "MAX_PATH_SAMPLES", 10)
+        response = app_client.post(
+            "/probes/simulate",
+            json={
+                "x": 5,
+                "y": 5,
+                "start": {"x": 0, "y": 0, "direction": "NORTH"},
+                "commands": "LR" * 50 + "M",
+                "sample_every": 1,
+            },
+        )
+        data = response.json()
+        assert data["sample_every"] == 11
+        assert len(data["path"]) == 11
+        assert data["path"][-1] == {"x": 0, "y": 1, "direction": "NORTH"}
+
+    async def test_simulate_path_stops_before_failing_step(self, app_client):
+        response = app_client.post(
+            "/probes/simulate",
+            json={
+                "x": 1,
+                "y": 1,
+                "start": {"x": 0, "y": 0, "direction": "EAST"},
+                "commands": "MMLM",
+                "sample_every": 1,
+            },
+        )
+        data = response.json()
+        assert data["failed_at"] == 1
+        assert data["path"] == [
+            {"x": 0, "y": 0, "direction": "EAST"},
+            {"x": 1, "y": 0, "direction": "EAST"},
+        ]
+
+    @pytest.mark.parametrize(
+        "payload, expected_detail",
+        [
+            (
+                {"x": -1, "y": 5, "start": {"x": 0, "y": 0, "direction": "NORTH"}, "commands": "M"},
+                "X must be a non-negative integer",
+            ),
+            (
+                {"x": 5, "y": 5, "start": {"x": 0, "y": 0, "direction": "UP"}, "commands": "M"},
+                "Direction must be one of ['NORTH', 'EAST', 'SOUTH', 'WEST']",
+            ),
+            (
+                {"x": 5, "y": 5, "start": {"x": 6, "y": 0, "direction": "NORTH"}, "commands": "M"},
+                "Start position must be inside the grid",
+            ),
+            (
+                {"x": 5, "y": 5, "start": {"x": 0, "y": 0, "direction": "NORTH"}, "commands": "MXM"},
+                "Invalid command sequence. Allowed commands: 'M', 'L', 'R'. (command at position 1)",
+            ),
+        ]
+    )
+    async def test_simulate_with_invalid_values(self, app_client, payload, expected_detail):
+        response = app_client.post("/probes/simulate", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == expected_detail
@@ -0,0 +1,108 @@
+import pytest
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import Probe, ProbeMove
+
+
+@pytest.mark.asyncio
+class TestProbeWriteBehind:
+    async def test_move_is_served_from_memory(self, app_client, db_session, probe_a, write_behind, statements):
+        for _ in range(3):
+            response = app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+            assert response.status_code == 200
+        assert response.json()["y"] == 3
+        assert statements == []
+
+        response = app_client.get("/probes")
+        assert response.json()["probes"][0]["y"] == 3
+        assert statements == []
+
+        await write_behind.flush(db_session)
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_a.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.y, db_probe.version) == (3, 3)
+
+    async def test_created_probes_are_added_to_store(self, app_client, write_behind):
+        response = app_client.post("/probes", json={"x": 2, "y": 2, "direction": "EAST"})
+        probe_id = response.json()["id"]
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "MM"})
+        assert response.status_code == 200
+        assert response.json()["x"] == 2
+
+        response = app_client.put(f"/probes/{probe_id}/move", json={"commands": "M"})
+        assert response.status_code == 400
+
+    async def test_move_batch_uses_store(self, app_client, probe_a, probe_b, write_behind):
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": str(probe_a.id), "commands": "M"},
+                    {"probe_id": str(probe_b.id), "commands": "M"},
+                ]
+            },
+        )
+        assert all(r["success"] for r in response.json()["results"])
+
+        states = write_behind.get_many([probe_a.id, probe_b.id])
+        assert (states[probe_a.id].y, states[probe_b.id].x) == (1, 1)
+
+    async def test_list_stream_from_store(self, app_client, probe_a, write_behind):
+        response = app_client.get("/probes", params={"stream": True})
+        assert response.status_code == 200
+        assert str(probe_a.id) in response.text
+
+    async def test_history_is_flushed_with_poses(self, app_client, db_session, probe_a, write_behind):
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "M"})
+        app_client.put(f"/probes/{probe_a.id}/move", json={"commands": "MR"})
+
+        response = app_client.get(f"/probes/{probe_a.id}/history")
+        assert [move["seq"] for move in response.json()["moves"]] == [1, 2]
+        assert await db_session.scalar(select(ProbeMove.seq)) is None
+
+        await write_behind.flush(db_session)
+        seqs = await db_session.scalars(select(ProbeMove.seq).order_by(ProbeMove.seq))
+        assert list(seqs) == [1, 2]
+
+        response = app_client.get(f"/probes/{probe_a.id}/history/2")
+        assert response.json()["end"] == {"x": 0, "y": 2, "direction": "EAST"}
+
+    async def test_plateau_launch_and_moves(self, app_client, db_session, plateau, write_behind):
+        first = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "NORTH"}).json()["id"]
+        response = app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        assert response.status_code == 200
+
+        response = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"})
+        assert response.status_code == 201
+        second = response.json()["id"]
+
+        response = app_client.put(f"/probes/{first}/move", json={"commands": "RM"})
+        assert (response.json()["x"], response.json()["y"]) == (1, 1)
+        response = app_client.put(f"/probes/{second}/move", json={"commands": "LMRM"})
+        assert response.status_code == 400
+        assert "collide" in response.json()["detail"]
+
+    async def test_flush_probes_trading_cells(self, app_client, db_session, plateau, write_behind):
+        first = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "NORTH"}).json()["id"]
+        app_client.put(f"/probes/{first}/move", json={"commands": "M"})
+        second = app_client.post(f"/plateaus/{plateau.id}/probes", json={"direction": "EAST"}).json()["id"]
+
+        response = app_client.post(
+            "/probes/moves",
+            json={
+                "moves": [
+                    {"probe_id": first, "commands": "RM"},
+                    {"probe_id": second, "commands": "LM"},
+                    {"probe_id": first, "commands": "RMRM"},
+                ]
+            },
+        )
+        assert all(r["success"] for r in response.json()["results"])
+
+        assert await write_behind.flush(db_session) == 2
+        rows = await db_session.execute(select(Probe.id, Probe.x, Probe.y, Probe.plateau_id))
+        positions = {str(row.id): (row.x, row.y, row.plateau_id) for row in rows}
+        assert positions[first] == (0, 0, plateau.id)
+        assert positions[second] == (0, 1, plateau.id)
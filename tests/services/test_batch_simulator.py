@@ -0,0 +1,66 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.batch_simulator import BatchSimulator
+from mars_probe_api.services.probe_service import DIRECTIONS, ProbeService
+
+
+class TestBatchSimulator:
+    def test_run_moves_every_probe(self):
+        probes = [
+            Probe(x=0, y=0, direction="NORTH", size_x=5, size_y=5),
+            Probe(x=1, y=1, direction="EAST", size_x=5, size_y=5),
+        ]
+        result = BatchSimulator.from_probes(probes).run("MMRM")
+
+        assert result.x.tolist() == [1, 3]
+        assert result.y.tolist() == [2, 0]
+        assert [DIRECTIONS[h] for h in result.heading] == ["EAST", "SOUTH"]
+        assert result.failed_at.tolist() == [-1, -1]
+
+    def test_run_reports_first_failing_move(self):
+        probes = [
+            Probe(x=0, y=0, direction="NORTH", size_x=5, size_y=5),
+            Probe(x=0, y=0, direction="EAST", size_x=2, size_y=2),
+        ]
+        result = BatchSimulator.from_probes(probes).run("MMMRM")
+
+        assert result.failed_at.tolist() == [-1, 2]
+        assert (result.x[1], result.y[1], result.heading[1]) == (0, 0, 1)
+
+    def test_run_with_invalid_commands_raises(self):
+        with pytest.raises(HTTPException):
+            BatchSimulator.from_probes([]).run("MXM")
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_matches_execute_commands(self, seed):
+        rng = random.Random(seed)
+        probes = []
+        for _ in range(200):
+            size_x, size_y = rng.randint(0, 8), rng.randint(0, 8)
+            probes.append(
+                Probe(
+                    x=rng.randint(0, size_x),
+                    y=rng.randint(0, size_y),
+                    direction=rng.choice(DIRECTIONS),
+                    size_x=size_x,
+                    size_y=size_y,
+                )
+            )
+        commands = "".join(rng.choices("MMMLR", k=rng.randint(1, 20)))
+
+        result = BatchSimulator.from_probes(probes).run(commands)
+
+        for i, probe in enumerate(probes):
+            try:
+                ProbeService.execute_commands(probe, commands)
+            except HTTPException:
+                assert result.failed_at[i] >= 0
+            else:
+                assert result.failed_at[i] == -1
+            assert (result.x[i], result.y[i], DIRECTIONS[result.heading[i]]) == (
+                probe.x, probe.y, probe.direction
+            )
@@ -0,0 +1,265 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.services.command_compiler import (
+    CollisionDetected,
+    CommandRun,
+    CommandStream,
+    ENCODED_PART_SIZE,
+    Envelope,
+    GridLimitExceeded,
+    InvalidCommand,
+    append_encoded,
+    apply_program,
+    compile_commands,
+    compile_program,
+    decode_commands,
+    encode_commands,
+    execute_runs,
+)
+from mars_probe_api.services.probe_service import DIRECTIONS, PROGRAM_CACHE_MAX_LENGTH, ProbeService
+from mars_probe_api.services.spatial_index import OccupancyIndex
+
+
+def interpret_step_by_step(probe: Probe, commands: str, obstacles=frozenset()):
+    """Reference interpreter: one `_turn`/`_move` call per command."""
+    for position, command in enumerate(commands):
+        if command == "L":
+            probe.direction = ProbeService._turn(probe.direction, left=True)
+        elif command == "R":
+            probe.direction = ProbeService._turn(probe.direction, left=False)
+        else:
+            x, y = probe.x, probe.y
+            try:
+                ProbeService._move(probe)
+            except HTTPException:
+                return position
+            if (probe.x, probe.y) in obstacles:
+                probe.x, probe.y = x, y
+                return position
+    return None
+
+
+class TestCommandCompiler:
+    @pytest.mark.parametrize(
+        "commands, expected",
+        [
+            ("M", (CommandRun(0, 0, 1),)),
+            ("MMM", (CommandRun(0, 0, 3),)),
+            ("RMM", (CommandRun(1, 1, 2),)),
+            ("LLLL", (CommandRun(4, 0, 0),)),
+            ("LRLM", (CommandRun(3, 3, 1),)),
+            ("MMRMML", (CommandRun(0, 0, 2), CommandRun(3, 1, 2), CommandRun(6, 3, 0))),
+        ],
+    )
+    def test_compile_commands(self, commands, expected):
+        assert compile_commands(commands) == expected
+
+    @pytest.mark.parametrize(
+        "commands, expected",
+        [
+            ("M", "M"),
+            ("MMMLRR", "3ML2R"),
+            ("LLLLMMMMMMMMMMMM", "4L12M"),
+        ],
+    )
+    def test_run_length_encoding(self, commands, expected):
+        assert encode_commands(commands) == expected
+        assert decode_commands(expected) == commands
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_append_encoded_matches_whole_encoding(self, seed):
+        rng = random.Random(seed)
+
+        for _ in range(50):
+            commands = "".join(rng.choices("MMMLR", k=rng.randint(0, 40)))
+            cuts = sorted(rng.choices(range(len(commands) + 1), k=4))
+            parts = []
+            for i, j in zip([0] + cuts, cuts + [len(commands)]):
+                append_encoded(parts, encode_commands(commands[i:j]))
+            assert "".join(parts) == encode_commands(commands)
+
+    @pytest.mark.parametrize(
+        "commands, position",
+        [("X", 0), ("MMX", 2), ("LRX", 2), ("MLRM MM", 4), ("MMRLé", 4)],
+    )
+    def test_compile_commands_reports_invalid_position(self, commands, position):
+        with pytest.raises(InvalidCommand) as exc:
+            compile_commands(commands)
+        assert exc.value.position == position
+
+    def test_compile_reports_invalid_position_in_detail(self):
+        with pytest.raises(HTTPException) as exc:
+            ProbeService.compile("MMRLQM")
+        assert exc.value.detail.endswith("(command at position 4)")
+
+    def test_command_stream_reports_invalid_character(self):
+        stream = CommandStream(0, 0, 0, 5, 5)
+        stream.feed(b"MMR")
+        with pytest.raises(InvalidCommand) as exc:
+            stream.feed(b"MMxM")
+        assert exc.value.position == 5
+
+    def test_command_stream_reports_failing_move(self):
+        stream = CommandStream(0, 0, 0, 3, 3)
+        stream.feed(b"MMRM")
+        with pytest.raises(GridLimitExceeded) as exc:
+            stream.feed(b"MMMM")
+        assert exc.value.position == 6
+
+    def test_command_stream_encodes_tiny_chunks_compactly(self):
+        commands = "MRRMRRLRLLRR" * 2_000
+        stream = CommandStream(0, 0, 0, 10, 10)
+        for command in commands:
+            stream.feed(command.encode())
+
+        assert stream.encoded == encode_commands(commands)
+        assert len(stream._encoded) <= len(stream.encoded) // ENCODED_PART_SIZE + 1
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_command_stream_matches_simulate(self, seed):
+        rng = random.Random(seed)
+
+        for _ in range(50):
+            size_x, size_y = rng.randint(0, 8), rng.randint(0, 8)
+            x, y = rng.randint(0, size_x), rng.randint(0, size_y)
+            direction = rng.choice(DIRECTIONS)
+            commands = "".join(rng.choices("MMMLR", k=rng.randint(1, 40)))
+            cuts = sorted(rng.sample(range(len(commands) + 1), k=min(3, len(commands) + 1)))
+            chunks = [commands[i:j] for i, j in zip([0] + cuts, cuts + [len(commands)])]
+
+            stream = CommandStream(x, y, DIRECTIONS.index(direction), size_x, size_y)
+            try:
+                expected = ProbeService.simulate(x, y, direction, size_x, size_y, commands)
+            except GridLimitExceeded as e:
+                with pytest.raises(GridLimitExceeded) as exc:
+                    for chunk in chunks:
+                        stream.feed(chunk.encode())
+                assert exc.value.position == e.position
+                continue
+
+            for chunk in chunks:
+                stream.feed(chunk.encode())
+            assert (stream.x, stream.y, DIRECTIONS[stream.heading]) == expected
+            assert stream.encoded == encode_commands(commands)
+
+    def test_execute_runs_reports_first_failing_move(self):
+        with pytest.raises(GridLimitExceeded) as exc:
+            execute_runs(compile_commands("MMRMMMMM"), 0, 0, 0, 3, 3)
+        assert exc.value.position == 6
+
+    def test_execute_runs_reports_collision(self):
+        occupancy = OccupancyIndex(5, 5)
+        occupancy.add(0, 3)
+        with pytest.raises(CollisionDetected) as exc:
+            execute_runs(compile_commands("MMMM"), 0, 0, 0, 5, 5, occupancy)
+        assert exc.value.position == 2
+
+    def test_execute_runs_grid_limit_before_obstacle(self):
+        occupancy = OccupancyIndex(5, 5)
+        occupancy.add(4, 4)
+        with pytest.raises(GridLimitExceeded) as exc:
+            execute_runs(compile_commands("MMMMMMM"), 0, 0, 0, 5, 5, occupancy)
+        assert exc.value.position == 5
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_execute_runs_with_obstacles_matches_step_by_step(self, seed):
+        rng = random.Random(seed)
+
+        for _ in range(50):
+            size_x, size_y = rng.randint(0, 8), rng.randint(0, 8)
+            x, y = rng.randint(0, size_x), rng.randint(0, size_y)
+            direction = rng.choice(DIRECTIONS)
+            commands = "".join(rng.choices("MMMLR", k=rng.randint(1, 40)))
+            obstacles = {
+                (rng.randint(0, size_x), rng.randint(0, size_y)) for _ in range(rng.randint(0, 6))
+            } - {(x, y)}
+
+            expected = Probe(x=x, y=y, direction=direction, size_x=size_x, size_y=size_y)
+            failed_at = interpret_step_by_step(expected, commands, obstacles)
+
+            occupancy = OccupancyIndex(size_x, size_y)
+            for cell in obstacles:
+                occupancy.add(*cell)
+            runs = compile_commands(commands)
+            heading = DIRECTIONS.index(direction)
+
+            if failed_at is None:
+                final = execute_runs(runs, x, y, heading, size_x, size_y, occupancy)
+                assert final == (expected.x, expected.y, DIRECTIONS.index(expected.direction))
+            else:
+                with pytest.raises((GridLimitExceeded, CollisionDetected)) as exc:
+                    execute_runs(runs, x, y, heading, size_x, size_y, occupancy)
+                assert exc.value.position == failed_at
+
+    def test_compile_program_envelopes(self):
+        program = compile_program("MMRMML")
+        assert program.rotation == 0
+        assert program.envelopes[0] == Envelope(2, 2, 0, 2, 0, 2)
+        assert program.envelopes[2] == Envelope(-2, -2, -2, 0, -2, 0)
+
+    def test_apply_program_reports_first_failing_move(self):
+        program = compile_program("MMRMMMMM")
+        assert apply_program(program, 0, 0, 0, 5, 5) == (5, 2, 1)
+        with pytest.raises(GridLimitExceeded) as exc:
+            apply_program(program, 0, 0, 0, 3, 3)
+        assert exc.value.position == 6
+
+    def test_compiled_programs_are_cached(self):
+        ProbeService.compile.cache_clear()
+        for _ in range(3):
+            ProbeService.execute_commands(
+                Probe(x=0, y=0, direction="NORTH", size_x=5, size_y=5), "MRM"
+            )
+
+        info = ProbeService.compile.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+    def test_long_scripts_are_not_cached(self):
+        ProbeService.compile.cache_clear()
+        commands = "LR" * PROGRAM_CACHE_MAX_LENGTH
+        for _ in range(2):
+            assert ProbeService.compile(commands).rotation == 0
+        assert ProbeService.compile.cache_info().currsize == 0
+
+    def test_invalid_commands_are_not_cached(self):
+        ProbeService.compile.cache_clear()
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                ProbeService.compile("MXM")
+        assert ProbeService.compile.cache_info().currsize == 0
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_step_by_step_interpreter(self, seed):
+        rng = random.Random(seed)
+
+        for _ in range(50):
+            size_x, size_y = rng.randint(0, 8), rng.randint(0, 8)
+            x, y = rng.randint(0, size_x), rng.randint(0, size_y)
+            direction = rng.choice(DIRECTIONS)
+            commands = "".join(rng.choices("MMMLR", k=rng.randint(1, 40)))
+
+            expected = Probe(x=x, y=y, direction=direction, size_x=size_x, size_y=size_y)
+            failed_at = interpret_step_by_step(expected, commands)
+
+            probe = Probe(x=x, y=y, direction=direction, size_x=size_x, size_y=size_y)
+            if failed_at is None:
+                ProbeService.execute_commands(probe, commands)
+                assert (probe.x, probe.y, probe.direction) == (
+                    expected.x, expected.y, expected.direction
+                )
+            else:
+                with pytest.raises(HTTPException) as exc:
+                    ProbeService.execute_commands(probe, commands)
+                assert "exceed grid limits" in str(exc.value.detail)
+                assert (probe.x, probe.y, probe.direction) == (x, y, direction)
+
+                with pytest.raises(GridLimitExceeded) as exc:
+                    execute_runs(
+                        compile_commands(commands), x, y, DIRECTIONS.index(direction), size_x, size_y
+                    )
+                assert exc.value.position == failed_at
@@ -0,0 +1,156 @@
+import random
+import uuid
+
+import pytest
+
+from sqlalchemy import select, text
+
+from mars_probe_api.models.plateau import CoverageChunk
+
+from mars_probe_api.services.command_compiler import HEADING_DELTAS
+from mars_probe_api.services.coverage import (
+    ChunkedBitmap,
+    cover_path,
+    coverage_store,
+    pack_chunk,
+    unpack_chunk,
+)
+
+
+class TestChunkedBitmap:
+    def test_add_and_contains(self):
+        bitmap = ChunkedBitmap()
+        assert bitmap.add(70, 3) is True
+        assert bitmap.add(70, 3) is False
+        assert (70, 3) in bitmap
+        assert (3, 70) not in bitmap
+        assert len(bitmap) == 1
+        assert bitmap.chunk_count == 1
+
+    def test_memory_follows_touched_chunks(self):
+        bitmap = ChunkedBitmap()
+        bitmap.add(0, 0)
+        bitmap.add(99_999, 99_999)
+        assert bitmap.chunk_count == 2
+
+    @pytest.mark.parametrize("heading", range(4))
+    def test_add_run_across_chunks(self, heading):
+        bitmap = ChunkedBitmap()
+        assert bitmap.add_run(200, 200, heading, 150) == 150
+
+        dx, dy = HEADING_DELTAS[heading]
+        expected = {(200 + dx * i, 200 + dy * i) for i in range(1, 151)}
+        assert all(cell in bitmap for cell in expected)
+        assert (200, 200) not in bitmap
+        assert (200 + dx * 151, 200 + dy * 151) not in bitmap
+        assert bitmap.add_run(200, 200, heading, 150) == 0
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_set_of_cells(self, seed):
+        rng = random.Random(seed)
+        bitmap, cells = ChunkedBitmap(), set()
+
+        for _ in range(200):
+            x, y = rng.randint(0, 500), rng.randint(0, 500)
+            heading, steps = rng.randrange(4), rng.randint(0, 100)
+            dx, dy = HEADING_DELTAS[heading]
+            run = {(x + dx * i, y + dy * i) for i in range(1, steps + 1)}
+            run = {(cx, cy) for cx, cy in run if cx >= 0 and cy >= 0}
+            if len(run) != steps:
+                continue
+
+            assert bitmap.add_run(x, y, heading, steps) == len(run - cells)
+            cells |= run
+
+        assert len(bitmap) == len(cells)
+        assert all(cell in bitmap for cell in cells)
+
+    def test_chunks_round_trip(self):
+        bitmap = ChunkedBitmap()
+        bitmap.add_run(0, 10, 1, 1000)
+        bitmap.add(5_000, 80_000)
+
+        restored = ChunkedBitmap.from_chunks(
+            (cx, cy, pack_chunk(bits)) for (cx, cy), bits in bitmap.chunks()
+        )
+        assert len(restored) == len(bitmap) == 1001
+        assert restored.chunk_count == bitmap.chunk_count
+        assert (5_000, 80_000) in restored
+        assert (1000, 10) in restored
+
+    def test_unpack_empty_chunk(self):
+        assert unpack_chunk(b"") == 0
+
+    def test_cover_path(self):
+        bitmap = ChunkedBitmap()
+        assert cover_path(bitmap, 1, 1, "NORTH", "MMRMMRMM") == 7
+        assert cover_path(bitmap, 1, 1, "EAST", "LM") == 0
+        assert all(cell in bitmap for cell in [(1, 1), (1, 3), (3, 3), (3, 1)])
+        assert (2, 2) not in bitmap
+
+
+@pytest.mark.asyncio
+class TestCoverageStore:
+    async def test_merge_writes_only_touched_chunks(self, db_session, plateau):
+        first, second = ChunkedBitmap(), ChunkedBitmap()
+        first.add_run(0, 0, 1, 100)
+        second.add_run(0, 200, 0, 10)
+        coverage_store.merge(plateau.id, first)
+        await coverage_store.flush(db_session)
+        coverage_store.merge(plateau.id, second)
+        await coverage_store.flush(db_session)
+
+        rows = (await db_session.execute(
+            select(CoverageChunk.cx, CoverageChunk.cy, CoverageChunk.cells)
+            .where(CoverageChunk.plateau_id == plateau.id)
+            .order_by(CoverageChunk.cx, CoverageChunk.cy)
+        )).all()
+        assert rows == [(0, 0, 63), (0, 3, 10), (1, 0, 37)]
+
+        bitmap = await coverage_store.load(db_session, plateau.id)
+        assert len(bitmap) == 110
+
+    async def test_merge_ors_into_stored_chunks(self, db_session, plateau):
+        coverage_store.record(plateau.id, [(0, 0, "EAST", "MM")])
+        await coverage_store.flush(db_session)
+        coverage_store.record(plateau.id, [(2, 0, "NORTH", "MMLMM")])
+        await coverage_store.flush(db_session)
+
+        bitmap = await coverage_store.load(db_session, plateau.id)
+        assert len(bitmap) == 7
+        assert all(cell in bitmap for cell in [(0, 0), (2, 0), (2, 2), (0, 2)])
+
+    async def test_pending_cells_are_merged_before_flush(self, db_session, plateau, statements):
+        coverage_store.record(plateau.id, [(0, 0, "EAST", "MM")])
+        coverage_store.record(plateau.id, [(0, 0, "NORTH", "MM")])
+        assert statements == []
+
+        assert await coverage_store.flush(db_session) == 1
+        bitmap = await coverage_store.load(db_session, plateau.id)
+        assert len(bitmap) == 5
+        assert await coverage_store.flush(db_session) == 0
+
+    async def test_failed_flush_keeps_cells(self, db_session, plateau, caplog, monkeypatch):
+        async def fail(*args):
+            raise RuntimeError("database is down")
+
+        plateau_id = plateau.id
+        coverage_store.record(plateau_id, [(0, 0, "EAST", "MM")])
+        monkeypatch.setattr(coverage_store, "_update", fail)
+        assert await coverage_store.flush(db_session) == 0
+        assert "Failed to record the coverage of plateau" in caplog.text
+
+        monkeypatch.undo()
+        assert await coverage_store.flush(db_session) == 1
+        assert len(await coverage_store.load(db_session, plateau_id)) == 3
+
+    async def test_flush_drops_cells_of_missing_plateau(self, db_session, caplog):
+        cells = ChunkedBitmap()
+        cells.add(0, 0)
+        # No such plateau: the chunk row violates its foreign key.
+        await db_session.execute(text("PRAGMA foreign_keys = ON"))
+        coverage_store.merge(uuid.uuid4(), cells)
+
+        assert await coverage_store.flush(db_session) == 0
+        assert "Failed to record the coverage of plateau" in caplog.text
+        assert await coverage_store.flush(db_session) == 0
@@ -0,0 +1,52 @@
+from mars_probe_api.services.fleet_state import FleetVersion, ListingCache
+
+
+class TestListingCache:
+    def test_get_only_serves_current_version(self):
+        cache = ListingCache()
+        cache.put(3, "all", b"v3")
+
+        assert cache.get(3, "all") == b"v3"
+        assert cache.get(4, "all") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_newer_version_drops_older_bodies(self):
+        cache = ListingCache()
+        cache.put(3, "all", b"v3")
+        cache.put(3, "page", b"v3 page")
+        cache.put(4, "all", b"v4")
+
+        assert cache.get(4, "page") is None
+        assert cache.get(4, "all") == b"v4"
+
+    def test_older_version_is_not_stored(self):
+        cache = ListingCache()
+        cache.put(4, "all", b"v4")
+        cache.put(3, "all", b"v3")
+
+        assert cache.version == 4
+        assert cache.get(4, "all") == b"v4"
+
+    def test_bounded_by_size(self):
+        cache = ListingCache(max_bytes=4)
+        for key in ("a", "b", "c"):
+            cache.put(1, key, key.encode() * 2)
+
+        assert cache.get(1, "a") is None
+        assert cache.get(1, "c") == b"cc"
+        assert cache.size == 4
+
+    def test_body_larger_than_cache_is_not_stored(self):
+        cache = ListingCache(max_bytes=4)
+        cache.put(1, "all", b"12345")
+
+        assert cache.get(1, "all") is None
+        assert cache.size == 0
+
+
+class TestFleetVersion:
+    def test_etag(self):
+        assert FleetVersion(9).etag == '"9"'
+
+    def test_etag_with_tag(self):
+        assert FleetVersion(9, "3f2a").etag == '"9-3f2a"'
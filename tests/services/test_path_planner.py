@@ -0,0 +1,104 @@
+import random
+from collections import deque
+
+import pytest
+
+from mars_probe_api.services import path_planner as path_planner_module
+from mars_probe_api.services.path_planner import NoPathFound, Pose, SearchBudgetExceeded, plan_commands
+from mars_probe_api.services.probe_service import DIRECTIONS, ProbeService
+from mars_probe_api.services.spatial_index import OccupancyIndex
+
+
+def shortest_by_bfs(start, goal, size_x, size_y, obstacles):
+    """Reference: breadth-first search over every (x, y, heading) state."""
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        pose = queue.popleft()
+        if pose == goal:
+            return distances[pose]
+        x, y, heading = pose
+        dx, dy = [(0, 1), (1, 0), (0, -1), (-1, 0)][heading]
+        neighbours = [Pose(x, y, (heading - 1) % 4), Pose(x, y, (heading + 1) % 4)]
+        if 0 <= x + dx <= size_x and 0 <= y + dy <= size_y and (x + dx, y + dy) not in obstacles:
+            neighbours.append(Pose(x + dx, y + dy, heading))
+        for neighbour in neighbours:
+            if neighbour not in distances:
+                distances[neighbour] = distances[pose] + 1
+                queue.append(neighbour)
+    return None
+
+
+def index_of(cells, size_x, size_y):
+    index = OccupancyIndex(size_x, size_y)
+    for cell in cells:
+        index.add(*cell)
+    return index
+
+
+class TestPathPlanner:
+    @pytest.mark.parametrize(
+        "start, goal, expected",
+        [
+            (Pose(0, 0, 0), Pose(0, 0, 0), ""),
+            (Pose(0, 0, 0), Pose(0, 0, 3), "L"),
+            (Pose(0, 0, 0), Pose(0, 3, 0), "MMM"),
+            (Pose(0, 0, 0), Pose(2, 2, 1), "MMRMM"),
+            (Pose(2, 2, 1), Pose(0, 0, 1), "RMMRMMRR"),
+        ]
+    )
+    def test_plan_without_obstacles(self, start, goal, expected):
+        assert plan_commands(start, goal, 5, 5) == expected
+
+    def test_plan_on_large_grid_is_direct(self):
+        commands = plan_commands(Pose(0, 0, 0), Pose(99_999, 99_999, 2), 100_000, 100_000)
+        assert len(commands) == 2 * 99_999 + 2
+
+    def test_plan_around_wall(self):
+        obstacles = index_of([(2, y) for y in range(5)], 5, 5)
+        commands = plan_commands(Pose(0, 0, 1), Pose(4, 0, 1), 5, 5, obstacles)
+
+        assert len(commands) == shortest_by_bfs(Pose(0, 0, 1), Pose(4, 0, 1), 5, 5, obstacles)
+        x, y, direction = ProbeService.simulate(0, 0, "EAST", 5, 5, commands, obstacles)
+        assert (x, y, direction) == (4, 0, "EAST")
+
+    def test_unreachable_goal(self):
+        obstacles = index_of([(2, y) for y in range(6)], 5, 5)
+        with pytest.raises(NoPathFound):
+            plan_commands(Pose(0, 0, 1), Pose(4, 0, 1), 5, 5, obstacles)
+
+    def test_goal_on_obstacle(self):
+        with pytest.raises(NoPathFound):
+            plan_commands(Pose(0, 0, 1), Pose(3, 3, 1), 5, 5, index_of([(3, 3)], 5, 5))
+
+    def test_search_budget_exceeded(self, monkeypatch):
+        monkeypatch.setattr(path_planner_module, "PLAN_MAX_EXPANSIONS", 10)
+        obstacles = index_of([(2, y) for y in range(5)], 5, 5)
+        with pytest.raises(SearchBudgetExceeded):
+            plan_commands(Pose(0, 0, 1), Pose(4, 0, 1), 5, 5, obstacles)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_matches_breadth_first_search(self, seed):
+        rng = random.Random(seed)
+
+        for _ in range(20):
+            size_x, size_y = rng.randint(0, 6), rng.randint(0, 6)
+            cells = {(rng.randint(0, size_x), rng.randint(0, size_y)) for _ in range(rng.randint(0, 10))}
+            start = Pose(rng.randint(0, size_x), rng.randint(0, size_y), rng.randrange(4))
+            goal = Pose(rng.randint(0, size_x), rng.randint(0, size_y), rng.randrange(4))
+            cells -= {(start.x, start.y)}
+            obstacles = index_of(cells, size_x, size_y)
+
+            expected = shortest_by_bfs(start, goal, size_x, size_y, cells)
+            if expected is None:
+                with pytest.raises(NoPathFound):
+                    plan_commands(start, goal, size_x, size_y, obstacles)
+                continue
+
+            commands = plan_commands(start, goal, size_x, size_y, obstacles)
+            assert len(commands) == expected
+            if commands:
+                final = ProbeService.simulate(
+                    start.x, start.y, DIRECTIONS[start.heading], size_x, size_y, commands, obstacles
+                )
+                assert final == (goal.x, goal.y, DIRECTIONS[goal.heading])
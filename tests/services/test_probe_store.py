@@ -0,0 +1,80 @@
+import pytest
+import uuid
+
+from sqlalchemy import select
+
+from mars_probe_api.models.probe import Probe
+from mars_probe_api.schemas.probe import ProbeListParams
+from mars_probe_api.services.probe_store import SPLICE_MIN_IDS, ProbeState
+
+
+@pytest.mark.asyncio
+class TestProbeStore:
+    async def test_load(self, db_session, probe_a, probe_b, write_behind):
+        states = write_behind.get_many([probe_a.id, probe_b.id])
+        assert states[probe_a.id].direction == "NORTH"
+        assert (states[probe_b.id].size_x, states[probe_b.id].size_y) == (3, 3)
+
+    async def test_compare_and_swap_coalesces_moves(self, db_session, probe_a, write_behind):
+        for y in (1, 2, 3):
+            state = write_behind.get_many([probe_a.id])[probe_a.id]
+            assert write_behind.compare_and_swap(state, 0, y, "NORTH") is not None
+
+        assert await write_behind.flush(db_session) == 1
+        assert await write_behind.flush(db_session) == 0
+
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_a.id))
+        await db_session.refresh(db_probe)
+        assert (db_probe.y, db_probe.version) == (3, 3)
+
+    async def test_compare_and_swap_stale_version(self, db_session, probe_a, write_behind):
+        state = write_behind.get_many([probe_a.id])[probe_a.id]
+        assert write_behind.compare_and_swap(state, 0, 1, "NORTH") is not None
+        assert write_behind.compare_and_swap(state, 0, 2, "NORTH") is None
+
+    async def test_save_many_is_all_or_nothing(self, db_session, probe_a, probe_b, write_behind):
+        poses = [
+            {"id": probe_a.id, "x": 0, "y": 1, "direction": "NORTH", "version": 0},
+            {"id": probe_b.id, "x": 1, "y": 0, "direction": "EAST", "version": 7},
+        ]
+        assert write_behind.save_many(poses) is False
+        assert write_behind.get_many([probe_a.id])[probe_a.id].y == 0
+
+    async def test_select(self, db_session, probe_a, probe_b, write_behind):
+        first_id, second_id = sorted([probe_a.id, probe_b.id])
+
+        assert [s.id for s in write_behind.select(ProbeListParams())] == [first_id, second_id]
+        assert [s.id for s in write_behind.select(ProbeListParams(after=first_id))] == [second_id]
+        assert [s.id for s in write_behind.select(ProbeListParams(direction="EAST"))] == [probe_b.id]
+        assert len(list(write_behind.select(ProbeListParams(), limit=1))) == 1
+
+    @pytest.mark.parametrize("count", [3, SPLICE_MIN_IDS * 2])
+    async def test_add_keeps_ids_sorted(self, db_session, probe_a, probe_b, write_behind, count):
+        states = [ProbeState(uuid.uuid4(), 0, 0, "NORTH", 5, 5, 0) for _ in range(count)]
+        # Re-adding a known probe only replaces its state.
+        known = write_behind.get_many([probe_a.id])[probe_a.id]
+        write_behind.add(states + [known._replace(x=1)])
+
+        expected = sorted([probe_a.id, probe_b.id] + [state.id for state in states])
+        assert [s.id for s in write_behind.select(ProbeListParams())] == expected
+        assert write_behind.get_many([probe_a.id])[probe_a.id].x == 1
+
+    async def test_select_since(self, db_session, probe_a, probe_b, write_behind):
+        state = write_behind.get_many([probe_b.id])[probe_b.id]
+        version = write_behind.version
+        write_behind.compare_and_swap(state, 1, 0, "EAST")
+
+        assert [s.id for s in write_behind.select(ProbeListParams(since=version))] == [probe_b.id]
+        assert list(write_behind.select(ProbeListParams(since=write_behind.version))) == []
+
+    async def test_flush_writes_revisions(self, db_session, probe_a, write_behind):
+        state = write_behind.get_many([probe_a.id])[probe_a.id]
+        write_behind.compare_and_swap(state, 0, 1, "NORTH")
+        write_behind.next_revision()
+
+        await write_behind.flush(db_session)
+        await write_behind.load(db_session)
+        assert write_behind.version == 1
+        db_probe = await db_session.scalar(select(Probe).where(Probe.id == probe_a.id))
+        await db_session.refresh(db_probe)
+        assert db_probe.revision == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from mars_probe_api.services.spatial_index import OccupancyIndex, OwnCellView, StaleIndex
+
+
+class TestOccupancyIndex:
+    @pytest.fixture
+    def index(self):
+        index = OccupancyIndex(10, 10)
+        for cell in [(5, 2), (2, 5), (2, 0), (0, 2)]:
+            index.add(*cell)
+        return index
+
+    def test_contains(self, index):
+        assert (5, 2) in index
+        assert (2, 2) not in index
+
+    def test_remove(self, index):
+        index.remove(5, 2)
+        assert (5, 2) not in index
+        assert index.free_steps(2, 2, 1, 8) == 8
+
+    def test_remove_free_cell(self, index):
+        with pytest.raises(StaleIndex):
+            index.remove(4, 2)
+        assert (5, 2) in index
+
+    def test_move(self, index):
+        index.move((5, 2), (6, 6))
+        assert (5, 2) not in index
+        assert (6, 6) in index
+
+    def test_move_to_occupied_cell(self, index):
+        with pytest.raises(StaleIndex):
+            index.move((5, 2), (2, 5))
+        assert (5, 2) in index
+
+    @pytest.mark.parametrize(
+        "heading, steps, expected",
+        [
+            (0, 5, 2),
+            (0, 2, 2),
+            (1, 5, 2),
+            (1, 1, 1),
+            (2, 5, 1),
+            (3, 5, 1),
+            (3, 1, 1),
+        ]
+    )
+    def test_free_steps(self, index, heading, steps, expected):
+        assert index.free_steps(2, 2, heading, steps) == expected
+
+    def test_free_steps_blocked_right_away(self, index):
+        assert index.free_steps(2, 1, 2, 3) == 0
+
+    @pytest.mark.parametrize("heading, expected", [(0, 7), (1, 7), (2, 1), (3, 1)])
+    def test_free_steps_passable(self, index, heading, expected):
+        passable = (2, 5) if heading in (0, 2) else (5, 2)
+        assert index.free_steps(2, 2, heading, 7, passable) == expected
+
+    def test_own_cell_view(self, index):
+        view = OwnCellView(index, 2, 5)
+        assert view.free_steps(2, 2, 0, 7) == 7
+        assert view.free_steps(2, 9, 2, 9) == 8
+        assert (2, 5) in index
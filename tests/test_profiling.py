@@ -0,0 +1,56 @@
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mars_probe_api.app import app
+from mars_probe_api.profiling import PROFILE_HEADER, ProfilingMiddleware, RateLimiter
+
+
+@pytest.fixture
+def profiled_client(app_client, tmp_path):
+    with TestClient(ProfilingMiddleware(app, str(tmp_path), min_interval=60, token="secret")) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+class TestProfiling:
+    async def test_profiles_request_with_header(self, profiled_client, probe_a, tmp_path):
+        response = profiled_client.put(
+            f"/probes/{probe_a.id}/move",
+            json={"commands": "MMRMM"},
+            headers={PROFILE_HEADER: "secret"},
+        )
+        assert response.status_code == 200
+
+        name = response.headers[PROFILE_HEADER]
+        assert "-PUT-probes_" in name and name.endswith(".pstats")
+        stats = pstats.Stats(str(tmp_path / name))
+        functions = {function for _, _, function in stats.stats}
+        assert "simulate" in functions
+        assert "move" in functions
+
+    async def test_requests_are_rate_limited(self, profiled_client, probe_a, tmp_path):
+        headers = {PROFILE_HEADER: "secret"}
+        profiled_client.get("/probes/", headers=headers)
+        response = profiled_client.get("/probes/", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers[PROFILE_HEADER] == "rate-limited"
+        assert len(list(tmp_path.iterdir())) == 1
+
+    async def test_requires_token(self, profiled_client, tmp_path):
+        for headers in ({}, {PROFILE_HEADER: "wrong"}):
+            response = profiled_client.get("/probes/", headers=headers)
+            assert response.status_code == 200
+            assert PROFILE_HEADER not in response.headers
+        assert not tmp_path.exists() or not list(tmp_path.iterdir())
+
+
+class TestRateLimiter:
+    def test_allows_one_event_per_interval(self, monkeypatch):
+        now = iter([0.0, 5.0, 10.0, 12.0])
+        monkeypatch.setattr("mars_probe_api.profiling.time.monotonic", lambda: next(now))
+
+        limiter = RateLimiter(10)
+        assert [limiter.allow() for _ in range(4)] == [True, False, True, False]